@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""Benchmarks for Coverage Liveness Gate v2.
+
+evaluate: seeds a gate with N healthy segments, then runs ticks that each
+touch a small random subset of segments and call evaluate(). With incremental
+evaluation the per-tick latency should stay flat as N grows.
+
+stress: T writer threads call record_event while another thread keeps calling
+evaluate(), once through ConcurrentCoverageLivenessGate and once through a
+single lock around the plain gate. Final per-segment counts are checked
+against what the writers sent.
+
+harness: seeded Zipf-skewed traffic over bin/geo/device with an injected
+outage and recovery on one segment, run against v1.0 and v2. Reports
+record_event throughput, evaluate latency at each --segments size, memory per
+segment, and time to quarantine / recovery. --baseline compares against a
+stored report and exits 1 on regressions beyond --tolerance;
+--write-baseline stores the current report instead.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from coverage_liveness_gate import CoverageLivenessGate
+from coverage_liveness_gate_v2 import ConcurrentCoverageLivenessGate, CoverageLivenessGateV2
+
+SEGMENT_SHAPE = (64, 16, 8)
+GATES: Dict[str, Callable[..., Any]] = {"v1": CoverageLivenessGate, "v2": CoverageLivenessGateV2}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=("evaluate", "stress", "harness"), default="evaluate")
+    parser.add_argument("--segments", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--touch", type=int, default=100, help="segments touched per tick")
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=2026)
+    parser.add_argument("--threads", type=int, default=8, help="stress: writer threads")
+    parser.add_argument("--events", type=int, default=50_000, help="stress: events per writer thread")
+    parser.add_argument("--zipf", type=float, default=1.3, help="harness: Zipf exponent of segment popularity")
+    parser.add_argument("--memory-segments", type=int, default=100_000, help="harness: segments for memory sizing")
+    parser.add_argument("--baseline", type=Path, help="harness: compare against this stored report")
+    parser.add_argument("--write-baseline", type=Path, help="harness: store the report here")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="harness: allowed relative slowdown")
+    return parser.parse_args()
+
+
+def bench_segments(segments: int, touch: int, ticks: int, seed: int) -> Dict[str, float]:
+    rng = np.random.default_rng(seed)
+    gate = CoverageLivenessGateV2("bench", min_segment_samples=1, initial_capacity=segments)
+
+    ids = np.arange(segments)
+    gate.record_events(ids, None, None, np.ones(segments, dtype=bool))
+    gate.evaluate()
+
+    latencies: List[float] = []
+    for _ in range(ticks):
+        touched = rng.integers(0, segments, touch)
+        gate.record_events(touched, None, None, np.ones(touch, dtype=bool))
+        start = time.perf_counter()
+        result = gate.evaluate()
+        latencies.append(time.perf_counter() - start)
+        assert result["status"] == "ALIVE"
+
+    micros = np.array(latencies) * 1e6
+    return {
+        "segments": segments,
+        "touched_per_tick": touch,
+        "evaluate_p50_us": round(float(np.percentile(micros, 50)), 1),
+        "evaluate_p99_us": round(float(np.percentile(micros, 99)), 1),
+    }
+
+
+class LockedGate:
+    """Baseline: every call serialized behind one lock."""
+
+    def __init__(self, gate: CoverageLivenessGateV2):
+        self.gate = gate
+        self._lock = threading.Lock()
+
+    def record_event(self, event: Dict[str, Any], scored: bool):
+        with self._lock:
+            self.gate.record_event(event, scored)
+
+    def evaluate(self) -> Dict[str, Any]:
+        with self._lock:
+            return self.gate.evaluate()
+
+
+def writer_events(seed: int, count: int) -> List[tuple]:
+    rng = np.random.default_rng(seed)
+    bins = rng.integers(0, 64, count).tolist()
+    geos = rng.integers(0, 4, count).tolist()
+    scored = (rng.random(count) < 0.97).tolist()
+    return [({"bin": b, "geo": g, "device": "web"}, s) for b, g, s in zip(bins, geos, scored)]
+
+
+def stress(front: Any, gate: CoverageLivenessGateV2, threads: int, events: int, seed: int) -> Dict[str, Any]:
+    batches = [writer_events(seed + i, events) for i in range(threads)]
+    expected = Counter(f"{e['bin']}/{e['geo']}/{e['device']}" for batch in batches for e, _ in batch)
+    done = threading.Event()
+
+    def write(batch):
+        for event, scored in batch:
+            front.record_event(event, scored)
+
+    def evaluate_loop():
+        while not done.is_set():
+            front.evaluate()
+            time.sleep(0.001)
+
+    writers = [threading.Thread(target=write, args=(batch,)) for batch in batches]
+    evaluator = threading.Thread(target=evaluate_loop)
+    start = time.perf_counter()
+    evaluator.start()
+    for thread in writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    done.set()
+    evaluator.join()
+    front.evaluate()
+    elapsed = time.perf_counter() - start
+
+    counts_ok = gate.ingested == dict(expected)
+    return {
+        "threads": threads,
+        "events": threads * events,
+        "events_per_sec": round(threads * events / elapsed),
+        "counts_ok": counts_ok,
+        "quarantined": len(gate.quarantined),
+    }
+
+
+# -------------------------
+# Skewed-traffic harness
+# -------------------------
+
+def skewed_events(
+    rng: np.random.Generator,
+    count: int,
+    zipf: float,
+    outage: Optional[Tuple[int, int, int]] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """`count` events over SEGMENT_SHAPE with Zipf-ranked segment popularity.
+
+    `outage` is (bin, geo, device) of a segment whose events are scored with
+    probability 0.2 instead of 0.99.
+    """
+    ranks = (rng.zipf(zipf, count) - 1) % int(np.prod(SEGMENT_SHAPE))
+    bins, geos, devices = np.unravel_index(ranks, SEGMENT_SHAPE)
+    healthy = np.full(count, 0.99)
+    if outage is not None:
+        hit = (bins == outage[0]) & (geos == outage[1]) & (devices == outage[2])
+        healthy[hit] = 0.2
+    return bins, geos, devices, rng.random(count) < healthy
+
+
+def feed(gate: Any, bins, geos, devices, scored):
+    if hasattr(gate, "record_events"):
+        gate.record_events(bins, geos, devices, scored)
+        return
+    for b, g, d, s in zip(bins.tolist(), geos.tolist(), devices.tolist(), scored.tolist()):
+        gate.record_event({"bin": b, "geo": g, "device": d}, s)
+
+
+def record_throughput(name: str, events: int, zipf: float, seed: int) -> float:
+    rng = np.random.default_rng(seed)
+    bins, geos, devices, scored = skewed_events(rng, events, zipf)
+    rows = [({"bin": b, "geo": g, "device": d}, s) for b, g, d, s in zip(bins.tolist(), geos.tolist(), devices.tolist(), scored.tolist())]
+    gate = GATES[name]("bench")
+    start = time.perf_counter()
+    for event, ok in rows:
+        gate.record_event(event, ok)
+    return events / (time.perf_counter() - start)
+
+
+def cube(ids: np.ndarray, segments: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Spread segment ids over all three fields, so each field has ~cbrt(segments) labels."""
+    side = int(np.ceil(segments ** (1 / 3)))
+    return np.unravel_index(ids, (side, side, side))
+
+
+def populate(name: str, segments: int) -> Any:
+    gate = GATES[name]("bench", min_segment_samples=1)
+    feed(gate, *cube(np.arange(segments), segments), np.ones(segments, dtype=bool))
+    return gate
+
+
+def evaluate_latency(name: str, segments: int, ticks: int, touch: int, seed: int) -> float:
+    rng = np.random.default_rng(seed)
+    gate = populate(name, segments)
+    gate.evaluate()
+    latencies = []
+    for _ in range(ticks):
+        touched = rng.integers(0, segments, touch)
+        feed(gate, *cube(touched, segments), np.ones(touch, dtype=bool))
+        start = time.perf_counter()
+        gate.evaluate()
+        latencies.append(time.perf_counter() - start)
+    return float(np.percentile(np.array(latencies) * 1e6, 50))
+
+
+def memory_per_segment(name: str, segments: int) -> float:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        gate = populate(name, segments)
+        used = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del gate
+    return used / segments
+
+
+class TickClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def outage_timings(
+    name: str,
+    zipf: float,
+    seed: int,
+    ticks: int = 240,
+    events_per_tick: int = 2_000,
+    outage_ticks: Tuple[int, int] = (30, 90),
+) -> Dict[str, Optional[int]]:
+    """Ticks (one evaluate per tick) from outage start to quarantine and from outage end to release.
+
+    `name` may also be "v2_windowed": v2 with a 30-tick window of 5-tick buckets.
+    """
+    rng = np.random.default_rng(seed)
+    target = (0, 0, 3)
+    key = "/".join(str(part) for part in target)
+    clock = TickClock()
+    options: Dict[str, Any] = {"min_segment_samples": 50, "probation_samples": 150}
+    if name == "v2_windowed":
+        options.update(window_seconds=30, bucket_seconds=5, clock=clock)
+    gate = GATES[name.split("_")[0]]("bench", **options)
+    quarantined_at = released_at = None
+
+    for tick in range(ticks):
+        clock.now = float(tick)
+        active = outage_ticks[0] <= tick < outage_ticks[1]
+        feed(gate, *skewed_events(rng, events_per_tick, zipf, target if active else None))
+        gate.evaluate()
+        held = key in gate.quarantined
+        if quarantined_at is None and held and tick >= outage_ticks[0]:
+            quarantined_at = tick
+        if quarantined_at is not None and released_at is None and not held and tick >= outage_ticks[1]:
+            released_at = tick
+
+    return {
+        "ticks_to_quarantine": None if quarantined_at is None else quarantined_at - outage_ticks[0],
+        "ticks_to_recovery": None if released_at is None else released_at - outage_ticks[1],
+    }
+
+
+def harness(args: argparse.Namespace) -> Dict[str, Any]:
+    report: Dict[str, Any] = {"seed": args.seed, "zipf": args.zipf}
+    for name in GATES:
+        report[f"{name}_record_event_per_sec"] = round(record_throughput(name, 200_000, args.zipf, args.seed))
+        for segments in args.segments:
+            report[f"{name}_evaluate_p50_us_{segments}"] = round(
+                evaluate_latency(name, segments, ticks=20, touch=args.touch, seed=args.seed), 1
+            )
+        report[f"{name}_bytes_per_segment"] = round(memory_per_segment(name, args.memory_segments), 1)
+    for name in (*GATES, "v2_windowed"):
+        report.update({f"{name}_{k}": v for k, v in outage_timings(name, args.zipf, args.seed).items()})
+    return report
+
+
+def _slack(key: str) -> float:
+    """Absolute allowance on top of the relative tolerance, for small or discrete values."""
+    if "_ticks_" in key:
+        return 1
+    if "_evaluate_p50_us_" in key:
+        return 50.0
+    return 0
+
+
+def regressions(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Keys that got worse than baseline by more than `tolerance` (throughput down, everything else up)."""
+    found = []
+    for key, base in baseline.items():
+        current = report.get(key)
+        if key in ("seed", "zipf") or not isinstance(base, (int, float)):
+            if current != base:
+                found.append(f"{key}: {base} -> {current}")
+            continue
+        if current is None:
+            found.append(f"{key}: {base} -> missing")
+        elif key.endswith("_per_sec") and current < base * (1 - tolerance):
+            found.append(f"{key}: {base} -> {current}")
+        elif not key.endswith("_per_sec") and current > base * (1 + tolerance) + _slack(key):
+            found.append(f"{key}: {base} -> {current}")
+    return found
+
+
+def main() -> int:
+    args = parse_args()
+    if args.mode == "harness":
+        report = harness(args)
+        if args.write_baseline:
+            args.write_baseline.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        output: Dict[str, Any] = {"report": report}
+        if args.baseline:
+            output["regressions"] = regressions(report, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+        print(json.dumps(output, indent=2, sort_keys=True))
+        return 1 if output.get("regressions") else 0
+
+    if args.mode == "stress":
+        concurrent = ConcurrentCoverageLivenessGate("stress")
+        locked = LockedGate(CoverageLivenessGateV2("stress"))
+        rows = [
+            {"front": "concurrent", **stress(concurrent, concurrent.gate, args.threads, args.events, args.seed)},
+            {"front": "single_lock", **stress(locked, locked.gate, args.threads, args.events, args.seed)},
+        ]
+        print(json.dumps(rows, indent=2))
+        return 0 if all(row["counts_ok"] for row in rows) else 1
+
+    rows = [bench_segments(n, args.touch, args.ticks, args.seed) for n in args.segments]
+    print(json.dumps(rows, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Authorization throughput benchmark for IndustrialGovernor.
+
+Replays one seeded request stream through the v1.5 per-request rebuild
+(push, re-add every law, check, pop), the pre-asserted Z3 policy and the
+compiled closed-form policy, one request at a time and through
+authorize_batch, checks that every verdict matches, and reports
+authorizations per second for each.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Dict, List, Tuple
+
+try:
+    from z3 import Implies, Int, Solver, String, StringVal, unsat
+except ImportError:  # request_stream and run work without z3; the baselines need it
+    Solver = None
+
+from symbolic_governor import IndustrialGovernor
+
+
+class LegacyIndustrialGovernor(IndustrialGovernor):
+    """v1.5 authorize: rebuilds the whole policy inside a push/pop frame per request."""
+
+    def __init__(self, daily_budget=5000, failure_threshold=3):
+        super().__init__(daily_budget, failure_threshold)
+        self.violation_timestamps = []
+        self.s = Solver()
+        self.balance = Int('balance')
+        self.amount = Int('amount')
+        self.tier = String('tier')
+        self.threat_level = String('env.threat')
+        self.agent_a_amt = Int('agent.a.amount')
+        self.agent_b_amt = Int('agent.b.amount')
+
+    def authorize(self, req_a, req_b, tx_context, env_context, auth_token=1):
+        if self.is_hard_locked:
+            if auth_token > 9:
+                self.is_hard_locked, self.violation_timestamps = False, []
+            else:
+                return {"verdict": "FAIL_CLOSED", "reason": "SYSTEM_HARD_LOCK"}
+
+        self.s.push()
+        self.s.add(self.balance >= 0)
+        self.s.add(Implies(self.tier == StringVal("STANDARD"), self.amount <= 100))
+        self.s.add(Implies(self.threat_level == StringVal("HIGH"), self.amount <= 500))
+        self.s.add(self.cumulative_spend + self.amount <= self.daily_budget)
+        self.s.add(self.agent_a_amt == self.agent_b_amt)
+        self.s.add(req_a['key'] == req_b['key'])
+        self.s.add(self.balance == req_a['balance'])
+        self.s.add(self.amount == req_a['amount'])
+        self.s.add(self.tier == StringVal(req_a['tier']))
+        self.s.add(self.threat_level == StringVal(env_context.get('threat', 'LOW')))
+        self.s.add(self.agent_a_amt == req_a['amount'])
+        self.s.add(self.agent_b_amt == req_b['amount'])
+
+        z3_check = self.s.check()
+        proc_violations = self._qualify_process(tx_context)
+
+        if z3_check == unsat or proc_violations:
+            self.s.pop()
+            now = time.time()
+            self.violation_timestamps = [t for t in self.violation_timestamps if now - t < 60]
+            self.violation_timestamps.append(now)
+            if len(self.violation_timestamps) >= self.failure_threshold:
+                self.is_hard_locked = True
+                return {"verdict": "FAIL_CLOSED", "reason": "CIRCUIT_TRIPPED"}
+            return {"verdict": "FAIL_CLOSED", "audit": {"math": str(z3_check), "process": proc_violations}}
+
+        self.cumulative_spend += req_a['amount']
+        self.s.pop()
+        return {"verdict": "QUALIFIED", "new_burn": self.cumulative_spend}
+
+
+Request = Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any], Dict[str, Any], int]
+
+
+def request_stream(seed: int, count: int) -> List[Request]:
+    """Mostly valid requests with occasional tier, threat, balance, consensus and process faults."""
+    rng = random.Random(seed)
+    stream = []
+    for i in range(count):
+        amount = rng.choice([rng.randint(1, 100), rng.randint(1, 600), rng.randint(1, 2_000)])
+        req_a = {
+            "key": f"tx-{i}",
+            "amount": amount,
+            "balance": rng.randint(-2, 5_000),
+            "tier": rng.choice(["STANDARD", "VIP", "VIP"]),
+        }
+        req_b = {"key": req_a["key"] if rng.random() > 0.02 else "forged", "amount": amount if rng.random() > 0.02 else amount + 1}
+        steps = ["debit", "credit"]
+        tx_context = {
+            "declared": steps,
+            "executed": steps if rng.random() > 0.02 else steps[:1],
+            "incoming": amount,
+            "outgoing": amount if rng.random() > 0.02 else 0,
+        }
+        env_context = {"threat": rng.choice(["LOW", "LOW", "HIGH"])}
+        stream.append((req_a, req_b, tx_context, env_context, rng.choice([1, 1, 1, 10])))
+    return stream
+
+
+def run(governor: IndustrialGovernor, stream: List[Request]) -> Tuple[List[Dict[str, Any]], float]:
+    start = time.perf_counter()
+    verdicts = [governor.authorize(*request) for request in stream]
+    return verdicts, time.perf_counter() - start
+
+
+def run_batch(governor: IndustrialGovernor, stream: List[Request], batch: int) -> Tuple[List[Dict[str, Any]], float]:
+    start = time.perf_counter()
+    verdicts = []
+    for offset in range(0, len(stream), batch):
+        verdicts += governor.authorize_batch(stream[offset:offset + batch])
+    return verdicts, time.perf_counter() - start
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--budget", type=int, default=10_000_000)
+    parser.add_argument("--seed", type=int, default=2026)
+    parser.add_argument("--batch", type=int, default=1_000, help="requests per authorize_batch call")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    stream = request_stream(args.seed, args.requests)
+    legacy, legacy_s = run(LegacyIndustrialGovernor(daily_budget=args.budget), stream)
+    solver, solver_s = run(IndustrialGovernor(daily_budget=args.budget, mode="z3"), stream)
+    compiled, compiled_s = run(IndustrialGovernor(daily_budget=args.budget), stream)
+    solver_batch, solver_batch_s = run_batch(IndustrialGovernor(daily_budget=args.budget, mode="z3"), stream, args.batch)
+    compiled_batch, compiled_batch_s = run_batch(IndustrialGovernor(daily_budget=args.budget), stream, args.batch)
+    report = {
+        "requests": args.requests,
+        "verdicts_match": legacy == solver == compiled == solver_batch == compiled_batch,
+        "rebuild_per_request_per_sec": round(args.requests / legacy_s),
+        "preasserted_policy_per_sec": round(args.requests / solver_s),
+        "compiled_policy_per_sec": round(args.requests / compiled_s),
+        "preasserted_policy_batch_per_sec": round(args.requests / solver_batch_s),
+        "compiled_policy_batch_per_sec": round(args.requests / compiled_batch_s),
+    }
+    print(json.dumps(report, indent=2))
+    return 0 if report["verdicts_match"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
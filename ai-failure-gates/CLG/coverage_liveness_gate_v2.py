@@ -0,0 +1,923 @@
+#!/usr/bin/env python3
+"""
+Coverage Liveness Gate v2.0
+
+STATUS: DRAFT
+ROLE: SECURITY LIVENESS GATE
+
+SUPERSEDES: coverage_liveness_gate.py (v1.0, FROZEN)
+
+MODIFICATION RULE:
+- v1.0 remains the reference semantics and is not edited.
+- This gate MUST reach the same quarantine/probation decisions as v1.0
+  for the same event sequence.
+- Once promoted from DRAFT, this file freezes under the v1.0 rule.
+
+INVARIANT:
+A system is only ALIVE if it is capable of making evidence-backed decisions.
+Loss of decision coverage is a system failure, not a performance issue.
+
+CHANGES FROM v1.0:
+- record_events: columnar batch ingestion with vectorized grouping.
+- Segments are interned to dense integer ids through an open-addressing
+  int32 slot table over the packed key array (no per-segment Python
+  objects); counters live in growable NumPy arrays and quarantine is a
+  bitmap. Key strings are only rebuilt for segments that appear in a payload.
+- evaluate is O(segments touched since the last call): ready/total sums are
+  running counters and only dirty segments are re-checked for failure.
+- Optional windowed mode (window_seconds): counts live in ring-buffered time
+  buckets; expired buckets are subtracted and idle segment ids reclaimed.
+  Probation is counted inside the same window.
+- snapshot/restore to a compressed .npz (no pickle), and merge of per-shard
+  gates into one view with counters summed and quarantine unioned.
+- ConcurrentCoverageLivenessGate: per-thread event buffers folded into one
+  gate under a single lock, in batches or at evaluate time.
+- metrics(): read-only health snapshot (coverage, worst segment, quarantine
+  and probation counts, event counter, evaluate latency histogram) that
+  never changes gate state.
+"""
+
+import math
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Any, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from coverage_liveness_gate import CoverageReceipt
+
+
+# =========================
+# Column helpers
+# =========================
+
+PART_BITS = 21
+PART_LIMIT = 1 << PART_BITS
+SEGMENT_FIELDS = ("bin", "geo", "device")
+SNAPSHOT_VERSION = 1
+EVALUATE_LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+THRESHOLD_FIELDS = ("min_global_ready", "min_segment_ready", "min_segment_samples", "probation_samples")
+
+# segment slot table: linear probing, Fibonacci hashing, at most half full
+EMPTY_SLOT = -1
+DELETED_SLOT = -2
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+MIN_SLOT_BITS = 4
+# single events buffered before they are applied through the batch path
+PENDING_EVENTS = 4096
+
+
+def _factorize(column: Optional[Sequence[Any]], n: int) -> Tuple[np.ndarray, List[str]]:
+    """Dense local codes for one column plus the segment-key text of each code."""
+    if column is None:
+        return np.zeros(n, dtype=np.int64), ["unk"]
+
+    # lists stay objects: np.asarray would coerce [1, 1.0, True] to one float64 key
+    values = column if isinstance(column, np.ndarray) else np.asarray(column, dtype=object)
+    if values.shape != (n,):
+        raise ValueError(f"column length {values.shape} does not match {n} events")
+
+    if values.dtype == object:
+        items = values.tolist()
+        if len(set(map(type, items))) == 1:
+            index = {v: i for i, v in enumerate(dict.fromkeys(items))}
+            codes = np.fromiter(map(index.__getitem__, items), dtype=np.int64, count=n)
+            return codes, [str(v) for v in index]
+        # mixed types are keyed on the text: 1, 1.0 and True are equal values but distinct segment keys
+        text: Dict[str, int] = {}
+        codes = np.fromiter((text.setdefault(str(v), len(text)) for v in items), dtype=np.int64, count=n)
+        return codes, list(text)
+
+    uniques, codes = np.unique(values, return_inverse=True)
+    return codes.reshape(-1).astype(np.int64), [str(v) for v in uniques.tolist()]
+
+
+# =========================
+# Window buckets
+# =========================
+
+@dataclass
+class _WindowBucket:
+    """Per-segment contributions of one time bucket, so it can be subtracted on expiry.
+
+    Each batch appends a chunk of (sid, ingested, scored, prob_ingested,
+    prob_scored, epoch) columns. Probation contributions only count while
+    the segment's quarantine epoch is unchanged.
+    """
+
+    index: int
+    chunks: List[Tuple[np.ndarray, ...]] = field(default_factory=list)
+
+    def columns(self) -> Tuple[np.ndarray, ...]:
+        if not self.chunks:
+            return tuple(np.zeros(0, dtype=np.int64) for _ in range(6))
+        return tuple(np.concatenate([chunk[i] for chunk in self.chunks]) for i in range(6))
+
+
+# =========================
+# Gate
+# =========================
+
+class CoverageLivenessGateV2:
+    def __init__(
+        self,
+        system_id: str,
+        min_global_ready: float = 0.95,
+        min_segment_ready: float = 0.90,
+        min_segment_samples: int = 50,
+        probation_samples: int = 150,
+        initial_capacity: int = 1024,
+        window_seconds: Optional[float] = None,
+        bucket_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.system_id = system_id
+        self.min_global_ready = min_global_ready
+        self.min_segment_ready = min_segment_ready
+        self.min_segment_samples = min_segment_samples
+        self.probation_samples = probation_samples
+
+        # bin / geo / device text interned to per-field codes
+        self._part_codes: Tuple[Dict[str, int], ...] = ({}, {}, {})
+        self._part_labels: Tuple[List[str], ...] = ([], [], [])
+
+        # packed (bin, geo, device) code -> dense segment id: slots hold ids,
+        # keys are compared through _packed
+        self._slot_bits = MIN_SLOT_BITS
+        self._slots = np.full(1 << MIN_SLOT_BITS, EMPTY_SLOT, dtype=np.int32)
+        self._slots_used = 0
+        self._slots_deleted = 0
+        self._size = 0
+
+        capacity = max(8, initial_capacity)
+        self._packed = np.zeros(capacity, dtype=np.int64)
+        self._ingested = np.zeros(capacity, dtype=np.int64)
+        self._scored = np.zeros(capacity, dtype=np.int64)
+        self._prob_ingested = np.zeros(capacity, dtype=np.int64)
+        self._prob_scored = np.zeros(capacity, dtype=np.int64)
+        self._quarantine = np.zeros((capacity + 7) // 8, dtype=np.uint8)
+        self._quarantined_count = 0
+
+        # running sums, kept in step with counters and quarantine changes
+        self._total_ingested = 0
+        self._total_scored = 0
+        self._ready_ingested = 0
+        self._ready_scored = 0
+
+        # segments touched since the last evaluate; every other ready segment
+        # passed the failure check then (or was quarantined) and is unchanged
+        self._dirty_flag = np.zeros(capacity, dtype=bool)
+        self._dirty_batches: List[np.ndarray] = []
+        self._checked_thresholds: Optional[Tuple[float, int]] = None
+
+        # observability only: monotonic event counter and evaluate latency histogram
+        self._events_seen = 0
+        self._evaluate_latency = np.zeros(len(EVALUATE_LATENCY_BUCKETS) + 1, dtype=np.int64)
+        self._evaluate_seconds = 0.0
+
+        # bumped on every quarantine entry/exit, so expired probation counts
+        # from an earlier episode are not subtracted from the current one
+        self._epoch = np.zeros(capacity, dtype=np.int64)
+        self._free_ids: List[int] = []
+
+        # record_event columns not yet applied, and the window bucket they belong to
+        self._pending: Tuple[List[Any], ...] = ([], [], [], [])
+        self._pending_index: Optional[int] = None
+
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self._clock = clock
+        self._ring: List[Optional[_WindowBucket]] = []
+        self._bucket: Optional[_WindowBucket] = None
+        if window_seconds is not None:
+            if window_seconds <= 0 or bucket_seconds <= 0:
+                raise ValueError("window_seconds and bucket_seconds must be positive")
+            self._ring = [None] * max(1, math.ceil(window_seconds / bucket_seconds))
+
+    # -------------------------
+    # Interning
+    # -------------------------
+
+    def _part_code(self, field: int, label: str) -> int:
+        codes = self._part_codes[field]
+        code = codes.get(label)
+        if code is None:
+            code = len(codes)
+            if code >= PART_LIMIT:
+                raise OverflowError(f"more than {PART_LIMIT} distinct {SEGMENT_FIELDS[field]} values")
+            codes[label] = code
+            self._part_labels[field].append(label)
+        return code
+
+    def _grow(self, needed: int):
+        capacity = self._ingested.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ("_packed", "_ingested", "_scored", "_prob_ingested", "_prob_scored", "_dirty_flag", "_epoch"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:old.shape[0]] = old
+            setattr(self, name, new)
+        bitmap = np.zeros((capacity + 7) // 8, dtype=np.uint8)
+        bitmap[:self._quarantine.shape[0]] = self._quarantine
+        self._quarantine = bitmap
+
+    def _slots_of(self, codes: np.ndarray) -> np.ndarray:
+        hashed = codes.astype(np.uint64) * np.uint64(HASH_MULTIPLIER)
+        return (hashed >> np.uint64(64 - self._slot_bits)).astype(np.int64)
+
+    def _probe(self, codes: np.ndarray) -> np.ndarray:
+        """Slot index holding each packed code, or -1 when the code is not interned."""
+        found = np.full(codes.shape[0], -1, dtype=np.int64)
+        pos = self._slots_of(codes)
+        active = np.arange(codes.shape[0])
+        mask = self._slots.shape[0] - 1
+        while active.size:
+            sid = self._slots[pos[active]].astype(np.int64)
+            hit = (sid >= 0) & (self._packed[np.maximum(sid, 0)] == codes[active])
+            found[active[hit]] = pos[active[hit]]
+            active = active[~hit & (sid != EMPTY_SLOT)]
+            pos[active] = (pos[active] + 1) & mask
+        return found
+
+    def _link(self, codes: np.ndarray, sids: np.ndarray):
+        """Insert codes known to be absent; colliding codes claim free slots one at a time."""
+        if (self._slots_used + self._slots_deleted + codes.shape[0]) * 2 > self._slots.shape[0]:
+            self._rehash(self._slots_used + codes.shape[0])
+        pos = self._slots_of(codes)
+        pending = np.arange(codes.shape[0])
+        mask = self._slots.shape[0] - 1
+        while pending.size:
+            free = self._slots[pos[pending]] < 0
+            contenders = pending[free]
+            _, first = np.unique(pos[contenders], return_index=True)
+            winners = contenders[first]
+            self._slots_deleted -= int((self._slots[pos[winners]] == DELETED_SLOT).sum())
+            self._slots[pos[winners]] = sids[winners]
+            pending = pending[~np.isin(pending, winners)]
+            pos[pending] = (pos[pending] + 1) & mask
+        self._slots_used += codes.shape[0]
+
+    def _unlink(self, sids: np.ndarray):
+        pos = self._probe(self._packed[sids])
+        self._slots[pos] = DELETED_SLOT
+        self._slots_used -= sids.shape[0]
+        self._slots_deleted += sids.shape[0]
+
+    def _rehash(self, needed: int):
+        live = self._slots[self._slots >= 0].astype(np.int64)
+        self._slot_bits = max(MIN_SLOT_BITS, int(2 * needed - 1).bit_length())
+        self._slots = np.full(1 << self._slot_bits, EMPTY_SLOT, dtype=np.int32)
+        self._slots_used = self._slots_deleted = 0
+        if live.size:
+            self._link(self._packed[live], live)
+
+    def _segment_ids(self, codes: np.ndarray) -> np.ndarray:
+        """Segment ids for distinct packed codes, interning the new ones (freed ids first)."""
+        found = self._probe(codes)
+        sids = np.where(found >= 0, self._slots[np.maximum(found, 0)], -1).astype(np.int64)
+        new = np.flatnonzero(found < 0)
+        if new.size:
+            reused = min(len(self._free_ids), new.size)
+            fresh = new.size - reused
+            ids = np.array([self._free_ids.pop() for _ in range(reused)], dtype=np.int64)
+            if fresh:
+                self._grow(self._size + fresh)
+                ids = np.concatenate([ids, np.arange(self._size, self._size + fresh)])
+                self._size += fresh
+            self._packed[ids] = codes[new]
+            self._link(codes[new], ids)
+            sids[new] = ids
+        return sids
+
+    def _segment_name(self, sid: int) -> str:
+        packed = int(self._packed[sid])
+        mask = PART_LIMIT - 1
+        return "/".join((
+            self._part_labels[0][packed >> (2 * PART_BITS)],
+            self._part_labels[1][(packed >> PART_BITS) & mask],
+            self._part_labels[2][packed & mask],
+        ))
+
+    # -------------------------
+    # Quarantine bitmap
+    # -------------------------
+
+    def _quarantine_mask(self, sids: np.ndarray) -> np.ndarray:
+        return ((self._quarantine[sids >> 3] >> (sids & 7).astype(np.uint8)) & 1).astype(bool)
+
+    def _quarantined_ids(self) -> np.ndarray:
+        # only expand the non-zero bytes, so this stays cheap for sparse quarantine
+        used = self._quarantine[:(self._size + 7) // 8]
+        words = np.flatnonzero(used)
+        bits = np.unpackbits(used[words, None], axis=1, bitorder="little").astype(bool)
+        return ((words[:, None] << 3) + np.arange(8))[bits]
+
+    def _quarantine_add(self, sids: np.ndarray):
+        self._quarantine_set(sids)
+        self._quarantined_count += len(sids)
+        self._epoch[sids] += 1
+        self._ready_ingested -= int(self._ingested[sids].sum())
+        self._ready_scored -= int(self._scored[sids].sum())
+
+    def _quarantine_set(self, sids: np.ndarray):
+        """Set bits only; callers rebuild running sums with _recount()."""
+        for sid in sids.tolist():
+            self._quarantine[sid >> 3] |= np.uint8(1 << (sid & 7))
+
+    def _release(self, sid: int):
+        self._quarantine[sid >> 3] &= np.uint8(~(1 << (sid & 7)) & 0xFF)
+        self._quarantined_count -= 1
+        self._epoch[sid] += 1
+        self._prob_ingested[sid] = 0
+        self._prob_scored[sid] = 0
+        self._ready_ingested += int(self._ingested[sid])
+        self._ready_scored += int(self._scored[sid])
+
+    # -------------------------
+    # Dirty tracking
+    # -------------------------
+
+    def _mark_dirty_many(self, sids: np.ndarray):
+        fresh = sids[~self._dirty_flag[sids]]
+        if fresh.size:
+            self._dirty_flag[fresh] = True
+            self._dirty_batches.append(fresh)
+
+    def _take_dirty(self) -> np.ndarray:
+        thresholds = (self.min_segment_ready, self.min_segment_samples)
+        if thresholds != self._checked_thresholds:
+            # thresholds changed since the last check: every segment is suspect
+            self._checked_thresholds = thresholds
+            sids = np.arange(self._size)
+        else:
+            sids = np.sort(np.concatenate([np.zeros(0, dtype=np.int64)] + self._dirty_batches))
+
+        self._dirty_flag[sids] = False
+        self._dirty_batches = []
+        return sids
+
+    # -------------------------
+    # Materialized views (v1-shaped; O(segments), for inspection only)
+    # -------------------------
+
+    @property
+    def ingested(self) -> Dict[str, int]:
+        self._sync()
+        return {
+            self._segment_name(sid): int(self._ingested[sid])
+            for sid in np.flatnonzero(self._ingested[:self._size]).tolist()
+        }
+
+    @property
+    def scored(self) -> Dict[str, int]:
+        self._sync()
+        return {
+            self._segment_name(sid): int(self._scored[sid])
+            for sid in np.flatnonzero(self._scored[:self._size]).tolist()
+        }
+
+    @property
+    def quarantined(self) -> set:
+        self._sync()
+        return {self._segment_name(sid) for sid in self._quarantined_ids().tolist()}
+
+    @property
+    def probation(self) -> Dict[str, Dict[str, int]]:
+        self._sync()
+        return {
+            self._segment_name(sid): {"ingested": int(self._prob_ingested[sid]), "scored": int(self._prob_scored[sid])}
+            for sid in self._probation_ids().tolist()
+        }
+
+    def _probation_ids(self) -> np.ndarray:
+        quarantined = self._quarantined_ids()
+        return quarantined[self._prob_ingested[quarantined] > 0]
+
+    # -------------------------
+    # Window
+    # -------------------------
+
+    def _advance(self, index: Optional[int] = None):
+        """Rotate the ring to bucket `index` (default: now), expiring any bucket that left the window."""
+        if not self._ring:
+            return
+        if index is None:
+            index = math.floor(self._clock() / self.bucket_seconds)
+        if self._bucket is not None and self._bucket.index == index:
+            return
+        slots = len(self._ring)
+        for slot, bucket in enumerate(self._ring):
+            if bucket is not None and bucket.index <= index - slots:
+                self._expire(bucket)
+                self._ring[slot] = None
+        bucket = self._ring[index % slots]
+        if bucket is None or bucket.index != index:
+            bucket = self._ring[index % slots] = _WindowBucket(index)
+        self._bucket = bucket
+
+    def _expire(self, bucket: _WindowBucket):
+        sids, ingested, scored, prob_ingested, prob_scored, epoch = bucket.columns()
+        if sids.size == 0:
+            return
+
+        np.subtract.at(self._ingested, sids, ingested)
+        np.subtract.at(self._scored, sids, scored)
+        self._total_ingested -= int(ingested.sum())
+        self._total_scored -= int(scored.sum())
+
+        held = self._quarantine_mask(sids)
+        self._ready_ingested -= int(ingested[~held].sum())
+        self._ready_scored -= int(scored[~held].sum())
+
+        live = held & (epoch == self._epoch[sids])
+        np.subtract.at(self._prob_ingested, sids[live], prob_ingested[live])
+        np.subtract.at(self._prob_scored, sids[live], prob_scored[live])
+
+        touched = np.unique(sids)
+        self._mark_dirty_many(touched)
+
+        idle = touched[(self._ingested[touched] == 0) & ~self._quarantine_mask(touched)]
+        if idle.size:
+            self._unlink(idle)
+            self._prob_ingested[idle] = 0
+            self._prob_scored[idle] = 0
+            self._free_ids.extend(idle.tolist())
+
+    def record_event(self, event: Dict[str, Any], scored: bool):
+        """Buffer one event; buffered events go through record_events, in order,
+        before anything reads the gate or the window moves to another bucket."""
+        if self._ring:
+            index = math.floor(self._clock() / self.bucket_seconds)
+            if index != self._pending_index:
+                self._flush_pending()
+                self._pending_index = index
+        bins, geos, devices, flags = self._pending
+        bins.append(event.get("bin", "unk"))
+        geos.append(event.get("geo", "unk"))
+        devices.append(event.get("device", "unk"))
+        flags.append(scored)
+        if len(flags) >= PENDING_EVENTS:
+            self._flush_pending()
+
+    def _flush_pending(self):
+        bins, geos, devices, flags = self._pending
+        if not flags:
+            return
+        self._pending = ([], [], [], [])
+        self._advance(self._pending_index)
+        columns = [np.array(column, dtype=object) for column in (bins, geos, devices)]
+        self._ingest(*columns, np.array(flags, dtype=bool))
+
+    def _sync(self):
+        """Apply buffered events, then move the window to the current bucket."""
+        self._flush_pending()
+        self._advance()
+
+    # -------------------------
+
+    def record_events(
+        self,
+        bins: Optional[Sequence[Any]],
+        geos: Optional[Sequence[Any]],
+        devices: Optional[Sequence[Any]],
+        scored: Sequence[bool],
+    ):
+        """Columnar equivalent of calling record_event once per row, in row order.
+
+        A column passed as None means the field is absent ("unk") for every row.
+        Counters are updated with one grouped pass; only quarantined segments
+        present in the batch replay their rows, because probation release
+        depends on where in the sequence the threshold is crossed.
+        """
+        self._sync()
+        self._ingest(bins, geos, devices, scored)
+
+    def _ingest(
+        self,
+        bins: Optional[Sequence[Any]],
+        geos: Optional[Sequence[Any]],
+        devices: Optional[Sequence[Any]],
+        scored: Sequence[bool],
+    ):
+        scored = np.asarray(scored, dtype=bool).reshape(-1)
+        n = scored.shape[0]
+        if n == 0:
+            return
+
+        packed = np.zeros(n, dtype=np.int64)
+        for field, column in enumerate((bins, geos, devices)):
+            local_codes, labels = _factorize(column, n)
+            to_global = np.array([self._part_code(field, label) for label in labels], dtype=np.int64)
+            packed = (packed << PART_BITS) | to_global[local_codes]
+
+        uniques, inverse = np.unique(packed, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        sids = self._segment_ids(uniques)
+
+        self._mark_dirty_many(sids)
+
+        ingested = np.bincount(inverse, minlength=len(sids))
+        scored_counts = np.bincount(inverse, weights=scored, minlength=len(sids)).astype(np.int64)
+        self._ingested[sids] += ingested
+        self._scored[sids] += scored_counts
+        self._total_ingested += n
+        self._total_scored += int(scored_counts.sum())
+        self._events_seen += n
+
+        held = self._quarantine_mask(sids)
+        self._ready_ingested += int(ingested[~held].sum())
+        self._ready_scored += int(scored_counts[~held].sum())
+
+        prob_ingested = np.zeros(len(sids), dtype=np.int64)
+        prob_scored = np.zeros(len(sids), dtype=np.int64)
+        quarantined = np.flatnonzero(held)
+        if quarantined.size:
+            order = np.argsort(inverse, kind="stable")
+            bounds = np.concatenate(([0], np.cumsum(ingested)))
+            for i in quarantined.tolist():
+                sid = int(sids[i])
+                if not self._replay_probation(sid, scored[order[bounds[i]:bounds[i + 1]]]):
+                    prob_ingested[i] = ingested[i]
+                    prob_scored[i] = scored_counts[i]
+
+        if self._bucket is not None:
+            self._bucket.chunks.append(
+                (sids, ingested.astype(np.int64), scored_counts, prob_ingested, prob_scored, self._epoch[sids].copy())
+            )
+
+    def _replay_probation(self, sid: int, scored: np.ndarray) -> bool:
+        cum_ingested = int(self._prob_ingested[sid]) + np.arange(1, scored.shape[0] + 1)
+        cum_scored = int(self._prob_scored[sid]) + np.cumsum(scored)
+
+        eligible = cum_ingested >= self.probation_samples
+        eligible &= (cum_scored / cum_ingested) >= self.min_segment_ready
+        if eligible.any():
+            self._release(sid)
+            return True
+
+        self._prob_ingested[sid] = cum_ingested[-1]
+        self._prob_scored[sid] = cum_scored[-1]
+        return False
+
+    # -------------------------
+
+    def evaluate(self) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            return self._evaluate()
+        finally:
+            elapsed = time.perf_counter() - start
+            self._evaluate_latency[np.searchsorted(EVALUATE_LATENCY_BUCKETS, elapsed)] += 1
+            self._evaluate_seconds += elapsed
+
+    def _evaluate(self) -> Dict[str, Any]:
+        self._sync()
+        ready_ingested = self._ready_ingested
+        ready_scored = self._ready_scored
+
+        reasons = []
+
+        dirty = self._take_dirty()
+        dirty = dirty[~self._quarantine_mask(dirty)]
+        ingested = self._ingested[dirty]
+        ratios = self._scored[dirty] / np.maximum(ingested, 1)
+        failed_ids = dirty[(ingested >= self.min_segment_samples) & (ratios < self.min_segment_ready)]
+        failed_ready = {
+            self._segment_name(sid): round(int(self._scored[sid]) / int(self._ingested[sid]), 6)
+            for sid in failed_ids.tolist()
+        }
+
+        coverage_ready = ready_scored / ready_ingested if ready_ingested else 1.0
+        worst_ready = min(failed_ready.values()) if failed_ready else 1.0
+
+        status = "ALIVE"
+
+        if coverage_ready < self.min_global_ready:
+            status = "DEGRADED"
+            reasons.append(
+                f"global_ready_coverage {coverage_ready:.4f} < {self.min_global_ready:.4f}"
+            )
+
+        if failed_ready:
+            status = "DEGRADED"
+            reasons.append(
+                f"{len(failed_ready)} ready segments < {self.min_segment_ready:.2f} (pre-quarantine)"
+            )
+
+        if status != "DEGRADED":
+            return {
+                "status": "ALIVE",
+                "coverage_global_ready": coverage_ready,
+                "worst_segment_ready": worst_ready,
+                "quarantined": self._quarantined_count,
+            }
+
+        # ready totals in the receipt are the pre-quarantine figures, as in v1.0
+        self._quarantine_add(failed_ids)
+
+        payload = {
+            "status": status,
+            "coverage_global_ready": coverage_ready,
+            "worst_segment_ready": worst_ready,
+            "ready_ingested_total": ready_ingested,
+            "ready_scored_total": ready_scored,
+            "total_ingested_all": self._total_ingested,
+            "total_scored_all": self._total_scored,
+            "failed_ready_segments": failed_ready,
+            "quarantined_segments": {self._segment_name(sid): True for sid in self._quarantined_ids().tolist()},
+            "probation_segments": {
+                self._segment_name(sid): {
+                    "prob_ingested": int(self._prob_ingested[sid]),
+                    "prob_scored": int(self._prob_scored[sid]),
+                    "prob_needed": self.probation_samples,
+                }
+                for sid in self._probation_ids().tolist()
+            },
+            "reasons": reasons,
+        }
+
+        receipt = CoverageReceipt.generate(self.system_id, payload)
+        return {"status": "DEGRADED", "receipt": asdict(receipt)}
+
+    # -------------------------
+    # Metrics
+    # -------------------------
+
+    def metrics(self) -> Dict[str, Any]:
+        """Read-only health snapshot for exporters.
+
+        Unlike evaluate() this never quarantines, releases, folds or expires
+        anything: counts are as of the last call that applied buffered
+        record_event calls (at most PENDING_EVENTS behind) and, in windowed
+        mode, advanced the window. events_total includes buffered events.
+        """
+        size = self._size
+        sids = np.arange(size)
+        ingested = self._ingested[:size]
+        ready = ~self._quarantine_mask(sids) & (ingested >= max(self.min_segment_samples, 1))
+        ratios = self._scored[:size][ready] / ingested[ready]
+        held = self._quarantined_ids()
+
+        return {
+            "coverage_global_ready": self._ready_scored / self._ready_ingested if self._ready_ingested else 1.0,
+            "worst_segment_ready": float(ratios.min()) if ratios.size else 1.0,
+            "segments": int(np.count_nonzero(ingested)),
+            "quarantined_segments": self._quarantined_count,
+            "probation_segments": int(np.count_nonzero(self._prob_ingested[held])),
+            "events_total": self._events_seen + len(self._pending[3]),
+            "ingested_total": self._total_ingested,
+            "scored_total": self._total_scored,
+            "evaluate_latency_buckets": dict(zip(EVALUATE_LATENCY_BUCKETS, np.cumsum(self._evaluate_latency[:-1]).tolist())),
+            "evaluate_latency_count": int(self._evaluate_latency.sum()),
+            "evaluate_latency_sum": self._evaluate_seconds,
+        }
+
+    # -------------------------
+    # Snapshot / restore / merge
+    # -------------------------
+
+    def _live_ids(self) -> np.ndarray:
+        sids = np.arange(self._size)
+        return sids[(self._ingested[:self._size] > 0) | self._quarantine_mask(sids)]
+
+    def _adopt(self, labels: Sequence[Sequence[str]], packed: np.ndarray) -> np.ndarray:
+        """Segment ids in this gate for packed codes built against another gate's labels."""
+        mask = PART_LIMIT - 1
+        local = np.zeros(packed.shape[0], dtype=np.int64)
+        for field, shift in enumerate((2 * PART_BITS, PART_BITS, 0)):
+            to_local = np.array([self._part_code(field, str(label)) for label in labels[field]], dtype=np.int64)
+            if to_local.size:
+                local = (local << PART_BITS) | to_local[(packed >> shift) & mask]
+        return self._segment_ids(local)
+
+    def _recount(self):
+        """Rebuild quarantine count and running sums from the arrays; re-check every segment next evaluate."""
+        size = self._size
+        held = self._quarantine_mask(np.arange(size))
+        self._quarantined_count = int(held.sum())
+        self._total_ingested = int(self._ingested[:size].sum())
+        self._total_scored = int(self._scored[:size].sum())
+        self._ready_ingested = int(self._ingested[:size][~held].sum())
+        self._ready_scored = int(self._scored[:size][~held].sum())
+        self._checked_thresholds = None
+
+    def snapshot(self, path: Union[str, Path]):
+        """Write counters, quarantine, probation and window buckets to a compressed .npz file."""
+        self._sync()
+        sids = self._live_ids()
+        remap = np.full(self._size, -1, dtype=np.int64)
+        remap[sids] = np.arange(sids.shape[0])
+
+        buckets = [b for b in self._ring if b is not None]
+        columns = [b.columns() for b in buckets]
+        bucket_rows = [
+            np.column_stack([np.full(c[0].shape[0], b.index, dtype=np.int64), remap[c[0]], *c[1:]])
+            for b, c in zip(buckets, columns)
+        ]
+
+        arrays = {
+            "version": np.array(SNAPSHOT_VERSION),
+            "system_id": np.array(self.system_id),
+            "thresholds": np.array([getattr(self, name) for name in THRESHOLD_FIELDS], dtype=np.float64),
+            "window": np.array([self.window_seconds or 0.0, self.bucket_seconds], dtype=np.float64),
+            "packed": self._packed[sids],
+            "ingested": self._ingested[sids],
+            "scored": self._scored[sids],
+            "prob_ingested": self._prob_ingested[sids],
+            "prob_scored": self._prob_scored[sids],
+            "epoch": self._epoch[sids],
+            "quarantined": self._quarantine_mask(sids),
+            "buckets": np.concatenate(bucket_rows) if bucket_rows else np.zeros((0, 7), dtype=np.int64),
+        }
+        for field, name in enumerate(SEGMENT_FIELDS):
+            arrays[f"labels_{name}"] = np.array(self._part_labels[field], dtype=str)
+
+        with open(path, "wb") as handle:
+            np.savez_compressed(handle, **arrays)
+
+    @classmethod
+    def restore(
+        cls,
+        path: Union[str, Path],
+        clock: Callable[[], float] = time.monotonic,
+    ) -> "CoverageLivenessGateV2":
+        """Rebuild a gate from snapshot(). Windowed state only lines up if `clock` matches the writer's
+        (use a wall clock such as time.time when window buckets must survive a restart)."""
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != SNAPSHOT_VERSION:
+                raise ValueError(f"unsupported snapshot version {int(data['version'])}")
+            thresholds = data["thresholds"].tolist()
+            window_seconds, bucket_seconds = data["window"].tolist()
+            gate = cls(
+                str(data["system_id"]),
+                min_global_ready=thresholds[0],
+                min_segment_ready=thresholds[1],
+                min_segment_samples=int(thresholds[2]),
+                probation_samples=int(thresholds[3]),
+                initial_capacity=int(data["packed"].shape[0]),
+                window_seconds=window_seconds or None,
+                bucket_seconds=bucket_seconds,
+                clock=clock,
+            )
+            labels = [data[f"labels_{name}"].tolist() for name in SEGMENT_FIELDS]
+            sids = gate._adopt(labels, data["packed"])
+
+            gate._ingested[sids] = data["ingested"]
+            gate._scored[sids] = data["scored"]
+            gate._prob_ingested[sids] = data["prob_ingested"]
+            gate._prob_scored[sids] = data["prob_scored"]
+            gate._epoch[sids] = data["epoch"]
+            gate._quarantine_set(sids[data["quarantined"]])
+
+            rows = data["buckets"]
+            if gate._ring and rows.shape[0]:
+                for index in np.unique(rows[:, 0]).tolist():
+                    chunk = rows[rows[:, 0] == index]
+                    bucket = gate._ring[index % len(gate._ring)] = _WindowBucket(index)
+                    bucket.chunks.append((sids[chunk[:, 1]], *(chunk[:, i].copy() for i in range(2, 7))))
+
+        gate._recount()
+        return gate
+
+    @classmethod
+    def merge(cls, system_id: str, shards: Iterable["CoverageLivenessGateV2"]) -> "CoverageLivenessGateV2":
+        """One cumulative gate over several shards: counters summed, quarantine unioned.
+
+        Shards must share thresholds. Probation progress is summed across the
+        shards that hold each segment in quarantine. Window buckets are not
+        carried over; the merged view counts what each shard currently holds.
+        """
+        shards = list(shards)
+        if not shards:
+            raise ValueError("merge needs at least one shard")
+        thresholds = {tuple(getattr(shard, name) for name in THRESHOLD_FIELDS) for shard in shards}
+        if len(thresholds) != 1:
+            raise ValueError("shards disagree on thresholds")
+        first = shards[0]
+        merged = cls(system_id, **{name: getattr(first, name) for name in THRESHOLD_FIELDS})
+
+        for shard in shards:
+            shard._sync()
+            source = shard._live_ids()
+            sids = merged._adopt(shard._part_labels, shard._packed[source])
+            held = shard._quarantine_mask(source)
+
+            merged._ingested[sids] += shard._ingested[source]
+            merged._scored[sids] += shard._scored[source]
+            merged._prob_ingested[sids] += np.where(held, shard._prob_ingested[source], 0)
+            merged._prob_scored[sids] += np.where(held, shard._prob_scored[source], 0)
+            merged._quarantine_set(sids[held])
+
+        merged._recount()
+        return merged
+
+
+# =========================
+# Concurrent mode
+# =========================
+
+class _ThreadBuffer:
+    """Events recorded by one thread and not yet folded into the shared gate."""
+
+    def __init__(self, owner: threading.Thread):
+        self.owner = owner
+        self.lock = threading.Lock()
+        self.bins: List[Any] = []
+        self.geos: List[Any] = []
+        self.devices: List[Any] = []
+        self.scored: List[bool] = []
+
+    def take(self) -> Tuple[List[Any], List[Any], List[Any], List[bool]]:
+        with self.lock:
+            taken = (self.bins, self.geos, self.devices, self.scored)
+            self.bins, self.geos, self.devices, self.scored = [], [], [], []
+        return taken
+
+
+class ConcurrentCoverageLivenessGate:
+    """Thread-safe front for CoverageLivenessGateV2.
+
+    record_event appends to a buffer owned by the calling thread, guarded by
+    that buffer's own (uncontended) lock. A full buffer, flush() or
+    evaluate() folds buffers into the shared gate through record_events
+    while holding the gate lock, so quarantine and probation transitions run
+    single-threaded. Per-thread event order is preserved; ordering between
+    threads is whatever order their buffers are folded in.
+    """
+
+    def __init__(self, system_id: str, flush_events: int = 4096, **gate_options: Any):
+        self.system_id = system_id
+        self.gate = CoverageLivenessGateV2(system_id, **gate_options)
+        self.flush_events = flush_events
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._buffers: List[_ThreadBuffer] = []
+        self._buffers_lock = threading.Lock()
+
+    def _buffer(self) -> _ThreadBuffer:
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._local.buffer = _ThreadBuffer(threading.current_thread())
+            with self._buffers_lock:
+                self._buffers.append(buffer)
+        return buffer
+
+    def _fold(self, buffer: _ThreadBuffer):
+        bins, geos, devices, scored = buffer.take()
+        if scored:
+            self.gate.record_events(bins, geos, devices, scored)
+
+    # -------------------------
+
+    def record_event(self, event: Dict[str, Any], scored: bool):
+        buffer = self._buffer()
+        with buffer.lock:
+            buffer.bins.append(event.get("bin", "unk"))
+            buffer.geos.append(event.get("geo", "unk"))
+            buffer.devices.append(event.get("device", "unk"))
+            buffer.scored.append(scored)
+            full = len(buffer.scored) >= self.flush_events
+        if full:
+            with self._lock:
+                self._fold(buffer)
+
+    def record_events(
+        self,
+        bins: Optional[Sequence[Any]],
+        geos: Optional[Sequence[Any]],
+        devices: Optional[Sequence[Any]],
+        scored: Sequence[bool],
+    ):
+        buffer = self._buffer()
+        with self._lock:
+            self._fold(buffer)
+            self.gate.record_events(bins, geos, devices, scored)
+
+    def flush(self):
+        """Fold every thread's buffer into the shared gate; buffers of finished threads are dropped."""
+        with self._buffers_lock:
+            buffers = list(self._buffers)
+            self._buffers = [b for b in buffers if b.owner.is_alive()]
+        with self._lock:
+            for buffer in buffers:
+                self._fold(buffer)
+
+    def evaluate(self) -> Dict[str, Any]:
+        self.flush()
+        with self._lock:
+            return self.gate.evaluate()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Gate metrics without folding buffers: folding can release probation, scraping must not."""
+        with self._lock:
+            return self.gate.metrics()
+
+    def snapshot(self, path: Union[str, Path]):
+        self.flush()
+        with self._lock:
+            self.gate.snapshot(path)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Prometheus text exposition for Coverage Liveness Gate v2.
+
+Reads gate.metrics() only, so a scrape never quarantines, releases or folds
+anything. Served from a local HTTP endpoint or written to a node_exporter
+textfile-collector file.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, List, Optional, Tuple, Union
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+GAUGES = (
+    ("coverage_global_ready", "clg_coverage_global_ready", "Scored/ingested ratio over non-quarantined segments."),
+    ("worst_segment_ready", "clg_worst_segment_ready", "Lowest ratio among ready segments with enough samples."),
+    ("segments", "clg_segments", "Segments with at least one counted event."),
+    ("quarantined_segments", "clg_quarantined_segments", "Segments currently quarantined."),
+    ("probation_segments", "clg_probation_segments", "Quarantined segments with probation progress."),
+)
+COUNTERS = (
+    ("events_total", "clg_events_total", "Events recorded since the gate was created."),
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsExporter:
+    """Renders one gate's metrics; keeps the previous scrape to derive events/sec."""
+
+    def __init__(self, gate: Any, clock=time.monotonic):
+        self.gate = gate
+        self._clock = clock
+        self._previous: Optional[Tuple[float, int]] = None
+        self._lock = threading.Lock()
+
+    def _events_per_second(self, events_total: int) -> float:
+        with self._lock:
+            now = self._clock()
+            previous, self._previous = self._previous, (now, events_total)
+        if previous is None or now <= previous[0]:
+            return 0.0
+        return (events_total - previous[1]) / (now - previous[0])
+
+    def render(self) -> str:
+        metrics = self.gate.metrics()
+        label = f'system_id="{_escape(self.gate.system_id)}"'
+        lines: List[str] = []
+
+        for key, name, help_text in GAUGES:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name}{{{label}}} {metrics[key]}"]
+        for key, name, help_text in COUNTERS:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter", f"{name}{{{label}}} {metrics[key]}"]
+
+        rate = self._events_per_second(metrics["events_total"])
+        lines += [
+            "# HELP clg_events_per_second Event rate since the previous scrape.",
+            "# TYPE clg_events_per_second gauge",
+            f"clg_events_per_second{{{label}}} {rate:.3f}",
+        ]
+
+        name = "clg_evaluate_latency_seconds"
+        lines += [f"# HELP {name} Wall time of evaluate() calls.", f"# TYPE {name} histogram"]
+        for bound, count in metrics["evaluate_latency_buckets"].items():
+            lines.append(f'{name}_bucket{{{label},le="{bound}"}} {count}')
+        lines += [
+            f'{name}_bucket{{{label},le="+Inf"}} {metrics["evaluate_latency_count"]}',
+            f"{name}_sum{{{label}}} {metrics['evaluate_latency_sum']}",
+            f"{name}_count{{{label}}} {metrics['evaluate_latency_count']}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: Union[str, Path]):
+        """Atomically replace `path` so the textfile collector never reads a partial file."""
+        path = Path(path)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(self.render(), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def serve(self, host: str = "127.0.0.1", port: int = 9464) -> ThreadingHTTPServer:
+        """Serve /metrics from a daemon thread; call shutdown() on the returned server to stop."""
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
@@ -1,6 +1,119 @@
-from z3 import *
+try:
+    from z3 import *
+except ImportError:  # z3 is only needed for the "z3" and "cross_check" modes
+    Solver = None
 import json
+import threading
 import time
+from collections import deque
+from dataclasses import dataclass
+
+# Per-request amount caps. The Z3 laws and the compiled table are both built
+# from these, so the two paths cannot drift apart.
+TIER_CAPS = {"STANDARD": 100}
+THREAT_CAPS = {"HIGH": 500}
+ANY = "*"
+MODES = ("compiled", "z3", "cross_check")
+VIOLATION_WINDOW_SECONDS = 60
+
+
+class PolicyDivergence(RuntimeError):
+    """Raised in cross_check mode when the compiled policy and Z3 disagree."""
+
+
+def _is_integral(value):
+    """True for values an Int can equal: ints (bools included) and whole floats, as in Z3."""
+    return isinstance(value, int) or (isinstance(value, float) and value.is_integer())
+
+
+@dataclass(frozen=True)
+class CompiledPolicy:
+    """Closed form of the governor's laws: a (tier, threat) -> max_amount table plus integer comparisons.
+
+    Every law is a linear bound on `amount` or an equality between concrete
+    request values, so satisfiability reduces to checking them directly.
+    amount and balance are Z3 Ints, so a value no integer can equal (50.5,
+    NaN, a string) makes the request unsatisfiable.
+    ANY stands for tiers/threats without a cap of their own; None means no cap.
+    """
+
+    caps: dict
+
+    def max_amount(self, tier, threat):
+        for key in ((tier, threat), (tier, ANY), (ANY, threat)):
+            if key in self.caps:
+                return self.caps[key]
+        return self.caps[(ANY, ANY)]
+
+    def admits_stateless(self, req_a, req_b, threat):
+        """Every law except the budget, which depends on spend so far."""
+        cap = self.max_amount(req_a['tier'], threat)
+        amount, balance = req_a['amount'], req_a['balance']
+        return (
+            _is_integral(amount)
+            and _is_integral(balance)
+            and req_a['key'] == req_b['key']
+            and balance >= 0
+            and (cap is None or amount <= cap)
+            and amount == req_b['amount']
+        )
+
+    def admits(self, req_a, req_b, threat, spend, budget):
+        return self.admits_stateless(req_a, req_b, threat) and spend + req_a['amount'] <= budget
+
+
+def compile_policy(tier_caps=TIER_CAPS, threat_caps=THREAT_CAPS):
+    """Precompute the cap for every named (tier, threat) pair and the wildcard fallbacks."""
+    tiers = {ANY: None, **tier_caps}
+    threats = {ANY: None, **threat_caps}
+    caps = {}
+    for tier, tier_cap in tiers.items():
+        for threat, threat_cap in threats.items():
+            bounds = [cap for cap in (tier_cap, threat_cap) if cap is not None]
+            caps[(tier, threat)] = min(bounds) if bounds else None
+    return CompiledPolicy(caps)
+
+
+class _PolicySolver:
+    """One thread's Z3 context with the static laws asserted once.
+
+    Z3 contexts are not thread-safe, so every thread that checks requests
+    gets its own context, solver and symbolic state.
+    """
+
+    def __init__(self):
+        self.ctx = Context()
+        self.s = Solver(ctx=self.ctx)
+
+        # Symbolic State
+        self.balance = Int('balance', self.ctx)
+        self.amount = Int('amount', self.ctx)
+        self.tier = String('tier', self.ctx)
+        self.threat_level = String('env.threat', self.ctx)
+        self.agent_a_amt = Int('agent.a.amount', self.ctx)
+        self.agent_b_amt = Int('agent.b.amount', self.ctx)
+
+        # GATE 2 & 4: MATH & RISK LAWS
+        self.s.add(self.balance >= 0)
+        for tier, cap in TIER_CAPS.items():
+            self.s.add(Implies(self.tier == StringVal(tier, self.ctx), self.amount <= cap))
+        for threat, cap in THREAT_CAPS.items():
+            self.s.add(Implies(self.threat_level == StringVal(threat, self.ctx), self.amount <= cap))
+
+        # GATE 5: CONSENSUS LAWS
+        self.s.add(self.agent_a_amt == self.agent_b_amt)
+
+    def check(self, req_a, req_b, threat):
+        return str(self.s.check(
+            BoolVal(req_a['key'] == req_b['key'], self.ctx),
+            self.balance == req_a['balance'],
+            self.amount == req_a['amount'],
+            self.tier == StringVal(req_a['tier'], self.ctx),
+            self.threat_level == StringVal(threat, self.ctx),
+            self.agent_a_amt == req_a['amount'],
+            self.agent_b_amt == req_b['amount'],
+        ))
+
 
 class IndustrialGovernor:
     """
@@ -14,23 +127,67 @@ class IndustrialGovernor:
     4. Contextual Risk (Threat-Aware)
     5. Multi-Agent Consensus (Byzantine Tolerance)
     6. Stateful Stability (Circuit Breaker)
+
+    mode="compiled" (default) decides gates 2, 4 and 5 with the compiled
+    closed-form policy and never calls Z3. mode="z3" uses a per-thread solver
+    with the static laws asserted once; each request only supplies its facts
+    as check() assumptions. mode="cross_check" runs both and raises
+    PolicyDivergence if they disagree.
+
+    The budget law is the only one that reads shared state. It is applied as
+    an integer comparison together with the circuit breaker and the spend
+    update under one lock, so concurrent callers cannot overspend or lose
+    violations; the stateless laws run outside the lock.
     """
-    def __init__(self, daily_budget=5000, failure_threshold=3):
-        self.s = Solver()
+    def __init__(self, daily_budget=5000, failure_threshold=3, mode="compiled"):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        if mode != "compiled" and Solver is None:
+            raise RuntimeError(f"mode={mode!r} requires the z3-solver package")
+        self.mode = mode
+        self.policy = compile_policy()
         self.daily_budget = daily_budget
         self.cumulative_spend = 0
         self.failure_threshold = failure_threshold
-        self.violation_timestamps = []
+        self.violation_timestamps = deque()
         self.is_hard_locked = False
-        
-        # Symbolic State
-        self.balance = Int('balance')
-        self.amount = Int('amount')
-        self.tier = String('tier')
-        self.status = String('status')
-        self.threat_level = String('env.threat')
-        self.agent_a_amt = Int('agent.a.amount')
-        self.agent_b_amt = Int('agent.b.amount')
+        self._state_lock = threading.Lock()
+        self._solvers = threading.local()
+
+    def _solver(self):
+        solver = getattr(self._solvers, "solver", None)
+        if solver is None:
+            solver = self._solvers.solver = _PolicySolver()
+        return solver
+
+    def _stateless_checks(self, requests):
+        """Math verdict of each request ignoring the budget, solved once per distinct fact set."""
+        verdicts = {}
+        results = []
+        for req_a, req_b, _, env_context, *_ in requests:
+            threat = env_context.get('threat', 'LOW')
+            # every fact a law reads, by value: balance -1 and 99.99 fail for different reasons
+            key = (
+                req_a['key'] == req_b['key'], req_a['balance'], req_a['amount'],
+                req_a['tier'], threat, req_b['amount'],
+            )
+            verdict = verdicts.get(key)
+            if verdict is None:
+                verdict = verdicts[key] = self._stateless_check(req_a, req_b, threat)
+            results.append(verdict)
+        return results
+
+    def _stateless_check(self, req_a, req_b, threat):
+        """Return "sat", "unsat" (or Z3's "unknown") for every law except the budget."""
+        compiled = None
+        if self.mode != "z3":
+            compiled = "sat" if self.policy.admits_stateless(req_a, req_b, threat) else "unsat"
+            if self.mode == "compiled":
+                return compiled
+        solved = self._solver().check(req_a, req_b, threat)
+        if compiled is not None and solved != compiled:
+            raise PolicyDivergence(f"compiled={compiled} z3={solved} for {req_a!r} / {req_b!r} / {threat!r}")
+        return solved
 
     def _qualify_process(self, tx_data):
         violations = []
@@ -41,47 +198,57 @@ class IndustrialGovernor:
         return violations
 
     def authorize(self, req_a, req_b, tx_context, env_context, auth_token=1):
+        # cheap unlocked look at the breaker; _decide re-checks it under the lock
+        if self.is_hard_locked and auth_token <= 9:
+            return {"verdict": "FAIL_CLOSED", "reason": "SYSTEM_HARD_LOCK"}
+
+        math = self._stateless_check(req_a, req_b, env_context.get('threat', 'LOW'))
+        proc_violations = self._qualify_process(tx_context)
+        with self._state_lock:
+            return self._decide(math, proc_violations, req_a['amount'], auth_token)
+
+    def authorize_batch(self, requests):
+        """authorize() over (req_a, req_b, tx_context, env_context[, auth_token]) tuples, in order.
+
+        Verdicts, spend and circuit-breaker state end up exactly as if each
+        request had gone through authorize(). The stateless laws and process
+        checks are evaluated up front (deduplicated across identical fact
+        sets); only the budget and circuit breaker run sequentially, as one
+        atomic step per batch.
+        """
+        requests = list(requests)
+        stateless = self._stateless_checks(requests)
+        violations = [self._qualify_process(request[2]) for request in requests]
+
+        with self._state_lock:
+            return [
+                self._decide(math, proc_violations, request[0]['amount'], request[4] if len(request) > 4 else 1)
+                for request, math, proc_violations in zip(requests, stateless, violations)
+            ]
+
+    def _decide(self, math, proc_violations, amount, auth_token):
+        """Circuit breaker, budget and bookkeeping for one request. Caller holds _state_lock."""
         # GATE 6: CIRCUIT BREAKER
         if self.is_hard_locked:
             if auth_token > 9:
-                self.is_hard_locked, self.violation_timestamps = False, []
+                self.is_hard_locked = False
+                self.violation_timestamps.clear()
             else:
                 return {"verdict": "FAIL_CLOSED", "reason": "SYSTEM_HARD_LOCK"}
 
-        self.s.push()
-        
-        # GATE 2 & 4: MATH & RISK LAWS
-        self.s.add(self.balance >= 0)
-        self.s.add(Implies(self.tier == StringVal("STANDARD"), self.amount <= 100))
-        self.s.add(Implies(self.threat_level == StringVal("HIGH"), self.amount <= 500))
-        self.s.add(self.cumulative_spend + self.amount <= self.daily_budget)
-        
-        # GATE 5: CONSENSUS LAWS
-        self.s.add(self.agent_a_amt == self.agent_b_amt)
-        self.s.add(req_a['key'] == req_b['key'])
-
-        # Inject Context
-        self.s.add(self.balance == req_a['balance'])
-        self.s.add(self.amount == req_a['amount'])
-        self.s.add(self.tier == StringVal(req_a['tier']))
-        self.s.add(self.threat_level == StringVal(env_context.get('threat', 'LOW')))
-        self.s.add(self.agent_a_amt == req_a['amount'])
-        self.s.add(self.agent_b_amt == req_b['amount'])
-
-        # Final Decision
-        z3_check = self.s.check()
-        proc_violations = self._qualify_process(tx_context)
-        
-        if z3_check == unsat or proc_violations:
-            self.s.pop()
+        if math != "unsat" and self.cumulative_spend + amount > self.daily_budget:
+            math = "unsat"
+
+        if math == "unsat" or proc_violations:
             now = time.time()
-            self.violation_timestamps = [t for t in self.violation_timestamps if now - t < 60]
-            self.violation_timestamps.append(now)
-            if len(self.violation_timestamps) >= self.failure_threshold:
+            window = self.violation_timestamps
+            while window and now - window[0] >= VIOLATION_WINDOW_SECONDS:
+                window.popleft()
+            window.append(now)
+            if len(window) >= self.failure_threshold:
                 self.is_hard_locked = True
                 return {"verdict": "FAIL_CLOSED", "reason": "CIRCUIT_TRIPPED"}
-            return {"verdict": "FAIL_CLOSED", "audit": {"math": str(z3_check), "process": proc_violations}}
+            return {"verdict": "FAIL_CLOSED", "audit": {"math": math, "process": proc_violations}}
 
-        self.cumulative_spend += req_a['amount']
-        self.s.pop()
+        self.cumulative_spend += amount
         return {"verdict": "QUALIFIED", "new_burn": self.cumulative_spend}
@@ -3,12 +3,122 @@ Streamlit Dashboard for Fail-Closed Decision Gate
 
 Runs locally, in Colab, or anywhere Streamlit is supported.
 No external services. No databases. Deterministic.
+
+Uploaded evidence is parsed and indexed once per distinct upload set (keyed
+by content hash) in a background thread, so reruns triggered by widgets
+reuse the cached EvidenceIndex instead of re-reading the files. Only the
+index is shared between sessions; every verification runs on its own
+VerificationGate and therefore gets its own trace_id and trace file.
 """
 
 import streamlit as st
+import hashlib
 import json
-from pathlib import Path
-from gate import VerificationGate, Decision
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Tuple
+from gate import VerificationGate, Decision, EvidenceIndex
+
+
+PAGE_SIZES = (25, 100, 500)
+POLL_SECONDS = 0.25
+
+
+def _evidence_item(name: str, item: Any) -> Dict[str, Any]:
+    if not isinstance(item, dict):
+        raise ValueError(f"{name}: evidence items must be JSON objects, got {type(item).__name__}")
+    return item
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos] in " \t\r\n":
+        pos += 1
+    return pos
+
+
+def iter_json_array(text: str) -> Iterator[Tuple[Any, int]]:
+    """Yield (element, end position) for a JSON array as strictly as json.loads would parse it."""
+    decoder = json.JSONDecoder()
+    pos = _skip_whitespace(text, 0)
+    if not text.startswith("[", pos):
+        raise json.JSONDecodeError("Expecting '['", text, pos)
+    pos = _skip_whitespace(text, pos + 1)
+    if text.startswith("]", pos):
+        pos += 1
+    else:
+        while True:
+            item, pos = decoder.raw_decode(text, pos)
+            yield item, pos
+            pos = _skip_whitespace(text, pos)
+            if text.startswith("]", pos):
+                pos += 1
+                break
+            if not text.startswith(",", pos):
+                raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+            pos = _skip_whitespace(text, pos + 1)
+    if _skip_whitespace(text, pos) != len(text):
+        raise json.JSONDecodeError("Extra data", text, pos)
+
+
+def iter_evidence(name: str, data: bytes) -> Iterator[Tuple[Dict[str, Any], int]]:
+    """Yield (evidence item, bytes of `data` consumed) without decoding a JSON array in one call."""
+    if name.endswith(".jsonl"):
+        consumed = 0
+        for line in data.splitlines(keepends=True):
+            consumed += len(line)
+            if line.strip():
+                yield _evidence_item(name, json.loads(line)), consumed
+    elif name.endswith(".json"):
+        text = data.decode("utf-8")
+        ascii_only = len(text) == len(data)
+        consumed = last = 0
+        for item, pos in iter_json_array(text):
+            # positions are characters; progress is reported in bytes like the job total
+            consumed += pos - last if ascii_only else len(text[last:pos].encode("utf-8"))
+            last = pos
+            yield _evidence_item(name, item), consumed
+    else:
+        yield {"id": name, "content": data.decode("utf-8")}, len(data)
+
+
+class EvidenceJob:
+    """Parses and indexes one upload set on a background thread."""
+
+    def __init__(self, files: List[Tuple[str, bytes]]):
+        self.total = sum(len(data) for _, data in files) or 1
+        self.consumed = 0
+        self.items = 0
+        self.index = None
+        self.error = None
+        self.done = threading.Event()
+        threading.Thread(target=self._run, args=(files,), daemon=True).start()
+
+    @property
+    def progress(self) -> float:
+        return min(self.consumed / self.total, 1.0)
+
+    def _run(self, files: List[Tuple[str, bytes]]) -> None:
+        try:
+            evidence, offset = [], 0
+            for name, data in files:
+                for item, consumed in iter_evidence(name, data):
+                    evidence.append(item)
+                    self.items = len(evidence)
+                    self.consumed = offset + consumed
+                offset += len(data)
+            # an upload with no items leaves index None, so the gate reports missing evidence
+            self.index = EvidenceIndex(evidence) if evidence else None
+        except Exception as exc:
+            self.error = f"{type(exc).__name__}: {exc}"
+        finally:
+            self.consumed = self.total
+            self.done.set()
+
+
+@st.cache_resource(max_entries=4)
+def evidence_job(digest: str, _files: List[Tuple[str, bytes]]) -> EvidenceJob:
+    # keyed on `digest` only; the underscore keeps Streamlit from hashing the payload
+    return EvidenceJob(_files)
 
 
 st.set_page_config(
@@ -40,9 +150,6 @@ with st.sidebar:
     )
 
 
-gate = VerificationGate(min_support=min_support)
-
-
 # --- Main layout ---
 col1, col2 = st.columns(2)
 
@@ -57,55 +164,81 @@ with col1:
 with col2:
     st.subheader("2. Evidence")
     uploads = st.file_uploader(
-        "Upload evidence files (.txt or .json)",
+        "Upload evidence files (.txt, .json or .jsonl)",
         accept_multiple_files=True
     )
 
-    evidence = []
+    index = None
+    evidence_key = None
     if uploads:
-        for f in uploads:
-            content = f.read().decode("utf-8")
-            if f.name.endswith(".json"):
-                evidence.extend(json.loads(content))
-            else:
-                evidence.append({"id": f.name, "content": content})
-        st.success(f"{len(evidence)} evidence items loaded.")
+        files = [(f.name, f.getvalue()) for f in uploads]
+        digest = hashlib.sha256()
+        for name, data in files:
+            digest.update(name.encode("utf-8") + b"\0" + hashlib.sha256(data).digest())
+        evidence_key = digest.hexdigest()
+        job = evidence_job(evidence_key, files)
+
+        if not job.done.is_set():
+            st.progress(job.progress, text=f"Parsing evidence… {job.items} items")
+            time.sleep(POLL_SECONDS)
+            st.rerun()
+        if job.error:
+            st.error(f"Could not parse evidence: {job.error}")
+        elif job.index is None:
+            st.warning("The uploaded files contain no evidence items.")
+        else:
+            index = job.index
+            st.success(f"{index.size} evidence items loaded.")
 
 
 # --- Execute ---
 st.divider()
 
 if st.button("Run Verification", use_container_width=True):
-    if not claims_text or not evidence:
+    if not claims_text or index is None:
         st.error("Both claims and evidence are required.")
+        st.session_state.pop("verification", None)
     else:
-        result = gate.verify(claims_text, evidence)
-
-        color = {
-            Decision.ALLOW: "green",
-            Decision.BLOCK: "red",
-            Decision.ESCALATE: "orange",
-        }[result.decision]
-
-        st.markdown(f"## Result: :{color}[{result.decision.value}]")
-
-        for r in result.reasons:
-            st.write(f"• {r}")
-
-        st.subheader("Audit Details")
-        rows = []
-        supports = result.meta.get("supports", {})
-
-        for claim, count in supports.items():
-            rows.append({
-                "Claim": claim,
-                "Support Count": count
-            })
-
-        if rows:
-            st.table(rows)
-
-        st.caption(f"Trace ID: {result.trace_id}")
+        with VerificationGate(min_support=int(min_support)) as gate:
+            result = gate.verify(claims_text, index)
+        st.session_state["verification"] = {
+            "inputs": (claims_text, evidence_key, int(min_support)),
+            "result": result,
+        }
+
+# kept across reruns so paging the table does not re-run the gate
+verification = st.session_state.get("verification")
+if verification and verification["inputs"] == (claims_text, evidence_key, int(min_support)):
+    result = verification["result"]
+
+    color = {
+        Decision.ALLOW: "green",
+        Decision.BLOCK: "red",
+        Decision.ESCALATE: "orange",
+    }[result.decision]
+
+    st.markdown(f"## Result: :{color}[{result.decision.value}]")
+
+    for r in result.reasons:
+        st.write(f"• {r}")
+
+    st.subheader("Audit Details")
+    supports = list(result.meta.get("supports", {}).items())
+
+    if supports:
+        size_col, page_col = st.columns(2)
+        page_size = size_col.selectbox("Claims per page", PAGE_SIZES)
+        pages = (len(supports) + page_size - 1) // page_size
+        page = page_col.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1)
+        start = (int(page) - 1) * page_size
+        rows = [
+            {"Claim": claim, "Support Count": count}
+            for claim, count in supports[start:start + page_size]
+        ]
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+        st.caption(f"Claims {start + 1}–{start + len(rows)} of {len(supports)}")
+
+    st.caption(f"Trace ID: {result.trace_id}")
 
 
 # --- Footer ---
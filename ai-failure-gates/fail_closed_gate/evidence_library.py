@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Persistent evidence library for the Fail-Closed Decision Gate.
+
+A library is a directory of immutable segments plus a manifest:
+
+    manifest.json        segment names, removed documents per segment, generation
+    seg-000001/
+        content.bin      lowercased UTF-8 documents, each followed by NUL
+        offsets.bin      int64 byte offset of every document, plus the end
+        postings.bin     uint32 document numbers, grouped per token
+        lexicon.json     token -> [first posting, posting count]
+        docs.json        document ids and the numbers of blank documents
+
+Content, offsets and postings are memory-mapped, so support counts are
+answered with bytes.find over the mapping instead of Python strings. Adding
+evidence writes a new segment; removing it records a tombstone (segment and
+document number) in the manifest. compact() folds the live documents back
+into one segment.
+
+Segments are built in a hidden temporary directory and renamed into place,
+and only become part of the library when the manifest names them. A crash
+before that commit leaves an unreferenced directory behind: later writes
+skip its name and compact() deletes it.
+
+Support semantics match EvidenceIndex exactly: a document supports a claim
+when its lowercased content contains the lowercased claim.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import os
+import shutil
+import sys
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from gate import DOC_SEPARATOR, SCAN_FRACTION, TOKEN, Vocabulary, candidate_docs
+
+MANIFEST = "manifest.json"
+LIBRARY_VERSION = 1
+SEPARATOR = DOC_SEPARATOR.encode("utf-8")
+
+
+class EvidenceLibraryError(RuntimeError):
+    """Raised when a library is missing, malformed or asked to hold duplicate ids."""
+
+
+def _write_json(path: Path, value: Any) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(value), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _map(path: Path, typecode: str):
+    """Read-only memoryview over `path`, or an empty array for empty files."""
+    if path.stat().st_size == 0:
+        return array(typecode)
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return mapped if typecode == "B" else memoryview(mapped).cast(typecode)
+
+
+def load_evidence(path: Union[str, Path]) -> List[Dict[str, Any]]:
+    """Evidence dicts from a .json list, a .jsonl file or a plain-text file."""
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".json":
+        return json.loads(text)
+    if path.suffix == ".jsonl":
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    return [{"id": path.name, "content": text}]
+
+
+def write_segment(directory: Path, evidence: List[Dict[str, Any]], ids: List[str]) -> None:
+    tmp = directory.with_name(f".{directory.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    offsets = array("q", [0])
+    postings: Dict[str, List[int]] = {}
+    blank = []
+    with open(tmp / "content.bin", "wb") as content:
+        for number, item in enumerate(evidence):
+            text = item.get("content", "")
+            if not text.strip():
+                blank.append(number)
+            doc = text.lower()
+            for token in set(TOKEN.findall(doc)):
+                postings.setdefault(token, []).append(number)
+            data = doc.encode("utf-8") + SEPARATOR
+            content.write(data)
+            offsets.append(offsets[-1] + len(data))
+
+    flat = array("I")
+    lexicon = {}
+    for token, numbers in postings.items():
+        lexicon[token] = [len(flat), len(numbers)]
+        flat.extend(numbers)
+
+    with open(tmp / "offsets.bin", "wb") as f:
+        offsets.tofile(f)
+    with open(tmp / "postings.bin", "wb") as f:
+        flat.tofile(f)
+    _write_json(tmp / "lexicon.json", lexicon)
+    _write_json(tmp / "docs.json", {"ids": ids, "blank": blank})
+    os.replace(tmp, directory)
+
+
+class Segment:
+    """One immutable, memory-mapped slice of the library."""
+
+    def __init__(self, directory: Path, dead: Iterable[int]):
+        self.directory = directory
+        docs = json.loads((directory / "docs.json").read_text(encoding="utf-8"))
+        self.ids: List[str] = docs["ids"]
+        self.blank: List[int] = docs["blank"]
+        self.lexicon: Dict[str, List[int]] = json.loads((directory / "lexicon.json").read_text(encoding="utf-8"))
+        self.content = _map(directory / "content.bin", "B")
+        self.offsets = _map(directory / "offsets.bin", "q")
+        self.postings = _map(directory / "postings.bin", "I")
+        self.vocabulary = Vocabulary(self.lexicon)
+        self.dead = set(dead)
+        self.size = len(self.ids)
+
+    def text(self, number: int) -> str:
+        return bytes(self.content[self.offsets[number]:self.offsets[number + 1] - 1]).decode("utf-8")
+
+    def count(self, needle: str, raw: bytes) -> int:
+        candidates = candidate_docs(needle, self._postings_of, self.vocabulary, self.size)
+        if candidates is None:
+            return self._scan(raw)
+        if self.dead:
+            candidates = [n for n in candidates if n not in self.dead]
+        if len(candidates) > SCAN_FRACTION * self.size:
+            return self._scan(raw)
+        offsets, find = self.offsets, self.content.find
+        return sum(find(raw, offsets[n], offsets[n + 1] - 1) != -1 for n in candidates)
+
+    def _postings_of(self, token: str):
+        entry = self.lexicon.get(token)
+        if entry is None:
+            return ()
+        start, length = entry
+        return self.postings[start:start + length]
+
+    def _scan(self, raw: bytes) -> int:
+        offsets, find = self.offsets, self.content.find
+        if not raw:
+            return self.size - len(self.dead)
+        if SEPARATOR in raw:
+            return sum(find(raw, offsets[n], offsets[n + 1] - 1) != -1 for n in range(self.size) if n not in self.dead)
+        count = 0
+        pos = find(raw)
+        while pos != -1:
+            number = bisect_right(offsets, pos) - 1
+            if number not in self.dead:
+                count += 1
+            if number + 1 >= self.size:
+                break
+            pos = find(raw, offsets[number + 1])
+        return count
+
+    def close(self) -> None:
+        for view in (self.offsets, self.postings):
+            if isinstance(view, memoryview):
+                view.release()
+        if isinstance(self.content, mmap.mmap):
+            self.content.close()
+
+
+class EvidenceLibrary:
+    """Opened library; a drop-in for EvidenceIndex in VerificationGate.verify."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._load()
+
+    def _load(self) -> None:
+        manifest_path = self.path / MANIFEST
+        if not manifest_path.exists():
+            raise EvidenceLibraryError(f"no evidence library at {self.path}")
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest.get("version") != LIBRARY_VERSION:
+            raise EvidenceLibraryError(f"unsupported library version {manifest.get('version')}")
+        self.manifest = manifest
+        self.generation: int = manifest["generation"]
+        tombstones = manifest["tombstones"]
+        self.segments = [Segment(self.path / name, tombstones.get(name, ())) for name in manifest["segments"]]
+        self.size = sum(segment.size - len(segment.dead) for segment in self.segments)
+        live_blank = any(n not in segment.dead for segment in self.segments for n in segment.blank)
+        self.valid = self.size > 0 and not live_blank
+
+    @classmethod
+    def build(cls, path: Union[str, Path], evidence: List[Dict[str, Any]]) -> "EvidenceLibrary":
+        """Create a new library at `path` holding `evidence`."""
+        path = Path(path)
+        if (path / MANIFEST).exists():
+            raise EvidenceLibraryError(f"evidence library already exists at {path}")
+        path.mkdir(parents=True, exist_ok=True)
+        _write_json(path / MANIFEST, {"version": LIBRARY_VERSION, "generation": 0, "next_segment": 1, "segments": [], "tombstones": {}})
+        library = cls(path)
+        library.add(evidence)
+        return library
+
+    def support_counts(self, claims: Iterable[str]) -> Dict[str, int]:
+        counts = {}
+        for claim in claims:
+            if claim not in counts:
+                counts[claim] = self.count(claim.lower())
+        return counts
+
+    def count(self, needle: str) -> int:
+        """Live documents containing `needle` (already lowercased)."""
+        raw = needle.encode("utf-8")
+        return sum(segment.count(needle, raw) for segment in self.segments)
+
+    def ids(self) -> List[str]:
+        return [doc_id for segment in self.segments for n, doc_id in enumerate(segment.ids) if n not in segment.dead]
+
+    def documents(self) -> Iterable[Dict[str, Any]]:
+        """Live documents as stored (lowercased content)."""
+        for segment in self.segments:
+            for n, doc_id in enumerate(segment.ids):
+                if n not in segment.dead:
+                    yield {"id": doc_id, "content": segment.text(n)}
+
+    def add(self, evidence: List[Dict[str, Any]]) -> List[str]:
+        """Write `evidence` as a new segment; documents without an id get one."""
+        if not evidence:
+            return []
+        manifest = dict(self.manifest)
+        name = self._segment_name(manifest)
+        ids = [str(item.get("id", f"{name}:{n}")) for n, item in enumerate(evidence)]
+        seen = set(self.ids())
+        duplicates = {doc_id for doc_id in ids if doc_id in seen or seen.add(doc_id)}
+        if duplicates:
+            raise EvidenceLibraryError(f"duplicate evidence ids: {sorted(duplicates)[:5]}")
+
+        write_segment(self.path / name, evidence, ids)
+        manifest["next_segment"] += 1
+        manifest["segments"] = manifest["segments"] + [name]
+        self._commit(manifest)
+        return ids
+
+    def remove(self, ids: Iterable[str]) -> int:
+        """Tombstone live documents by id; returns how many were removed."""
+        targets = set(map(str, ids))
+        tombstones = {name: list(numbers) for name, numbers in self.manifest["tombstones"].items()}
+        removed = 0
+        for segment in self.segments:
+            numbers = [n for n, doc_id in enumerate(segment.ids) if doc_id in targets and n not in segment.dead]
+            if numbers:
+                tombstones.setdefault(segment.directory.name, []).extend(numbers)
+                removed += len(numbers)
+        if removed:
+            self._commit(dict(self.manifest, tombstones=tombstones))
+        return removed
+
+    def compact(self) -> None:
+        """Rewrite live documents into one segment, drop tombstones and unreferenced segment directories."""
+        manifest = dict(self.manifest)
+        name = self._segment_name(manifest)
+        documents = list(self.documents())
+        if documents:
+            write_segment(self.path / name, documents, [item["id"] for item in documents])
+        manifest["next_segment"] += 1
+        manifest["segments"] = [name] if documents else []
+        manifest["tombstones"] = {}
+        self._commit(manifest)
+        for entry in self.path.iterdir():
+            if entry.is_dir() and entry.name.lstrip(".").startswith("seg-") and entry.name not in manifest["segments"]:
+                shutil.rmtree(entry, ignore_errors=True)
+
+    def _segment_name(self, manifest: Dict[str, Any]) -> str:
+        """Next unused segment name, stepping over directories a crashed writer never committed."""
+        while (self.path / f"seg-{manifest['next_segment']:06d}").exists():
+            manifest["next_segment"] += 1
+        return f"seg-{manifest['next_segment']:06d}"
+
+    def _commit(self, manifest: Dict[str, Any]) -> None:
+        manifest["generation"] += 1
+        _write_json(self.path / MANIFEST, manifest)
+        self.close()
+        self._load()
+
+    def close(self) -> None:
+        for segment in self.segments:
+            segment.close()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build and maintain a fail-closed gate evidence library.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for command, help_text in (("build", "create a library"), ("add", "append evidence as a new segment")):
+        p = sub.add_parser(command, help=help_text)
+        p.add_argument("library")
+        p.add_argument("files", nargs="+", help=".json list, .jsonl or text evidence files")
+    p = sub.add_parser("remove", help="tombstone evidence ids")
+    p.add_argument("library")
+    p.add_argument("ids", nargs="+")
+    p = sub.add_parser("compact", help="merge segments and drop tombstones")
+    p.add_argument("library")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.command in ("build", "add"):
+        evidence = [item for name in args.files for item in load_evidence(name)]
+        if args.command == "build":
+            library = EvidenceLibrary.build(args.library, evidence)
+        else:
+            library = EvidenceLibrary(args.library)
+            library.add(evidence)
+    else:
+        library = EvidenceLibrary(args.library)
+        if args.command == "remove":
+            library.remove(args.ids)
+        else:
+            library.compact()
+    print(json.dumps({"library": str(library.path), "documents": library.size, "segments": len(library.segments), "generation": library.generation}))
+    library.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,15 +6,36 @@ Decisions:
 - BLOCK     : no evidence OR zero supported claims
 - ESCALATE  : supported claims exist but support < MIN_SUPPORT
 - ALLOW     : supported claims >= MIN_SUPPORT
+
+Support for a claim is the number of evidence documents whose lowercased
+content contains the lowercased claim. EvidenceIndex answers that from a
+word-level inverted index built once per evidence set; an on-disk
+EvidenceLibrary (evidence_library.py) answers it from memory-mapped segments.
+
+Every decision appends one JSON line to traces/<trace_id>.jsonl through a
+buffered TraceWriter (trace_writer.py); close() the gate to flush it.
 """
 
+from bisect import bisect_left, bisect_right
 from enum import Enum
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Callable, Iterable, Optional, Sequence, Tuple, Union
 from dataclasses import dataclass
 from pathlib import Path
-import json
+import multiprocessing
+import os
+import re
+import tempfile
 import uuid
 
+from trace_writer import TraceWriter
+
+TOKEN = re.compile(r"\w+")
+DOC_SEPARATOR = "\x00"
+SCAN_FRACTION = 1 / 16
+GALLOP_RATIO = 8
+# raw evidence this large goes to verify_many workers as a temporary library
+SHARED_EVIDENCE_CHARS = 1 << 22
+
 
 class Decision(Enum):
     ALLOW = "ALLOW"
@@ -30,74 +51,287 @@ class GateResult:
     trace_id: str
 
 
+def interior_tokens(needle: str) -> List[str]:
+    """Word tokens of `needle` with a non-word character on both sides.
+
+    Wherever `needle` occurs, these are whole tokens of the surrounding text,
+    so a document can only contain `needle` if it contains all of them. The
+    first and last tokens may be cut mid-word and are not usable.
+    """
+    return [m.group() for m in TOKEN.finditer(needle) if m.start() > 0 and m.end() < len(needle)]
+
+
+def edge_fragments(needle: str) -> List[Tuple[str, bool, bool]]:
+    """(fragment, prefix, suffix) for the words of `needle` that interior_tokens skips.
+
+    Wherever `needle` occurs, its first word is the end of a token of the
+    surrounding text (suffix), its last word the start of one (prefix), and
+    a needle that is a single word lies somewhere inside one token.
+    """
+    fragments = []
+    for m in TOKEN.finditer(needle):
+        first, last = m.start() == 0, m.end() == len(needle)
+        if first or last:
+            fragments.append((m.group(), last and not first, first and not last))
+    return fragments
+
+
+class Vocabulary:
+    """Distinct tokens of an evidence set, searchable by fragment in one str.find sweep."""
+
+    def __init__(self, tokens: Iterable[str]):
+        self.tokens = list(tokens)
+        self._text = "\n" + "\n".join(self.tokens) + "\n"
+        self._starts = []
+        offset = 1
+        for token in self.tokens:
+            self._starts.append(offset)
+            offset += len(token) + 1
+
+    def matching(self, fragment: str, prefix: bool = False, suffix: bool = False) -> List[str]:
+        """Tokens starting with (prefix), ending with (suffix) or else containing `fragment`."""
+        pattern = ("\n" if prefix else "") + fragment + ("\n" if suffix else "")
+        found = []
+        pos = self._text.find(pattern)
+        while pos != -1:
+            i = bisect_right(self._starts, pos + 1) - 1
+            found.append(self.tokens[i])
+            if i + 1 == len(self.tokens):
+                break
+            pos = self._text.find(pattern, self._starts[i + 1] - 1)
+        return found
+
+
+def candidate_docs(
+    needle: str,
+    postings: Callable[[str], Sequence[int]],
+    vocabulary: Vocabulary,
+    size: int,
+) -> Optional[List[int]]:
+    """Sorted ids of the documents that can contain `needle`; None if tokens cannot tell.
+
+    Interior tokens are looked up directly. When they leave more than
+    SCAN_FRACTION of the documents, or there are none, the edge words are
+    matched against the vocabulary and the postings of every matching token
+    are merged, unless those postings outnumber the documents. What is
+    still None or too broad afterwards (no word characters at all, or only
+    common words) costs the caller one scan of the corpus.
+    """
+    narrowed = []
+    tokens = set(interior_tokens(needle))
+    if tokens:
+        candidates = intersect([postings(token) for token in tokens])
+        if len(candidates) <= SCAN_FRACTION * size:
+            return candidates
+        narrowed.append(candidates)
+    for fragment, prefix, suffix in edge_fragments(needle):
+        lists = [postings(token) for token in vocabulary.matching(fragment, prefix, suffix)]
+        if sum(map(len, lists)) <= size:
+            narrowed.append(sorted(set().union(*lists)))
+    return intersect(narrowed) if narrowed else None
+
+
+def intersect(postings: List[Any]) -> List[int]:
+    """Document ids present in every sorted postings list.
+
+    Lists much longer than the running result are probed by binary search
+    rather than walked, so a rare token paired with "the" costs a few probes.
+    """
+    postings = sorted(postings, key=len)
+    candidates = list(postings[0])
+    for other in postings[1:]:
+        if not candidates:
+            break
+        if len(other) > GALLOP_RATIO * len(candidates):
+            hits = []
+            for doc_id in candidates:
+                i = bisect_left(other, doc_id)
+                if i < len(other) and other[i] == doc_id:
+                    hits.append(doc_id)
+            candidates = hits
+        else:
+            candidates = sorted(set(candidates).intersection(other))
+    return candidates
+
+
+class EvidenceIndex:
+    """Normalized evidence set, indexed once and reusable across verify calls.
+
+    Counts are identical to `sum(claim.lower() in e["content"].lower() ...)`:
+    the token postings only narrow the candidate documents, and every
+    candidate is confirmed with a substring test. Short claims without
+    interior tokens are narrowed through the vocabulary (candidate_docs).
+    Claims that stay unnarrowed fall back to one str.find scan of the
+    concatenated corpus, which is O(corpus) per claim. These are claims
+    with no word characters, or whose words all occur in more than
+    SCAN_FRACTION of the documents.
+    """
+
+    def __init__(self, evidence: List[Dict[str, Any]]):
+        self.size = len(evidence)
+        self.valid = bool(evidence) and all(e.get("content", "").strip() for e in evidence)
+        self.docs = [e.get("content", "").lower() for e in evidence]
+
+        postings: Dict[str, List[int]] = {}
+        for doc_id, doc in enumerate(self.docs):
+            for token in set(TOKEN.findall(doc)):
+                postings.setdefault(token, []).append(doc_id)
+        self.postings = postings
+        self.vocabulary = Vocabulary(postings)
+
+        self._text = DOC_SEPARATOR.join(self.docs)
+        self._starts = []
+        offset = 0
+        for doc in self.docs:
+            self._starts.append(offset)
+            offset += len(doc) + 1
+
+    def support_counts(self, claims: Iterable[str]) -> Dict[str, int]:
+        counts = {}
+        for claim in claims:
+            if claim not in counts:
+                counts[claim] = self.count(claim.lower())
+        return counts
+
+    def count(self, needle: str) -> int:
+        """Documents containing `needle` (already lowercased)."""
+        candidates = candidate_docs(needle, self._postings_of, self.vocabulary, self.size)
+        if candidates is None or len(candidates) > SCAN_FRACTION * self.size:
+            # common words everywhere: one C-level scan beats per-document tests
+            return self._scan(needle)
+        return sum(needle in self.docs[doc_id] for doc_id in candidates)
+
+    def _postings_of(self, token: str) -> Sequence[int]:
+        return self.postings.get(token, ())
+
+    def _scan(self, needle: str) -> int:
+        if not needle or DOC_SEPARATOR in needle:
+            return sum(needle in doc for doc in self.docs)
+        count = 0
+        pos = self._text.find(needle)
+        while pos != -1:
+            doc_id = bisect_right(self._starts, pos) - 1
+            count += 1
+            if doc_id + 1 == len(self._starts):
+                break
+            pos = self._text.find(needle, self._starts[doc_id + 1])
+        return count
+
+
+# raw dicts, a prebuilt index (or any object with `valid` and
+# `support_counts`), or the path of an evidence library directory
+Evidence = Union[List[Dict[str, Any]], EvidenceIndex, str, Path]
+
+
 class VerificationGate:
-    def __init__(self, min_support: int = 2):
+    def __init__(
+        self,
+        min_support: int = 2,
+        traces_dir: Union[str, Path] = "traces",
+        trace_writer: Optional[TraceWriter] = None,
+    ):
         self.min_support = min_support
         self.trace_id = uuid.uuid4().hex[:8]
-        self.traces_dir = Path("traces")
-        self.traces_dir.mkdir(exist_ok=True)
-
-
-    def verify(self, output: str, evidence: List[Dict[str, Any]]) -> GateResult:
-        trace_file = self.traces_dir / f"{self.trace_id}.jsonl"
-
-        # Invariant 1: no evidence
-        if not evidence or not all(e.get("content", "").strip() for e in evidence):
-            result = GateResult(
-                Decision.BLOCK,
-                ["No valid evidence"],
-                {},
-                self.trace_id
-            )
-            self._log(trace_file, "evidence_check", result)
-            return result
-
-        claims = self._extract_claims(output)
-        support = self._support_counts(claims, evidence)
-
-        supported = {c: n for c, n in support.items() if n > 0}
-
-        # Invariant 2: zero supported claims
-        if not supported:
-            result = GateResult(
-                Decision.BLOCK,
-                ["No claims supported by evidence"],
-                {"supports": support},
-                self.trace_id
-            )
-            self._log(trace_file, "alignment_fail", result)
-            return result
-
-        min_support = min(supported.values())
-
-        # Invariant 3: weak support
-        if min_support < self.min_support:
-            result = GateResult(
-                Decision.ESCALATE,
-                [f"Insufficient support ({min_support}/{self.min_support})"],
-                {"supports": support},
-                self.trace_id
-            )
-            self._log(trace_file, "threshold_check", result)
-            return result
+        self.traces_dir = Path(traces_dir)
+        # the directory and file are created by the writer on the first decision
+        self.trace_writer = trace_writer or TraceWriter(self.traces_dir / f"{self.trace_id}.jsonl")
+        self._library: Optional[Tuple[Path, Any, Any]] = None
 
-        result = GateResult(
-            Decision.ALLOW,
-            ["All checks passed"],
-            {"supports": support},
-            self.trace_id
-        )
-        self._log(trace_file, "final", result)
+
+    def verify(self, output: str, evidence: Evidence) -> GateResult:
+        """Gate `output` against raw evidence dicts, a prebuilt index (reused as-is) or a library path."""
+        step, result = self._decide(output, evidence)
+        self._log(step, result)
         return result
 
 
+    def verify_many(
+        self,
+        outputs: Iterable[str],
+        evidence: Evidence,
+        processes: Optional[int] = None,
+        chunksize: Optional[int] = None,
+    ) -> List[GateResult]:
+        """Gate every output against one evidence set across a process pool.
+
+        Workers get only `min_support`, `trace_id` and the evidence, and
+        call decide() directly. Libraries are reopened by path, so workers
+        share the mapped pages. Raw evidence or an index of at least
+        SHARED_EVIDENCE_CHARS is written once to a temporary library for the
+        same reason; smaller sets are indexed here and pickled to each
+        worker. Results come back in input order and each trace record
+        carries its `output_index`.
+        """
+        outputs = list(outputs)
+        processes = min(processes or os.cpu_count() or 1, len(outputs))
+        if isinstance(evidence, (str, Path)):
+            pass
+        elif hasattr(evidence, "manifest"):
+            # an open EvidenceLibrary: mmaps do not pickle, the path does
+            evidence = evidence.path
+        elif processes <= 1 or _evidence_chars(evidence) < SHARED_EVIDENCE_CHARS:
+            if not hasattr(evidence, "support_counts"):
+                evidence = EvidenceIndex(evidence)
+        else:
+            with tempfile.TemporaryDirectory(prefix="gate-evidence-") as shared:
+                library = _write_shared_library(evidence, Path(shared) / "library")
+                return self._verify_in_pool(outputs, library, processes, chunksize)
+
+        if processes <= 1:
+            return self._collect(self._decide(output, evidence) for output in outputs)
+        return self._verify_in_pool(outputs, evidence, processes, chunksize)
+
+
+    def _verify_in_pool(
+        self,
+        outputs: List[str],
+        evidence: Evidence,
+        processes: int,
+        chunksize: Optional[int],
+    ) -> List[GateResult]:
+        # never fork: the TraceWriter thread may hold locks a forked child would inherit held
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        chunksize = chunksize or max(1, min(256, len(outputs) // (processes * 8)))
+        with context.Pool(processes, _init_worker, (self.min_support, self.trace_id, evidence)) as pool:
+            return self._collect(pool.imap(_decide_in_worker, outputs, chunksize))
+
+
+    def _collect(self, decisions: Iterable[Tuple[str, GateResult]]) -> List[GateResult]:
+        results = []
+        for output_index, (step, result) in enumerate(decisions):
+            self._log(step, result, output_index)
+            results.append(result)
+        return results
+
+
+    def _decide(self, output: str, evidence: Evidence) -> Tuple[str, GateResult]:
+        if isinstance(evidence, (str, Path)):
+            evidence = self._open_library(Path(evidence))
+        return decide(output, evidence, self.min_support, self.trace_id)
+
+
+    def _open_library(self, path: Path):
+        """Open the library at `path`, reopening only when its manifest has been rewritten."""
+        from evidence_library import MANIFEST, EvidenceLibrary
+
+        # manifests are replaced atomically, so a rewrite always changes the inode;
+        # one stat, so the stamp cannot mix the old file's inode with the new one's mtime
+        try:
+            st = (path / MANIFEST).stat()
+        except FileNotFoundError:
+            stamp = None
+        else:
+            stamp = (st.st_ino, st.st_mtime_ns)
+        if self._library is None or self._library[:2] != (path, stamp):
+            if self._library is not None:
+                self._library[2].close()
+            self._library = (path, stamp, EvidenceLibrary(path))
+        return self._library[2]
+
+
     def _extract_claims(self, text: str) -> List[str]:
-        sentences = [s.strip() for s in text.split(".") if len(s.strip()) > 5]
-        verbs = {"is", "are", "was", "were", "has", "have", "shows", "indicates"}
-        return [
-            s for s in sentences
-            if any(v in s.lower().split() for v in verbs)
-        ]
+        return extract_claims(text)
 
 
     def _support_counts(
@@ -105,16 +339,26 @@ class VerificationGate:
         claims: List[str],
         evidence: List[Dict[str, Any]]
     ) -> Dict[str, int]:
-        counts = {}
-        for claim in claims:
-            counts[claim] = sum(
-                claim.lower() in e["content"].lower()
-                for e in evidence
-            )
-        return counts
+        return EvidenceIndex(evidence).support_counts(claims)
+
 
+    def close(self) -> None:
+        """Flush and close the trace writer; every decision so far is on disk afterwards."""
+        self.trace_writer.close()
+        if self._library is not None:
+            self._library[2].close()
+            self._library = None
 
-    def _log(self, path: Path, step: str, result: GateResult) -> None:
+
+    def __enter__(self) -> "VerificationGate":
+        return self
+
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+    def _log(self, step: str, result: GateResult, output_index: Optional[int] = None) -> None:
         record = {
             "trace_id": result.trace_id,
             "step": step,
@@ -122,5 +366,109 @@ class VerificationGate:
             "reasons": result.reasons,
             "meta": result.meta,
         }
-        with open(path, "a") as f:
-            f.write(json.dumps(record) + "\n")
+        if output_index is not None:
+            record["output_index"] = output_index
+        self.trace_writer.write(record)
+
+
+def extract_claims(text: str) -> List[str]:
+    sentences = [s.strip() for s in text.split(".") if len(s.strip()) > 5]
+    verbs = {"is", "are", "was", "were", "has", "have", "shows", "indicates"}
+    return [
+        s for s in sentences
+        if any(v in s.lower().split() for v in verbs)
+    ]
+
+
+def decide(output: str, evidence: Any, min_support: int, trace_id: str) -> Tuple[str, GateResult]:
+    """(trace step, result) for `output` against raw dicts, an index or an open library."""
+    # Invariant 1: no evidence
+    if hasattr(evidence, "support_counts"):
+        valid = evidence.valid
+    else:
+        valid = bool(evidence) and all(e.get("content", "").strip() for e in evidence)
+    if not valid:
+        result = GateResult(
+            Decision.BLOCK,
+            ["No valid evidence"],
+            {},
+            trace_id
+        )
+        return "evidence_check", result
+
+    claims = extract_claims(output)
+    if not hasattr(evidence, "support_counts"):
+        evidence = EvidenceIndex(evidence)
+    support = evidence.support_counts(claims)
+
+    supported = {c: n for c, n in support.items() if n > 0}
+
+    # Invariant 2: zero supported claims
+    if not supported:
+        result = GateResult(
+            Decision.BLOCK,
+            ["No claims supported by evidence"],
+            {"supports": support},
+            trace_id
+        )
+        return "alignment_fail", result
+
+    weakest = min(supported.values())
+
+    # Invariant 3: weak support
+    if weakest < min_support:
+        result = GateResult(
+            Decision.ESCALATE,
+            [f"Insufficient support ({weakest}/{min_support})"],
+            {"supports": support},
+            trace_id
+        )
+        return "threshold_check", result
+
+    result = GateResult(
+        Decision.ALLOW,
+        ["All checks passed"],
+        {"supports": support},
+        trace_id
+    )
+    return "final", result
+
+
+def _evidence_chars(evidence: Any) -> int:
+    if isinstance(evidence, EvidenceIndex):
+        return len(evidence._text)
+    if isinstance(evidence, list):
+        return sum(len(e.get("content", "")) for e in evidence)
+    return 0
+
+
+def _write_shared_library(evidence: Any, path: Path) -> Path:
+    """Write an index or raw dicts to a library at `path` for the pool to map."""
+    from evidence_library import EvidenceLibrary
+
+    if isinstance(evidence, EvidenceIndex):
+        docs = evidence.docs
+    else:
+        docs = [e.get("content", "") for e in evidence]
+    # ids are only needed to be unique; support counts depend on content alone
+    EvidenceLibrary.build(path, [{"id": str(n), "content": doc} for n, doc in enumerate(docs)]).close()
+    return path
+
+
+# per-process state of verify_many workers: (min_support, trace_id, evidence)
+_WORKER: Optional[Tuple[int, str, Any]] = None
+
+
+def _init_worker(min_support: int, trace_id: str, evidence: Evidence) -> None:
+    global _WORKER
+    if isinstance(evidence, (str, Path)):
+        from evidence_library import EvidenceLibrary
+
+        # the batch is a snapshot: open once, no reopen-on-rewrite check per output
+        evidence = EvidenceLibrary(evidence)
+    _WORKER = (min_support, trace_id, evidence)
+
+
+def _decide_in_worker(output: str) -> Tuple[str, GateResult]:
+    min_support, trace_id, evidence = _WORKER
+    return decide(output, evidence, min_support, trace_id)
@@ -0,0 +1,189 @@
+"""
+Buffered trace sink for the Fail-Closed Decision Gate.
+
+write() serializes the record and queues it; a background thread appends
+queued records to one open file in batches. flush() and close() return
+only once every record written before them is on disk (fsync'd unless the
+policy is "never"), and open writers are closed at interpreter exit, so a
+decision is never acknowledged without its trace line eventually landing.
+
+The queue holds at most max_queue records. When the disk falls behind,
+write() blocks until the thread catches up; records are never dropped.
+
+fsync policies:
+- never : leave durability to the OS
+- batch : fsync after every batch
+- close : fsync on flush() and close() only
+"""
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+FSYNC_POLICIES = ("never", "batch", "close")
+_STOP = object()
+_OPEN: "weakref.WeakSet[TraceWriter]" = weakref.WeakSet()
+
+
+class TraceWriterError(RuntimeError):
+    """Raised when the background writer failed or the writer is already closed."""
+
+
+class TraceWriter:
+    def __init__(
+        self,
+        path: Union[str, Path],
+        batch_records: int = 512,
+        flush_interval: float = 0.2,
+        fsync: str = "close",
+        max_bytes: int = 64 * 1024 * 1024,
+        max_queue: int = 16384,
+    ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}")
+        # resolved now: the thread may first open the file after the caller's cwd moved
+        self.path = Path(path).absolute()
+        self.batch_records = batch_records
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.max_bytes = max_bytes
+        self.records_written = 0
+        self.rotations = 0
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._file = None
+        self._size = 0
+
+    def write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record) + "\n"
+        self._check()
+        with self._lock:
+            if self._closed:
+                raise TraceWriterError(f"trace writer for {self.path} is closed")
+            if self._thread is None:
+                # started on first use so idle gates cost neither a thread nor a file
+                self._thread = threading.Thread(target=self._run, name=f"trace-writer-{self.path.name}", daemon=True)
+                self._thread.start()
+                _OPEN.add(self)
+            self._queue.put(line)
+
+    def flush(self) -> None:
+        """Block until every record written so far is on disk."""
+        with self._lock:
+            running = self._thread is not None and not self._closed
+            if running:
+                done = threading.Event()
+                self._queue.put(done)
+        if running:
+            done.wait()
+        self._check()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+            if thread is not None:
+                self._queue.put(_STOP)
+        if thread is not None:
+            thread.join()
+        _OPEN.discard(self)
+        self._check()
+
+    def __enter__(self) -> "TraceWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _check(self) -> None:
+        if self._error is not None:
+            raise TraceWriterError(f"trace writer for {self.path} failed") from self._error
+
+    def _run(self) -> None:
+        while True:
+            lines, waiters, stop = [], [], False
+            item = self._queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    lines.append(item)
+                if stop or waiters or len(lines) >= self.batch_records:
+                    break
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if self._error is None:
+                try:
+                    self._write_batch(lines, sync=self.fsync == "batch" or (self.fsync == "close" and (waiters or stop)))
+                    if stop and self._file is not None:
+                        self._file.close()
+                except BaseException as exc:  # surfaced to the caller on the next write/flush/close
+                    self._error = exc
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                return
+
+    def _write_batch(self, lines, sync: bool) -> None:
+        if lines:
+            if self._file is None:
+                self._open()
+            if self._size >= self.max_bytes:
+                self._rotate()
+            data = "".join(lines)
+            self._file.write(data)
+            self._size += len(data.encode("utf-8"))
+            self.records_written += len(lines)
+        if self._file is not None:
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = self._file.tell()
+
+    def _rotate(self) -> None:
+        """Rename the full file to <stem>.<n><suffix> and start a fresh one; nothing is deleted.
+
+        n is one past the highest existing number, so numbers keep rotation
+        order even after older files were archived or removed.
+        """
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        numbers = [0]
+        for existing in self.path.parent.glob(f"{self.path.stem}.*{self.path.suffix}"):
+            number = existing.name[len(self.path.stem) + 1:len(existing.name) - len(self.path.suffix)]
+            if number.isdigit():
+                numbers.append(int(number))
+        target = self.path.with_name(f"{self.path.stem}.{max(numbers) + 1}{self.path.suffix}")
+        os.replace(self.path, target)
+        self.rotations += 1
+        self._open()
+
+
+@atexit.register
+def _close_all() -> None:
+    for writer in list(_OPEN):
+        writer.close()
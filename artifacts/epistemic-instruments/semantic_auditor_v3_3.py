@@ -4,13 +4,20 @@
 from __future__ import annotations
 
 import argparse
+import csv
+import hashlib
+import io
 import json
+import os
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 
 
+NOISE_THRESHOLD = 0.6
+
+
 class SemanticAuditError(RuntimeError):
     """Raised when semantic auditing cannot continue deterministically."""
 
@@ -20,6 +27,14 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--input-csv", required=True)
     parser.add_argument("--text-column", default="text")
     parser.add_argument("--output-json", default="")
+    parser.add_argument(
+        "--state-file",
+        default="",
+        help="persist incremental audit state here; only rows appended since the last run are labelled",
+    )
+    parser.add_argument("--timestamp-column", default="", help="enable windowed drift mode keyed on this column")
+    parser.add_argument("--window", default="1h", help="window length for drift mode (pandas offset alias)")
+    parser.add_argument("--step", default="", help="slide step for drift mode; defaults to --window (tumbling)")
     return parser.parse_args()
 
 
@@ -29,17 +44,42 @@ def load_input(path: str, text_column: str) -> pd.DataFrame:
         raise SemanticAuditError(f"input CSV does not exist: {path}")
 
     df = pd.read_csv(csv_path)
-    if text_column not in df.columns:
-        raise SemanticAuditError(f"missing required text column '{text_column}'")
-
-    text_series = df[text_column].dropna().astype(str).str.strip()
-    text_series = text_series[text_series != ""]
+    text_series = usable_text(df, text_column)
     if text_series.empty:
         raise SemanticAuditError("input data contains no usable text rows")
 
     return pd.DataFrame({"text": text_series})
 
 
+def load_timed_input(path: str, text_column: str, timestamp_column: str) -> pd.DataFrame:
+    csv_path = Path(path)
+    if not csv_path.exists():
+        raise SemanticAuditError(f"input CSV does not exist: {path}")
+
+    df = pd.read_csv(csv_path)
+    if timestamp_column not in df.columns:
+        raise SemanticAuditError(f"missing required timestamp column '{timestamp_column}'")
+
+    text_series = usable_text(df, text_column)
+    if text_series.empty:
+        raise SemanticAuditError("input data contains no usable text rows")
+
+    timestamps = pd.to_datetime(df.loc[text_series.index, timestamp_column], utc=True, errors="coerce")
+    if timestamps.isna().any():
+        first_bad = int(timestamps[timestamps.isna()].index[0])
+        raise SemanticAuditError(f"unparseable timestamp in row {first_bad}")
+
+    return pd.DataFrame({"text": text_series, "timestamp": timestamps})
+
+
+def usable_text(df: pd.DataFrame, text_column: str) -> pd.Series:
+    if text_column not in df.columns:
+        raise SemanticAuditError(f"missing required text column '{text_column}'")
+
+    text_series = df[text_column].dropna().astype(str).str.strip()
+    return text_series[text_series != ""]
+
+
 def lexical_cluster(tokens: list[str]) -> str:
     token_set = set(tokens)
     if token_set & {"error", "fail", "crash", "timeout", "bug"}:
@@ -51,31 +91,218 @@ def lexical_cluster(tokens: list[str]) -> str:
     return "general"
 
 
-def run_audit(df: pd.DataFrame) -> dict:
-    labels: list[str] = []
-    for text in df["text"]:
-        normalized = "".join(ch.lower() if ch.isalnum() else " " for ch in text)
-        tokens = [tok for tok in normalized.split() if tok]
-        labels.append(lexical_cluster(tokens))
+def label_text(text: str) -> str:
+    normalized = "".join(ch.lower() if ch.isalnum() else " " for ch in text)
+    tokens = [tok for tok in normalized.split() if tok]
+    return lexical_cluster(tokens)
 
-    out = df.copy()
-    out["cluster"] = labels
-    counts = out.groupby("cluster").size().sort_values(ascending=False)
-    noise_ratio = float((counts.get("general", 0) / len(out)))
-    decision = "REVIEWABLE" if noise_ratio < 0.6 else "UNSTABLE_HIGH_NOISE"
+
+def summarize_counts(counts: pd.Series) -> dict:
+    counts = counts.sort_values(ascending=False)
+    rows = int(counts.sum())
+    noise_ratio = float((counts.get("general", 0) / rows))
+    decision = "REVIEWABLE" if noise_ratio < NOISE_THRESHOLD else "UNSTABLE_HIGH_NOISE"
 
     return {
-        "rows": int(len(out)),
+        "rows": rows,
         "clusters": {name: int(value) for name, value in counts.items()},
         "noise_ratio": round(noise_ratio, 4),
         "decision": decision,
     }
 
 
+def run_audit(df: pd.DataFrame) -> dict:
+    labels = [label_text(text) for text in df["text"]]
+
+    out = df.copy()
+    out["cluster"] = labels
+    return summarize_counts(out.groupby("cluster").size())
+
+
+# =========================
+# Windowed drift mode
+# =========================
+
+def run_windowed_audit(df: pd.DataFrame, window: str, step: str | None = None) -> dict:
+    """Cluster counts and noise_ratio per time window, computed in one grouped pass.
+
+    Rows are labelled once and bucketed at ``step`` resolution; a window is the sum of
+    the ``window / step`` buckets ending at that bucket. ``step`` equal to ``window``
+    (the default) gives tumbling windows. Sliding windows are reported wherever
+    they overlap the data, so the partial windows running past the first and the
+    last bucket are both kept and every bucket is counted in ``window / step``
+    windows. Windows with no rows report a null noise_ratio and are never flagged;
+    flags compare the unrounded ratio, as run_audit does.
+    """
+    try:
+        window_delta = pd.Timedelta(window)
+        step_delta = pd.Timedelta(step or window)
+    except ValueError as exc:
+        raise SemanticAuditError(f"window and step must be fixed durations: {exc}") from exc
+    if step_delta <= pd.Timedelta(0) or window_delta % step_delta != pd.Timedelta(0):
+        raise SemanticAuditError(f"window {window} must be a positive multiple of step {step or window}")
+    span = int(window_delta // step_delta)
+
+    labels = df["text"].map(label_text)
+    onehot = pd.get_dummies(labels).astype("int64")
+    onehot["timestamp"] = df["timestamp"].to_numpy()
+    buckets = onehot.resample(step_delta, on="timestamp").sum()
+    if span > 1 and len(buckets):
+        tail = pd.date_range(buckets.index[-1] + step_delta, periods=span - 1, freq=step_delta)
+        buckets = buckets.reindex(buckets.index.append(tail), fill_value=0)
+    counts = buckets.rolling(span, min_periods=1).sum().astype("int64") if span > 1 else buckets
+
+    rows = counts.sum(axis=1)
+    general = counts["general"] if "general" in counts else pd.Series(0, index=counts.index)
+    ratio = general / rows.where(rows > 0)
+    flagged = ratio >= NOISE_THRESHOLD
+    noise = ratio.round(4)
+
+    starts = counts.index + step_delta - window_delta
+    return {
+        "window": window,
+        "step": step or window,
+        "threshold": NOISE_THRESHOLD,
+        "start": [ts.isoformat() for ts in starts],
+        "end": [ts.isoformat() for ts in counts.index + step_delta],
+        "rows": [int(value) for value in rows],
+        "clusters": {name: [int(value) for value in counts[name]] for name in sorted(counts.columns)},
+        "noise_ratio": [None if pd.isna(value) else float(value) for value in noise],
+        "flagged": [bool(value) for value in flagged],
+    }
+
+
+# =========================
+# Incremental (append-only) mode
+# =========================
+
+STATE_VERSION = 2
+BOUNDARY_WINDOW_BYTES = 1 << 16
+
+
+def _load_state(state_path: Path, text_column: str) -> dict | None:
+    if not state_path.exists():
+        return None
+    try:
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if state.get("version") != STATE_VERSION or state.get("text_column") != text_column:
+        return None
+    return state
+
+
+def _write_state(state_path: Path, state: dict) -> None:
+    tmp_path = state_path.with_name(state_path.name + ".tmp")
+    tmp_path.write_text(json.dumps(state, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(tmp_path, state_path)
+
+
+def _boundary_sha256(handle, header: bytes, offset: int) -> str:
+    """SHA-256 of the header and the BOUNDARY_WINDOW_BYTES of rows ending at `offset`."""
+    start = max(len(header), offset - BOUNDARY_WINDOW_BYTES)
+    handle.seek(start)
+    return hashlib.sha256(header + handle.read(offset - start)).hexdigest()
+
+
+def _complete_records(data: bytes) -> int:
+    """Length of the longest prefix of `data` made of whole CSV records.
+
+    Lines are fed to csv.reader one at a time and a record ends where the
+    reader returns a row, so a newline inside a quoted field is never taken
+    for a record end. A row the reader only returns at end of data (an
+    unclosed quote) or that lacks its final newline is left for the next run.
+    """
+    lines = io.BytesIO(data)
+    consumed = complete = 0
+    exhausted = False
+
+    def feed():
+        nonlocal consumed, exhausted
+        for line in lines:
+            consumed += len(line)
+            yield line.decode("utf-8", errors="replace")
+        exhausted = True
+
+    for _ in csv.reader(feed()):
+        if exhausted or data[consumed - 1:consumed] != b"\n":
+            break
+        complete = consumed
+    return complete
+
+
+def run_incremental_audit(path: str, text_column: str, state_path: str | Path) -> dict:
+    """Audit an append-only CSV, labelling only rows added since the persisted state.
+
+    The state records the byte offset already consumed, a SHA-256 of the header and
+    the last BOUNDARY_WINDOW_BYTES before that offset, and the merged cluster counts,
+    so a run reads only the window and the new rows. If the window no longer hashes to
+    the recorded value (file truncated or rewritten) the state is discarded and the
+    file is rebuilt; a rewrite that leaves the window intact goes unnoticed. Only
+    complete CSV records are consumed; a partially written trailing row, including
+    one inside a quoted multi-line field, is left for the next run.
+    """
+    csv_path = Path(path)
+    if not csv_path.exists():
+        raise SemanticAuditError(f"input CSV does not exist: {path}")
+    state_path = Path(state_path)
+
+    size = csv_path.stat().st_size
+    state = _load_state(state_path, text_column)
+
+    with csv_path.open("rb") as handle:
+        header = handle.readline()
+        if not header.endswith(b"\n"):
+            raise SemanticAuditError("input data contains no usable text rows")
+        if text_column not in pd.read_csv(io.BytesIO(header), nrows=0).columns:
+            raise SemanticAuditError(f"missing required text column '{text_column}'")
+
+        counts: dict[str, int] = {}
+        offset = len(header)
+        if state is not None and len(header) <= state["offset"] <= size:
+            if _boundary_sha256(handle, header, state["offset"]) == state["boundary_sha256"]:
+                counts = {name: int(value) for name, value in state["clusters"].items()}
+                offset = state["offset"]
+
+        handle.seek(offset)
+        tail = handle.read(size - offset)
+        complete = tail[:_complete_records(tail)]
+        offset += len(complete)
+        boundary = _boundary_sha256(handle, header, offset)
+
+    if complete:
+        df = pd.read_csv(io.BytesIO(header + complete))
+        for label in usable_text(df, text_column).map(label_text):
+            counts[label] = counts.get(label, 0) + 1
+
+    if not counts:
+        raise SemanticAuditError("input data contains no usable text rows")
+
+    _write_state(
+        state_path,
+        {
+            "version": STATE_VERSION,
+            "text_column": text_column,
+            "offset": offset,
+            "boundary_sha256": boundary,
+            "clusters": counts,
+        },
+    )
+    return summarize_counts(pd.Series(counts, dtype="int64"))
+
+
 def main() -> None:
     args = parse_args()
-    df = load_input(args.input_csv, args.text_column)
-    result = run_audit(df)
+    if args.timestamp_column and args.state_file:
+        raise SemanticAuditError("--timestamp-column and --state-file cannot be combined")
+    if args.timestamp_column:
+        df = load_timed_input(args.input_csv, args.text_column, args.timestamp_column)
+        result = run_windowed_audit(df, args.window, args.step or None)
+    elif args.state_file:
+        result = run_incremental_audit(args.input_csv, args.text_column, args.state_file)
+    else:
+        df = load_input(args.input_csv, args.text_column)
+        result = run_audit(df)
     rendered = json.dumps(result, indent=2, sort_keys=True)
 
     if args.output_json:
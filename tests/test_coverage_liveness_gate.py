@@ -0,0 +1,333 @@
+import importlib.util
+import random
+import sys
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+GATE_DIR = REPO_ROOT / "ai-failure-gates" / "CLG"
+sys.path.insert(0, str(GATE_DIR))
+
+
+def load(name: str, filename: str):
+    spec = importlib.util.spec_from_file_location(name, GATE_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    return module
+
+
+v1 = load("coverage_liveness_gate", "coverage_liveness_gate.py")
+v2 = load("coverage_liveness_gate_v2", "coverage_liveness_gate_v2.py")
+
+SEGMENT_FIELDS = ("bin", "geo", "device")
+
+
+def synthetic_rounds(seed: int, rounds: int = 12, events_per_round: int = 600):
+    rng = random.Random(seed)
+    bins, geos, devices = ["b0", "b1", "b2"], ["us", "eu"], ["ios", "web"]
+    bad = {("b1", "eu", "web"), ("b2", "us", "ios")}
+    for round_index in range(rounds):
+        events = []
+        for _ in range(events_per_round):
+            event = {"bin": rng.choice(bins), "geo": rng.choice(geos), "device": rng.choice(devices)}
+            if rng.random() < 0.05:
+                event.pop(rng.choice(SEGMENT_FIELDS))
+            outage = tuple(event.get(f) for f in SEGMENT_FIELDS) in bad and round_index < 2
+            events.append((event, rng.random() < (0.5 if outage else 0.97)))
+        yield events
+
+
+def comparable(result: dict) -> dict:
+    if result["status"] == "ALIVE":
+        return result
+    receipt = dict(result["receipt"])
+    for volatile in ("timestamp", "proof_hash", "receipt_id"):
+        receipt.pop(volatile)
+    return {"status": result["status"], "receipt": receipt}
+
+
+def test_record_events_matches_sequential_record_event():
+    reference = v1.CoverageLivenessGate("ref", min_segment_samples=20, probation_samples=40)
+    batched = v2.CoverageLivenessGateV2("ref", min_segment_samples=20, probation_samples=40)
+
+    saw_quarantine = saw_release = False
+    for events in synthetic_rounds(seed=7):
+        quarantined_before = set(reference.quarantined)
+        for event, scored in events:
+            reference.record_event(event, scored)
+        batched.record_events(
+            [e.get("bin", "unk") for e, _ in events],
+            [e.get("geo", "unk") for e, _ in events],
+            [e.get("device", "unk") for e, _ in events],
+            [scored for _, scored in events],
+        )
+        saw_release |= bool(quarantined_before - reference.quarantined)
+
+        assert batched.quarantined == reference.quarantined
+        assert dict(batched.probation) == dict(reference.probation)
+        assert comparable(batched.evaluate()) == comparable(reference.evaluate())
+        saw_quarantine |= bool(reference.quarantined)
+
+    assert saw_quarantine and saw_release
+
+
+def test_record_events_keeps_mixed_type_keys_apart_like_record_event():
+    bins = [1, 1.0, True, 2, 2.5, False, 0, 1]
+    reference = v1.CoverageLivenessGate("mixed")
+    batched = v2.CoverageLivenessGateV2("mixed")
+    for value in bins:
+        reference.record_event({"bin": value, "geo": "us", "device": "ios"}, True)
+    batched.record_events(bins, ["us"] * len(bins), ["ios"] * len(bins), [True] * len(bins))
+    assert dict(batched.ingested) == dict(reference.ingested)
+    assert batched.ingested["1.0/us/ios"] == batched.ingested["True/us/ios"] == 1
+    assert batched.ingested["1/us/ios"] == 2 and batched.ingested["0/us/ios"] == 1
+
+
+def test_record_events_missing_column_is_unk():
+    gate = v2.CoverageLivenessGateV2("cols")
+    gate.record_events(["b0", "b0"], None, [1, 2], [True, False])
+    assert dict(gate.ingested) == {"b0/unk/1": 1, "b0/unk/2": 1}
+    assert dict(gate.scored) == {"b0/unk/1": 1}
+
+
+def test_record_event_matches_v1_across_array_growth():
+    reference = v1.CoverageLivenessGate("grow", min_segment_samples=20, probation_samples=40)
+    interned = v2.CoverageLivenessGateV2("grow", min_segment_samples=20, probation_samples=40, initial_capacity=1)
+
+    for events in synthetic_rounds(seed=11, rounds=6, events_per_round=300):
+        for event, scored in events:
+            reference.record_event(event, scored)
+            interned.record_event(event, scored)
+        assert comparable(interned.evaluate()) == comparable(reference.evaluate())
+        assert interned.quarantined == reference.quarantined
+        assert interned.probation == dict(reference.probation)
+
+    assert interned.ingested == dict(reference.ingested)
+
+
+def test_buffered_record_event_keeps_mixed_type_keys_apart():
+    reference = v1.CoverageLivenessGate("mixed")
+    buffered = v2.CoverageLivenessGateV2("mixed")
+    for value in [1, True, 1.0, "1", 1, None]:
+        for gate in (reference, buffered):
+            gate.record_event({"bin": value, "geo": "us"}, value is not True)
+
+    assert buffered.metrics()["events_total"] == 6
+    assert buffered.ingested == dict(reference.ingested)
+    assert buffered.scored == dict(reference.scored)
+
+
+def test_evaluate_rechecks_untouched_segments_when_thresholds_change():
+    gate = v2.CoverageLivenessGateV2("dirty", min_global_ready=0.5, min_segment_samples=10)
+    gate.record_events(["b0"] * 20 + ["b1"] * 20, ["us"] * 40, ["ios"] * 40, [True] * 38 + [False] * 2)
+    assert gate.evaluate()["status"] == "ALIVE"
+
+    gate.record_events(["b0"], ["us"], ["ios"], [True])
+    assert gate.evaluate()["status"] == "ALIVE"
+
+    gate.min_segment_ready = 0.95
+    result = gate.evaluate()
+    assert result["status"] == "DEGRADED"
+    assert result["receipt"]["failed_ready_segments"] == {"b1/us/ios": 0.9}
+    assert gate._ready_ingested == 21
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_windowed_mode_surfaces_fresh_outage_and_reclaims_buckets():
+    clock = FakeClock()
+    windowed = v2.CoverageLivenessGateV2(
+        "win", min_segment_samples=20, probation_samples=30, window_seconds=300, bucket_seconds=60, clock=clock
+    )
+    cumulative = v2.CoverageLivenessGateV2("cum", min_segment_samples=20, probation_samples=30)
+
+    for minute in range(60):
+        clock.now = minute * 60.0
+        for gate in (windowed, cumulative):
+            gate.record_events(["b0"] * 50, ["us"] * 50, ["ios"] * 50, [True] * 50)
+            gate.record_events(["b1"] * 50, ["us"] * 50, ["ios"] * 50, [True] * 50)
+            assert gate.evaluate()["status"] == "ALIVE"
+
+    for minute in range(60, 65):
+        clock.now = minute * 60.0
+        for gate in (windowed, cumulative):
+            gate.record_events(["b0"] * 50, ["us"] * 50, ["ios"] * 50, [False] * 25 + [True] * 25)
+            gate.record_events(["b1"] * 50, ["us"] * 50, ["ios"] * 50, [True] * 50)
+
+    assert cumulative.evaluate()["status"] == "ALIVE"
+    result = windowed.evaluate()
+    assert result["status"] == "DEGRADED"
+    assert result["receipt"]["failed_ready_segments"] == {"b0/us/ios": 0.5}
+    assert windowed.ingested == {"b0/us/ios": 250, "b1/us/ios": 250}
+
+    # probation counts inside the same window
+    clock.now = 65 * 60.0
+    for event_scored in [True] * 20:
+        windowed.record_event({"bin": "b0", "geo": "us", "device": "ios"}, event_scored)
+    assert windowed.probation == {"b0/us/ios": {"ingested": 20, "scored": 20}}
+    clock.now = 71 * 60.0
+    assert windowed.probation == {}
+    assert windowed.quarantined == {"b0/us/ios"}
+    windowed.record_events(["b0"] * 30, ["us"] * 30, ["ios"] * 30, [True] * 30)
+    assert windowed.quarantined == set()
+
+    # an idle window drops every count and hands the segment ids back
+    clock.now = 100 * 60.0
+    assert windowed.evaluate()["status"] == "ALIVE"
+    assert windowed.ingested == {}
+    assert windowed._total_ingested == windowed._ready_ingested == 0
+    assert sorted(windowed._free_ids) == [0, 1]
+
+
+def columns(events):
+    return (
+        [e.get("bin", "unk") for e, _ in events],
+        [e.get("geo", "unk") for e, _ in events],
+        [e.get("device", "unk") for e, _ in events],
+        [scored for _, scored in events],
+    )
+
+
+def test_snapshot_restore_round_trip(tmp_path):
+    clock = FakeClock()
+    gate = v2.CoverageLivenessGateV2(
+        "snap", min_segment_samples=20, probation_samples=40, window_seconds=600, bucket_seconds=60, clock=clock
+    )
+    rounds = list(synthetic_rounds(seed=5, rounds=8, events_per_round=400))
+    for minute, events in enumerate(rounds[:4]):
+        clock.now = minute * 60.0
+        gate.record_events(*columns(events))
+        gate.evaluate()
+    assert gate.quarantined
+
+    gate.snapshot(tmp_path / "gate.npz")
+    restored = v2.CoverageLivenessGateV2.restore(tmp_path / "gate.npz", clock=clock)
+    assert restored.ingested == gate.ingested
+    assert restored.quarantined == gate.quarantined
+    assert restored.probation == gate.probation
+
+    for minute, events in enumerate(rounds[4:], start=4):
+        clock.now = minute * 60.0 * 3
+        for g in (gate, restored):
+            g.record_events(*columns(events))
+        assert comparable(restored.evaluate()) == comparable(gate.evaluate())
+        assert restored.probation == gate.probation
+
+
+def test_merge_sums_counters_and_unions_quarantine():
+    events = [e for round_events in synthetic_rounds(seed=9, rounds=2) for e in round_events]
+    single = v2.CoverageLivenessGateV2("all", min_segment_samples=20)
+    shards = [v2.CoverageLivenessGateV2(f"shard{i}", min_segment_samples=20) for i in range(3)]
+    single.record_events(*columns(events))
+    for i, shard in enumerate(shards):
+        shard.record_events(*columns(events[i::3]))
+
+    merged = v2.CoverageLivenessGateV2.merge("all", shards)
+    assert merged.ingested == single.ingested
+    assert comparable(merged.evaluate()) == comparable(single.evaluate())
+
+    shards[0].evaluate()
+    assert shards[0].quarantined
+    merged = v2.CoverageLivenessGateV2.merge("all", shards)
+    assert merged.quarantined >= shards[0].quarantined
+
+
+def test_concurrent_gate_counts_and_transitions():
+    import threading
+
+    front = v2.ConcurrentCoverageLivenessGate("conc", flush_events=64, min_segment_samples=20, probation_samples=100)
+    stop = threading.Event()
+
+    def write(thread_index, scored_ratio):
+        rng = random.Random(thread_index)
+        for i in range(2_000):
+            bad = i % 4 == 0
+            event = {"bin": "bad" if bad else f"b{i % 3}", "geo": "us", "device": "web"}
+            front.record_event(event, (rng.random() < scored_ratio) if bad else True)
+
+    def evaluate_loop():
+        while not stop.is_set():
+            front.evaluate()
+
+    def run_phase(scored_ratio):
+        writers = [threading.Thread(target=write, args=(i, scored_ratio)) for i in range(6)]
+        for thread in writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+
+    run_phase(0.3)
+    assert front.evaluate()["status"] == "DEGRADED"
+    assert front.gate.quarantined == {"bad/us/web"}
+
+    evaluator = threading.Thread(target=evaluate_loop)
+    evaluator.start()
+    run_phase(1.0)
+    stop.set()
+    evaluator.join()
+    front.evaluate()
+
+    # the cumulative ratio of "bad" stays low, so releases are followed by re-quarantine;
+    # whichever state it ends in, the running sums must agree with the counters
+    gate = front.gate
+    ingested = gate.ingested
+    assert ingested == {"bad/us/web": 6_000, "b0/us/web": 6_000, "b1/us/web": 6_000, "b2/us/web": 6_000}
+    assert gate.quarantined <= {"bad/us/web"}
+    assert gate._total_ingested == 24_000
+    assert gate._ready_ingested == sum(n for seg, n in ingested.items() if seg not in gate.quarantined)
+    assert gate._ready_scored == sum(n for seg, n in gate.scored.items() if seg not in gate.quarantined)
+
+
+def test_metrics_scrape_is_read_only(tmp_path):
+    import urllib.request
+
+    metrics = load("coverage_liveness_metrics", "coverage_liveness_metrics.py")
+    front = v2.ConcurrentCoverageLivenessGate("scrape", min_segment_samples=10)
+    for i in range(100):
+        front.record_event({"bin": "b0", "geo": "us", "device": "web"}, i % 2 == 0)
+    front.flush()
+
+    exporter = metrics.MetricsExporter(front)
+    server = exporter.serve(port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        body = urllib.request.urlopen(url).read().decode()
+    finally:
+        server.shutdown()
+    exporter.write_textfile(tmp_path / "clg.prom")
+
+    assert 'clg_worst_segment_ready{system_id="scrape"} 0.5' in body
+    assert 'clg_events_total{system_id="scrape"} 100' in body
+    assert front.gate.quarantined == set()
+    assert front.gate._dirty_flag.any()
+
+    assert front.evaluate()["status"] == "DEGRADED"
+    text = (tmp_path / "clg.prom").read_text()
+    assert 'clg_evaluate_latency_seconds_count{system_id="scrape"} 0' in text
+    assert 'clg_evaluate_latency_seconds_count{system_id="scrape"} 1' in exporter.render()
+    assert 'clg_quarantined_segments{system_id="scrape"} 1' in exporter.render()
+
+
+def test_bench_harness_outage_timings_and_regressions():
+    import numpy as np
+
+    bench = load("bench_coverage_liveness_gate", "bench_coverage_liveness_gate.py")
+    first = bench.skewed_events(np.random.default_rng(1), 5_000, 1.3, outage=(0, 0, 0))
+    second = bench.skewed_events(np.random.default_rng(1), 5_000, 1.3, outage=(0, 0, 0))
+    assert all((a == b).all() for a, b in zip(first, second))
+
+    timings = bench.outage_timings("v2_windowed", 1.3, seed=3)
+    assert timings["ticks_to_quarantine"] is not None and timings["ticks_to_recovery"] is not None
+
+    baseline = {"seed": 1, "v2_record_event_per_sec": 1000, "v2_evaluate_p50_us_10000": 100.0}
+    assert bench.regressions(dict(baseline), baseline, 0.25) == []
+    worse = {"seed": 1, "v2_record_event_per_sec": 700, "v2_evaluate_p50_us_10000": 400.0}
+    assert len(bench.regressions(worse, baseline, 0.25)) == 2
@@ -0,0 +1,252 @@
+import importlib.util
+import json
+import random
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+GATE_DIR = REPO_ROOT / "ai-failure-gates" / "fail_closed_gate"
+sys.path.insert(0, str(GATE_DIR))
+
+
+def load(name: str, filename: str):
+    spec = importlib.util.spec_from_file_location(name, GATE_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    return module
+
+
+gate = load("gate", "gate.py")
+trace_writer = load("trace_writer", "trace_writer.py")
+
+
+def naive_counts(claims, evidence):
+    return {c: sum(c.lower() in e["content"].lower() for e in evidence) for c in claims}
+
+
+def test_index_counts_match_substring_semantics():
+    rng = random.Random(11)
+    words = ["rate", "rates", "is", "was", "up", "down", "Q3", "the", "growth", "has", "risen"]
+    evidence = [
+        {"content": " ".join(rng.choice(words) for _ in range(rng.randint(5, 40))) + rng.choice([".", ",", "!", ""])}
+        for _ in range(300)
+    ]
+    evidence += [{"content": "Revenue is UP, sharply."}, {"content": "preamble: the rate is up-ish"}]
+    claims = [" ".join(rng.choice(words) for _ in range(rng.randint(1, 4))) for _ in range(200)]
+    claims += [
+        "ate is u",      # partial words on both edges
+        "e is up-",      # punctuation at the edge
+        "is up,",
+        "up, sharply",
+        "is",            # no interior tokens
+        "q3",
+        "absent claim is here",
+        "",
+        "ise",           # single fragment inside a word
+        "row",
+        "zzz",
+    ]
+    # arbitrary slices cut words at both ends
+    for doc in rng.sample(evidence, 40):
+        start = rng.randrange(len(doc["content"]))
+        claims.append(doc["content"][start:start + rng.randint(1, 12)])
+
+    index = gate.EvidenceIndex(evidence)
+    assert index.support_counts(claims) == naive_counts(claims, evidence)
+
+
+def test_reused_index_gives_same_decisions_as_raw_evidence(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    evidence = [
+        {"content": "Revenue growth is 12 percent. The churn rate was flat."},
+        {"content": "Analysts agree revenue growth is 12 percent this year."},
+        {"content": "The churn rate was flat in Q3."},
+    ]
+    outputs = [
+        "Revenue growth is 12 percent. The churn rate was flat.",
+        "Revenue growth is 12 percent. Margins were doubled.",
+        "The moon is made of cheese.",
+        "No verbs here at all.",
+    ]
+    g = gate.VerificationGate(min_support=2)
+    index = gate.EvidenceIndex(evidence)
+
+    for output in outputs:
+        raw, indexed = g.verify(output, evidence), g.verify(output, index)
+        assert (raw.decision, raw.reasons, raw.meta) == (indexed.decision, indexed.reasons, indexed.meta)
+
+    assert g.verify(outputs[0], evidence).decision == gate.Decision.ALLOW
+    assert g.verify(outputs[2], index).decision == gate.Decision.BLOCK
+    assert g.verify(outputs[0], gate.EvidenceIndex([{"content": "  "}])).decision == gate.Decision.BLOCK
+
+
+def test_evidence_library_counts_and_incremental_updates(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    library_mod = load("evidence_library", "evidence_library.py")
+    rng = random.Random(5)
+    words = ["rate", "is", "up", "was", "down", "the", "Growth", "has", "risen", "é"]
+    evidence = [
+        {"id": f"d{n}", "content": " ".join(rng.choice(words) for _ in range(rng.randint(3, 25)))}
+        for n in range(200)
+    ]
+    claims = [" ".join(rng.choice(words) for _ in range(rng.randint(1, 4))) for _ in range(150)] + ["ate is u", "", "é", "ise", "s r"]
+    for doc in rng.sample(evidence, 30):
+        start = rng.randrange(len(doc["content"]))
+        claims.append(doc["content"][start:start + rng.randint(1, 10)])
+
+    library = library_mod.EvidenceLibrary.build(tmp_path / "lib", evidence[:120])
+    library.add(evidence[120:])
+    assert library.support_counts(claims) == naive_counts(claims, evidence)
+
+    assert library.remove(["d3", "d150", "missing"]) == 2
+    live = [e for e in evidence if e["id"] not in {"d3", "d150"}]
+    assert library.support_counts(claims) == naive_counts(claims, live)
+    library.add([{"id": "d3", "content": "The rate is up again"}])
+    live.append({"id": "d3", "content": "The rate is up again"})
+    assert library.support_counts(claims) == naive_counts(claims, live)
+
+    library.compact()
+    assert len(library.segments) == 1 and library.size == len(live)
+    assert library.support_counts(claims) == naive_counts(claims, live)
+    with pytest.raises(library_mod.EvidenceLibraryError):
+        library.add([{"id": "d3", "content": "dup"}])
+
+    g = gate.VerificationGate(min_support=1)
+    output = "The rate is up again. The moon was cheese."
+    expected = g.verify(output, live)
+    by_path = g.verify(output, str(tmp_path / "lib"))
+    assert (by_path.decision, by_path.meta) == (expected.decision, expected.meta)
+    library_mod.EvidenceLibrary(tmp_path / "lib").add([{"id": "x", "content": "   "}])
+    assert g.verify(output, tmp_path / "lib").decision == gate.Decision.BLOCK
+    g.close()
+
+
+def test_evidence_library_survives_segments_orphaned_by_a_crash(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    library_mod = load("evidence_library", "evidence_library.py")
+    library = library_mod.EvidenceLibrary.build(tmp_path / "lib", [{"id": "a", "content": "The rate is up"}])
+    # a writer that died after renaming its segment but before committing the manifest
+    (tmp_path / "lib" / "seg-000002").mkdir()
+    (tmp_path / "lib" / "seg-000002" / "content.bin").write_bytes(b"partial")
+    (tmp_path / "lib" / ".seg-000003.999.tmp").mkdir()
+
+    library.add([{"id": "b", "content": "The rate is up again"}])
+    assert library.manifest["segments"] == ["seg-000001", "seg-000003"]
+    assert library_mod.EvidenceLibrary(tmp_path / "lib").support_counts(["rate is up"]) == {"rate is up": 2}
+
+    library.compact()
+    assert sorted(p.name for p in (tmp_path / "lib").iterdir()) == ["manifest.json", "seg-000004"]
+    assert library.support_counts(["rate is up"]) == {"rate is up": 2}
+    library.close()
+
+
+def test_trace_writer_keeps_every_record_across_threads_and_rotation(tmp_path):
+    writer = trace_writer.TraceWriter(tmp_path / "t" / "trace.jsonl", batch_records=64, max_bytes=4096, fsync="batch")
+
+    def produce(worker):
+        for n in range(500):
+            writer.write({"worker": worker, "n": n})
+
+    threads = [threading.Thread(target=produce, args=(w,)) for w in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    writer.flush()
+    assert writer.records_written == 2000
+    writer.close()
+    writer.close()
+
+    files = sorted((tmp_path / "t").iterdir())
+    assert len(files) == writer.rotations + 1 > 1
+    records = [json.loads(line) for f in files for line in f.read_text().splitlines()]
+    assert sorted((r["worker"], r["n"]) for r in records) == [(w, n) for w in range(4) for n in range(500)]
+    with pytest.raises(trace_writer.TraceWriterError):
+        writer.write({"late": True})
+
+
+def test_trace_writer_bounded_queue_and_rotation_numbering(tmp_path):
+    directory = tmp_path / "t"
+    directory.mkdir()
+    (directory / "trace.2.jsonl").write_text("")   # .1 was archived away
+    writer = trace_writer.TraceWriter(directory / "trace.jsonl", batch_records=8, max_bytes=256, max_queue=4)
+    for n in range(300):
+        writer.write({"n": n})
+    writer.close()
+
+    assert writer._queue.maxsize == 4 and writer.records_written == 300
+    rotated = sorted(int(f.name.split(".")[1]) for f in directory.glob("trace.*.jsonl"))
+    assert rotated == list(range(2, writer.rotations + 3))
+    assert not (directory / "trace.1.jsonl").exists()
+
+
+def test_gate_traces_are_buffered_and_flushed_on_close(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    evidence = [{"content": "Revenue growth is 12 percent."}]
+    with gate.VerificationGate(min_support=1) as g:
+        assert not (tmp_path / "traces").exists()
+        for _ in range(300):
+            g.verify("Revenue growth is 12 percent.", evidence)
+        g.verify("Nothing here.", [])
+    lines = (tmp_path / "traces" / f"{g.trace_id}.jsonl").read_text().splitlines()
+    assert len(lines) == 301
+    assert json.loads(lines[0])["decision"] == "ALLOW"
+    assert json.loads(lines[-1])["step"] == "evidence_check"
+
+
+def test_verify_many_matches_sequential_verify_in_input_order(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    library_mod = load("evidence_library", "evidence_library.py")
+    rng = random.Random(3)
+    words = ["revenue", "growth", "is", "was", "up", "flat", "churn", "rate", "the"]
+    evidence = [{"id": str(n), "content": " ".join(rng.choice(words) for _ in range(30))} for n in range(60)]
+    outputs = [
+        ". ".join(" ".join(rng.choice(words) for _ in range(rng.randint(3, 6))) for _ in range(3))
+        for _ in range(120)
+    ]
+    library_mod.EvidenceLibrary.build(tmp_path / "lib", evidence).close()
+
+    with gate.VerificationGate(min_support=3) as g:
+        expected = [g.verify(output, evidence) for output in outputs]
+        pooled = g.verify_many(outputs, evidence, processes=2, chunksize=7)
+        from_library = g.verify_many(outputs, tmp_path / "lib", processes=2)
+        inline = g.verify_many(outputs, gate.EvidenceIndex(evidence), processes=1)
+
+    for batch in (pooled, from_library, inline):
+        assert [(r.decision, r.meta, r.trace_id) for r in batch] == [(r.decision, r.meta, r.trace_id) for r in expected]
+    assert {r.decision for r in expected} >= {gate.Decision.ALLOW, gate.Decision.BLOCK}
+
+    records = [json.loads(line) for line in (tmp_path / "traces" / f"{g.trace_id}.jsonl").read_text().splitlines()]
+    assert "output_index" not in records[0]
+    batched = records[len(outputs):]
+    assert [r["output_index"] for r in batched] == list(range(len(outputs))) * 3
+    assert [r["decision"] for r in batched[:len(outputs)]] == [r.decision.value for r in expected]
+
+
+def test_verify_many_shares_large_raw_evidence_through_a_temporary_library(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(gate, "SHARED_EVIDENCE_CHARS", 1)
+    scratch = tmp_path / "scratch"
+    scratch.mkdir()
+    monkeypatch.setattr(gate.tempfile, "tempdir", str(scratch))
+    evidence = [
+        {"id": "a", "content": "Revenue is up this quarter"},
+        {"id": "a", "content": "revenue is up, churn is flat"},
+        {"id": "b", "content": "Churn is flat"},
+    ]
+    outputs = ["Revenue is up. Churn is flat", "Margins are down", "Churn is flat. Nothing else"] * 4
+
+    with gate.VerificationGate(min_support=2) as g:
+        expected = [g.verify(output, evidence) for output in outputs]
+        from_raw = g.verify_many(outputs, evidence, processes=2)
+        from_index = g.verify_many(outputs, gate.EvidenceIndex(evidence), processes=2)
+
+    for batch in (from_raw, from_index):
+        assert [(r.decision, r.meta) for r in batch] == [(r.decision, r.meta) for r in expected]
+    # duplicate ids in raw evidence do not trip the library, and the copy is removed afterwards
+    assert list(scratch.iterdir()) == []
@@ -1,5 +1,6 @@
 import importlib.util
 import json
+import os
 from pathlib import Path
 
 
@@ -20,3 +21,53 @@ def test_failure_oracle_matches_committed_output():
 def test_failure_oracle_accepts_path_like_artifact_path():
     actual = module.run_oracle(REPO_ROOT / "work-samples" / "failure_oracle.c", seed=2026, skip_docker=True)
     assert actual["artifact"] == str(REPO_ROOT / "work-samples" / "failure_oracle.c")
+
+
+def test_failure_oracle_directory_merkle_root_and_proofs(tmp_path):
+    (tmp_path / "nested").mkdir()
+    for name, body in {"a.txt": b"alpha", "b.txt": b"beta", "nested/c.bin": b"\x00" * 5000}.items():
+        (tmp_path / name).write_bytes(body)
+
+    first = module.run_oracle(tmp_path, seed=2026, skip_docker=True, workers=3)
+    second = module.run_oracle(tmp_path, seed=2026, skip_docker=True, workers=1)
+    assert first == second
+
+    check = first["checks"][0]
+    assert check["check"] == "artifact_merkle_root"
+    assert [entry["path"] for entry in check["files"]] == ["a.txt", "b.txt", "nested/c.bin"]
+    for entry in check["files"]:
+        assert module.verify_merkle_proof(entry["leaf"], entry["proof"], check["merkle_root"])
+
+    (tmp_path / "b.txt").write_bytes(b"tampered")
+    changed = module.run_oracle(tmp_path, seed=2026, skip_docker=True)
+    assert changed["checks"][0]["merkle_root"] != check["merkle_root"]
+
+
+def test_failure_oracle_hash_cache_output_is_identical(tmp_path):
+    cache_path = tmp_path / "hash_cache.json"
+    expected = json.loads((REPO_ROOT / "samples" / "sample_failure_oracle_output.json").read_text(encoding="utf-8"))
+
+    cold = module.run_oracle("work-samples/failure_oracle.c", seed=2026, skip_docker=True, hash_cache=cache_path)
+    warm = module.run_oracle("work-samples/failure_oracle.c", seed=2026, skip_docker=True, hash_cache=cache_path)
+    paranoid = module.run_oracle(
+        "work-samples/failure_oracle.c", seed=2026, skip_docker=True, hash_cache=cache_path, paranoid=True
+    )
+
+    assert json.dumps(cold, sort_keys=True) == json.dumps(expected, sort_keys=True)
+    assert warm == expected
+    assert paranoid == expected
+
+
+def test_failure_oracle_hash_cache_hit_skips_rehash(tmp_path, monkeypatch):
+    artifact = tmp_path / "artifact.bin"
+    artifact.write_bytes(b"payload")
+    old = 1_600_000_000_000_000_000
+    os.utime(artifact, ns=(old, old))
+    cache_path = tmp_path / "hash_cache.json"
+    first = module.run_oracle(artifact, seed=2026, skip_docker=True, hash_cache=cache_path)
+
+    def fail_hash(path, chunk_size=module.HASH_CHUNK_BYTES):
+        raise AssertionError("cache hit should not rehash")
+
+    monkeypatch.setattr(module, "hash_file", fail_hash)
+    assert module.run_oracle(artifact, seed=2026, skip_docker=True, hash_cache=cache_path) == first
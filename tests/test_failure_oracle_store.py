@@ -0,0 +1,297 @@
+import importlib.util
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+MODULE_PATH = REPO_ROOT / "work-samples" / "failure_oracle_store.py"
+spec = importlib.util.spec_from_file_location("failure_oracle_store", MODULE_PATH)
+module = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = module
+assert spec.loader is not None
+spec.loader.exec_module(module)
+
+
+def build_store(path: Path, segments: list[tuple[int, bytes]], evidence: list[bytes] = (b"observation",)) -> None:
+    header = bytearray(module.HEADER.size)
+    body = bytearray()
+    last_hash = bytes(32)
+    for segment_id, (state, payload) in enumerate(segments, start=1):
+        post_hash = module.hash32(last_hash + module.hash32(payload))
+        body += module.SEGMENT.pack(segment_id, 1, 0, state, len(payload), last_hash, post_hash) + payload
+        last_hash = post_hash
+
+    body += bytes(-(module.HEADER.size + len(body)) % module.ORACLE_PAGE_SIZE)
+    offsets, level = [], []
+    for block_id, data in enumerate(evidence, start=1):
+        offsets.append(module.HEADER.size + len(body))
+        level.append(module.hash32(data))
+        page = module.LEAF.pack(block_id, len(data), bytes(4), level[-1]) + data
+        body += page + bytes(module.ORACLE_PAGE_SIZE - len(page))
+
+    levels = []
+    while not levels or len(level) > 1:
+        children = level
+        level = [module.hash32(b"".join(children[i:i + 16])) for i in range(0, len(children), 16)]
+        levels.append((children, level))
+
+    def node(depth: int, position: int) -> bytes:
+        children, nodes = levels[depth - 1]
+        kids = children[position * 16:position * 16 + 16]
+        return module.NODE.pack((depth << 56) | position, 16, len(kids), b"".join(kids).ljust(512, b"\0"), nodes[position])
+
+    # leaf table and full nodes first, then the StoreIndex and the frontier (last node per level)
+    table_offset = module.HEADER.size + len(body)
+    body += b"".join(offset.to_bytes(8, "little") for offset in offsets)
+    level_offsets, level_counts = [0] * 16, [0] * 16
+    for depth, (_, nodes) in enumerate(levels, start=1):
+        level_offsets[depth - 1], level_counts[depth - 1] = module.HEADER.size + len(body), len(nodes)
+        body += b"".join(node(depth, position) for position in range(len(nodes) - 1))
+    root_hash = levels[-1][1][0]
+
+    store_offset = module.HEADER.size + len(body)
+    body += module.STORE_INDEX.pack(
+        module.ORACLE_STORE_MAGIC, len(offsets), len(levels), table_offset, len(offsets),
+        store_offset + module.STORE_INDEX.size, *level_offsets, *level_counts, *[max(n - 1, 0) for n in level_counts],
+        root_hash,
+    )
+    body += b"".join(node(depth, len(nodes) - 1) for depth, (_, nodes) in enumerate(levels, start=1))
+    cursor = module.HEADER.size + len(body)
+
+    module.HEADER.pack_into(
+        header, 0, module.ORACLE_MAGIC, module.ORACLE_VERSION, 4096, 0, module.HEADER.size, 0,
+        store_offset, cursor - store_offset, root_hash, bytes(32), len(segments), 3, 0, 0, bytes(32),
+    )
+    header[104:136] = module.hash32(bytes(header[:module.HEADER_HASHED_BYTES]))
+    path.write_bytes(bytes(header) + bytes(body))
+
+
+def build_log(path: Path, segments: list[tuple[int, int, bytes]]) -> None:
+    header = bytearray(module.HEADER.size)
+    module.HEADER.pack_into(
+        header, 0, module.ORACLE_MAGIC, module.ORACLE_VERSION, 4096, 0, module.HEADER.size, 0,
+        0, 0, bytes(32), bytes(32), 0, 0, 0, 0, bytes(32),
+    )
+    header[104:136] = module.hash32(bytes(header[:module.HEADER_HASHED_BYTES]))
+    body = b"".join(
+        module.SEGMENT.pack(segment_id, 1, 0, state, len(payload), bytes(32), bytes(32)) + payload
+        for segment_id, state, payload in segments
+    )
+    path.write_bytes(bytes(header) + body)
+
+
+def test_recover_log_only_honours_sealed_batches(tmp_path):
+    batched = module.SEGMENT_BATCHED
+    committed = module.SEGMENT_COMMITTED | batched
+    seal = module.SEGMENT_BATCH_SEAL
+    segments = [
+        (1, module.SEGMENT_PROVISIONAL | batched, b"obs"),
+        (2, committed, b"FAIL"),
+        (3, committed, b"FAIL"),
+        (3, seal, (3).to_bytes(8, "little")),
+        (4, committed, b"FAIL"),
+        (4, seal, (2).to_bytes(8, "little")),
+        (5, committed, b"FAIL"),
+        (6, committed, b"FAIL"),
+    ]
+    store_path = tmp_path / "oracle.bin"
+    build_log(store_path, segments)
+    with module.OracleStore(store_path) as store:
+        assert store.recover_log().latest_verdict_id == 3
+
+    with module.OracleStore(store_path) as store:
+        assert store.find_segment(6).offset == store.find_segment(5).offset + module.SEGMENT.size + 4
+
+    build_log(store_path, segments[:6] + [(5, committed, b"FAIL"), (5, seal, (1).to_bytes(8, "little"))])
+    store_path.write_bytes(store_path.read_bytes()[:-4])
+    with module.OracleStore(store_path) as store:
+        assert store.recover_log().latest_verdict_id == 3
+
+    # an unsealed group torn before a sealed batch does not spoil that batch's count
+    torn_then_sealed = [
+        (1, committed, b"FAIL"),
+        (2, module.SEGMENT_PROVISIONAL | batched, b"obs"),
+        (3, committed, b"FAIL"),
+        (3, seal, (2).to_bytes(8, "little")),
+    ]
+    build_log(store_path, torn_then_sealed)
+    with module.OracleStore(store_path) as store:
+        recovered = store.recover_log()
+        assert recovered.latest_verdict_id == 3
+        assert recovered.log_end == len(store)
+
+    # a restarted writer reuses the torn group's ids; the seal covers only its own batch
+    build_log(store_path, [(1, committed, b"FAIL"), (1, module.SEGMENT_PROVISIONAL | batched, b"obs"), (2, seal, (1).to_bytes(8, "little"))])
+    with module.OracleStore(store_path) as store:
+        assert store.recover_log().latest_verdict_id == 0
+
+
+def test_recover_log_finds_last_committed_segment(tmp_path):
+    store_path = tmp_path / "oracle.bin"
+    segments = [(module.SEGMENT_COMMITTED if i % 3 == 0 else 0, b"x" * (i % 7)) for i in range(10_000)]
+    segments.append((0, b"provisional tail"))
+    build_store(store_path, segments)
+
+    with module.OracleStore(store_path) as store:
+        assert store.verify_file() == module.VERIFY_OK
+        recovered = store.recover_log()
+        parsed = [segment for segment, _ in zip(store.iter_segments(), range(len(segments)))]
+        assert all(store.segment_intact(segment) for segment in parsed)
+
+    assert recovered.latest_verdict_id == 10_000
+    assert recovered.segments_scanned >= len(segments)
+
+
+def test_verify_file_detects_tampered_evidence(tmp_path):
+    store_path = tmp_path / "oracle.bin"
+    build_store(store_path, [(module.SEGMENT_COMMITTED, b"FAIL")], evidence=[b"observation"])
+    raw = bytearray(store_path.read_bytes())
+    raw[raw.rindex(b"observation")] ^= 0x01
+    store_path.write_bytes(bytes(raw))
+
+    with module.OracleStore(store_path) as store:
+        assert store.verify_file() == module.VERIFY_BAD_LEAF
+        assert not store.verify_inclusion(0)
+
+
+def test_other_format_versions_are_rejected(tmp_path):
+    store_path = tmp_path / "oracle.bin"
+    build_store(store_path, [(module.SEGMENT_COMMITTED, b"FAIL")])
+    raw = bytearray(store_path.read_bytes())
+    raw[16:24] = (0x00010000).to_bytes(8, "little")
+    raw[104:136] = module.hash32(bytes(raw[:module.HEADER_HASHED_BYTES]))
+    store_path.write_bytes(bytes(raw))
+
+    with module.OracleStore(store_path) as store:
+        assert not store.header_valid()
+        assert store.verify_file() == module.VERIFY_BAD_HEADER
+        with pytest.raises(module.OracleStoreError, match="unsupported oracle store version 0x00010000"):
+            store.header()
+
+
+def test_inclusion_proofs_over_fanout_16_tree(tmp_path):
+    store_path = tmp_path / "oracle.bin"
+    evidence = [f"evidence block {i:04d}".encode() * (i % 5 + 1) for i in range(300)]
+    build_store(store_path, [(module.SEGMENT_COMMITTED, b"FAIL")], evidence=evidence)
+
+    with module.OracleStore(store_path) as store:
+        assert store.verify_file() == module.VERIFY_OK
+        assert store.store_index().level_count == 3
+        assert len(store.inclusion_proof(299)) == 3
+        assert all(store.verify_inclusion(i) for i in (0, 15, 16, 255, 256, 299))
+
+    raw = bytearray(store_path.read_bytes())
+    raw[raw.index(b"evidence block 0017")] ^= 0x01
+    store_path.write_bytes(bytes(raw))
+    with module.OracleStore(store_path) as store:
+        assert not store.verify_inclusion(17)
+        assert store.verify_inclusion(18)
+
+
+def compile_oracle(tmp_path: Path) -> Path:
+    binary = tmp_path / "failure_oracle"
+    subprocess.run(
+        ["cc", "-Wall", "-Wextra", "-Werror", "-o", str(binary), str(REPO_ROOT / "work-samples" / "failure_oracle.c")],
+        check=True,
+    )
+    return binary
+
+
+@pytest.mark.skipif(shutil.which("cc") is None, reason="C compiler unavailable")
+def test_reader_agrees_with_c_verifier(tmp_path):
+    binary = compile_oracle(tmp_path)
+    store_path = tmp_path / "oracle.bin"
+    for _ in range(20):
+        completed = subprocess.run([str(binary), str(store_path)], check=True, capture_output=True, text=True)
+        assert completed.stdout.strip() == "VERIFIED"
+
+    with module.OracleStore(store_path) as store:
+        assert store.header_valid()
+        assert store.verify_file() == module.VERIFY_OK
+        assert store.header().latest_verdict_id == 40
+        assert store.store_index().leaf_count == 20
+        assert store.store_index().level_count == 2
+        assert all(store.verify_inclusion(i) for i in range(20))
+
+        assert store.header().index_offset != 0
+        indexed = store.recover_log()
+        full_scan = store.recover_log(use_index=False)
+        assert indexed.latest_verdict_id == full_scan.latest_verdict_id == 40
+        assert (indexed.segments_scanned, full_scan.segments_scanned) == (0, 100)
+        for segment_id in range(1, 41):
+            segment = store.find_segment(segment_id)
+            assert segment is not None and segment.segment_id == segment_id
+            assert store.segment_intact(segment)
+        assert store.find_segment(41) is None
+
+
+@pytest.mark.skipif(shutil.which("cc") is None, reason="C compiler unavailable")
+def test_c_writer_truncates_an_unsealed_tail_before_appending(tmp_path):
+    binary = compile_oracle(tmp_path)
+    batched = module.SEGMENT_BATCHED
+    committed = module.SEGMENT_COMMITTED | batched
+    store_path = tmp_path / "oracle.bin"
+    build_log(store_path, [
+        (1, committed, b"FAIL"),
+        (2, module.SEGMENT_PROVISIONAL | batched, b"obs"),
+        (3, committed, b"FAIL"),
+        (3, module.SEGMENT_BATCH_SEAL, (2).to_bytes(8, "little")),
+        (4, committed, b"FAIL"),
+    ])
+    with module.OracleStore(store_path) as store:
+        sealed_end = store.recover_log().log_end
+    assert sealed_end < store_path.stat().st_size
+
+    completed = subprocess.run([str(binary), str(store_path)], check=True, capture_output=True, text=True)
+    assert completed.stdout.strip() == "VERIFIED"
+    with module.OracleStore(store_path) as store:
+        assert store.recover_log(use_index=False).latest_verdict_id == 5
+        resumed = store.find_segment(4)
+        assert resumed.offset == sealed_end
+        assert resumed.state == module.SEGMENT_PROVISIONAL | batched
+
+
+@pytest.mark.skipif(shutil.which("cc") is None, reason="C compiler unavailable")
+def test_group_commit_benchmark_reports_each_batch_size(tmp_path):
+    binary = compile_oracle(tmp_path)
+    completed = subprocess.run(
+        [str(binary), "--bench-group-commit", str(tmp_path / "bench.bin"), "512"],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    batches = [line.split()[0] for line in completed.stdout.splitlines()]
+    assert batches == ["batch=1", "batch=16", "batch=256"]
+
+
+@pytest.mark.skipif(shutil.which("cc") is None, reason="C compiler unavailable")
+def test_c_checkpoints_write_only_the_dirty_path(tmp_path):
+    binary = compile_oracle(tmp_path)
+    store_path = tmp_path / "oracle.bin"
+    growth = []
+    for _ in range(300):
+        before = store_path.stat().st_size if store_path.exists() else 0
+        completed = subprocess.run([str(binary), str(store_path)], check=True, capture_output=True, text=True)
+        assert completed.stdout.strip() == "VERIFIED"
+        growth.append(store_path.stat().st_size - before)
+
+    with module.OracleStore(store_path) as store:
+        assert store.verify_file() == module.VERIFY_OK
+        index = store.store_index()
+        assert (index.leaf_count, index.level_count) == (300, 3)
+        assert all(store.verify_inclusion(i) for i in (0, 15, 16, 255, 256, 299))
+
+    # a checkpoint that moves no array appends one page, one StoreIndex and one node per level
+    assert growth[-1] == growth[-2] < 3 * module.ORACLE_PAGE_SIZE
+
+    raw = bytearray(store_path.read_bytes())
+    raw[16:24] = (0x00010000).to_bytes(8, "little")
+    raw[104:136] = module.hash32(bytes(raw[:module.HEADER_HASHED_BYTES]))
+    store_path.write_bytes(bytes(raw))
+    completed = subprocess.run([str(binary), str(store_path)], capture_output=True, text=True)
+    assert completed.returncode == 2
+    assert completed.stdout.strip() == "UNSUPPORTED VERSION 0x00010000 (expected 0x00020000)"
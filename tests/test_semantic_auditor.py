@@ -16,3 +16,119 @@ def test_semantic_auditor_sample_csv():
     assert result["rows"] == 6
     assert result["decision"] in {"REVIEWABLE", "UNSTABLE_HIGH_NOISE"}
     assert sum(result["clusters"].values()) == 6
+
+
+def test_incremental_audit_matches_full_audit_after_append(tmp_path):
+    csv_path = tmp_path / "tickets.csv"
+    state_path = tmp_path / "state.json"
+    lines = (REPO_ROOT / "samples" / "sample_support_tickets.csv").read_text(encoding="utf-8").splitlines()
+
+    csv_path.write_text("\n".join(lines[:4]) + "\n", encoding="utf-8")
+    first = module.run_incremental_audit(str(csv_path), "text", state_path)
+    assert first["rows"] == 3
+
+    with csv_path.open("a", encoding="utf-8") as handle:
+        handle.write("\n".join(lines[4:]) + "\n")
+    merged = module.run_incremental_audit(str(csv_path), "text", state_path)
+
+    assert merged == module.run_audit(module.load_input(str(csv_path), "text"))
+
+
+def test_incremental_audit_resumes_only_at_whole_records(tmp_path):
+    csv_path = tmp_path / "tickets.csv"
+    state_path = tmp_path / "state.json"
+    # the export is cut inside a quoted field that itself contains a newline
+    csv_path.write_text('text\n"Login blocked\nafter reset"\n"Refund please\n', encoding="utf-8")
+    first = module.run_incremental_audit(str(csv_path), "text", state_path)
+    assert first["rows"] == 1
+    assert first["clusters"] == {"access": 1}
+
+    with csv_path.open("a", encoding="utf-8") as handle:
+        handle.write('I was charged twice"\n"App crash on save"\n')
+    merged = module.run_incremental_audit(str(csv_path), "text", state_path)
+
+    assert merged == module.run_audit(module.load_input(str(csv_path), "text"))
+    assert merged["clusters"] == {"access": 1, "billing": 1, "incident": 1}
+
+
+def test_incremental_audit_hashes_only_the_boundary_window(tmp_path, monkeypatch):
+    monkeypatch.setattr(module, "BOUNDARY_WINDOW_BYTES", 32)
+    csv_path = tmp_path / "tickets.csv"
+    state_path = tmp_path / "state.json"
+    rows = [f'"Widget question {n:04d}"\n' for n in range(50)] + ['"Refund"\n']
+    csv_path.write_text("text\n" + "".join(rows), encoding="utf-8")
+    module.run_incremental_audit(str(csv_path), "text", state_path)
+
+    # bytes before the window are not re-read, bytes inside it are
+    raw = bytearray(csv_path.read_bytes())
+    raw[raw.index(b"0007")] = ord("9")
+    csv_path.write_bytes(bytes(raw))
+    assert module.run_incremental_audit(str(csv_path), "text", state_path)["rows"] == 51
+
+    raw[raw.index(b"Refund") + 1] = ord("a")
+    csv_path.write_bytes(bytes(raw))
+    with csv_path.open("a", encoding="utf-8") as handle:
+        handle.write('"App crash"\n')
+    rebuilt = module.run_incremental_audit(str(csv_path), "text", state_path)
+    assert rebuilt == module.run_audit(module.load_input(str(csv_path), "text"))
+    assert rebuilt["clusters"] == {"general": 51, "incident": 1}
+
+
+def test_incremental_audit_rebuilds_when_prefix_changes(tmp_path):
+    csv_path = tmp_path / "tickets.csv"
+    state_path = tmp_path / "state.json"
+    csv_path.write_text('text\n"App crash on save"\n"Refund my payment"\n', encoding="utf-8")
+    module.run_incremental_audit(str(csv_path), "text", state_path)
+
+    csv_path.write_text('text\n"Widget color question"\n"Refund my payment"\n"Another question"\n', encoding="utf-8")
+    result = module.run_incremental_audit(str(csv_path), "text", state_path)
+
+    assert result == {
+        "rows": 3,
+        "clusters": {"general": 2, "billing": 1},
+        "noise_ratio": 0.6667,
+        "decision": "UNSTABLE_HIGH_NOISE",
+    }
+
+
+def test_windowed_audit_flags_high_noise_windows(tmp_path):
+    csv_path = tmp_path / "timed.csv"
+    csv_path.write_text(
+        "ts,text\n"
+        '2026-01-01T00:05:00Z,"App crash on save"\n'
+        '2026-01-01T00:20:00Z,"Refund my payment"\n'
+        '2026-01-01T01:10:00Z,"Widget color question"\n'
+        '2026-01-01T01:40:00Z,"Another question"\n',
+        encoding="utf-8",
+    )
+    df = module.load_timed_input(str(csv_path), "text", "ts")
+
+    tumbling = module.run_windowed_audit(df, "1h")
+    assert tumbling["rows"] == [2, 2]
+    assert tumbling["noise_ratio"] == [0.0, 1.0]
+    assert tumbling["flagged"] == [False, True]
+
+    sliding = module.run_windowed_audit(df, "1h", "30min")
+    assert sliding["rows"] == [2, 2, 1, 2, 1]
+    assert sliding["clusters"]["general"] == [0, 0, 1, 2, 1]
+    assert sliding["flagged"] == [False, False, True, True, True]
+    assert sliding["start"][0] == "2025-12-31T23:30:00+00:00"
+    assert sliding["end"][-1] == "2026-01-01T02:30:00+00:00"
+
+
+def test_windowed_audit_flags_before_rounding(tmp_path, monkeypatch):
+    # 1/3 is above this threshold, but its rounded value 0.3333 is not
+    monkeypatch.setattr(module, "NOISE_THRESHOLD", 0.33333)
+    csv_path = tmp_path / "timed.csv"
+    csv_path.write_text(
+        "ts,text\n"
+        '2026-01-01T00:05:00Z,"App crash on save"\n'
+        '2026-01-01T00:10:00Z,"Refund my payment"\n'
+        '2026-01-01T00:20:00Z,"Widget color question"\n',
+        encoding="utf-8",
+    )
+    df = module.load_timed_input(str(csv_path), "text", "ts")
+    windowed = module.run_windowed_audit(df, "1h")
+    assert windowed["noise_ratio"] == [0.3333]
+    assert windowed["flagged"] == [True]
+    assert module.run_audit(df)["decision"] == "UNSTABLE_HIGH_NOISE"
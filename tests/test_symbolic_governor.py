@@ -0,0 +1,135 @@
+import importlib.util
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+requires_z3 = pytest.mark.skipif(importlib.util.find_spec("z3") is None, reason="z3-solver not installed")
+MODES = ["compiled", pytest.param("z3", marks=requires_z3)]
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+GATE_DIR = REPO_ROOT / "ai-failure-gates" / "CLG"
+sys.path.insert(0, str(GATE_DIR))
+
+
+def load(name: str, filename: str):
+    spec = importlib.util.spec_from_file_location(name, GATE_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    return module
+
+
+governor = load("symbolic_governor", "symbolic_governor.py")
+bench = load("bench_symbolic_governor", "bench_symbolic_governor.py")
+
+
+@requires_z3
+def test_preasserted_policy_matches_per_request_rebuild():
+    stream = bench.request_stream(seed=7, count=400)
+    legacy, _ = bench.run(bench.LegacyIndustrialGovernor(daily_budget=20_000), stream)
+    solver, _ = bench.run(governor.IndustrialGovernor(daily_budget=20_000, mode="z3"), stream)
+    current, _ = bench.run(governor.IndustrialGovernor(daily_budget=20_000), stream)
+
+    assert current == solver == legacy
+    reasons = {v.get("reason") for v in current}
+    assert {"CIRCUIT_TRIPPED", "SYSTEM_HARD_LOCK"} <= reasons
+    assert any(v["verdict"] == "QUALIFIED" for v in current)
+
+
+@requires_z3
+def test_compiled_policy_agrees_with_z3_on_randomized_requests():
+    rng = random.Random(2026)
+    gate = governor.IndustrialGovernor(mode="cross_check")
+    amounts = [-1, 0, 1, 99, 100, 101, 499, 500, 501, 999, 1_000, 1_001, 50.5, 99.99, 100.0, -0.5, True]
+    balances = [-1, 0, 1, 10_000, 0.0, 99.99, -0.5, 7.0]
+    tiers = ["STANDARD", "VIP", "standard", "", "STANDARD "]
+    threats = ["LOW", "HIGH", "high", ""]
+    verdicts = set()
+
+    for _ in range(500):
+        amount = rng.choice(amounts) if rng.random() < 0.7 else rng.randint(-50, 2_000)
+        req_a = {"key": "k", "amount": amount, "balance": rng.choice(balances), "tier": rng.choice(tiers)}
+        req_b = {"key": rng.choice(["k", "k", "k", "x"]), "amount": amount + rng.choice([0, 0, 0, 1])}
+        verdicts.add(gate._stateless_check(req_a, req_b, rng.choice(threats)))
+
+    assert verdicts == {"sat", "unsat"}
+
+
+def test_compiled_policy_rejects_fractional_amounts_and_balances():
+    gate = governor.IndustrialGovernor(failure_threshold=100)
+    process = {"declared": [], "executed": [], "incoming": 0, "outgoing": 0}
+    for amount, balance in ((50.5, 10), (99.99, 10), (50, 99.99), (50, float("nan")), ("50", 10)):
+        req_a = {"key": "k", "amount": amount, "balance": balance, "tier": "STANDARD"}
+        assert gate.authorize(req_a, {"key": "k", "amount": amount}, process, {})["verdict"] == "FAIL_CLOSED"
+    req_a = {"key": "k", "amount": 50.0, "balance": 10, "tier": "STANDARD"}
+    assert gate.authorize(req_a, {"key": "k", "amount": 50}, process, {})["verdict"] == "QUALIFIED"
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_authorize_batch_does_not_share_verdicts_across_balances(mode):
+    process = {"declared": [], "executed": [], "incoming": 0, "outgoing": 0}
+    requests = [
+        ({"key": "k", "amount": 50, "balance": balance, "tier": "STANDARD"}, {"key": "k", "amount": 50}, process, {})
+        for balance in (5, 99.99, 7, -0.5, 0)
+    ]
+    gate = governor.IndustrialGovernor(failure_threshold=100, mode=mode)
+    assert [v["verdict"] for v in gate.authorize_batch(requests)] == [
+        "QUALIFIED", "FAIL_CLOSED", "QUALIFIED", "FAIL_CLOSED", "QUALIFIED",
+    ]
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_authorize_batch_matches_sequential_authorize(mode):
+    stream = bench.request_stream(seed=11, count=600)
+    sequential = governor.IndustrialGovernor(daily_budget=30_000, mode=mode)
+    batched = governor.IndustrialGovernor(daily_budget=30_000, mode=mode)
+    expected, _ = bench.run(sequential, stream)
+
+    assert batched.authorize_batch(stream[:250]) + batched.authorize_batch(stream[250:]) == expected
+    assert batched.cumulative_spend == sequential.cumulative_spend
+    assert batched.is_hard_locked == sequential.is_hard_locked
+    assert len(batched.violation_timestamps) == len(sequential.violation_timestamps)
+
+
+def test_violation_window_expires_old_entries(monkeypatch):
+    clock = {"now": 1_000.0}
+    monkeypatch.setattr(governor.time, "time", lambda: clock["now"])
+    gate = governor.IndustrialGovernor(failure_threshold=3)
+    bad = ({"key": "k", "amount": 10, "balance": -1, "tier": "VIP"}, {"key": "k", "amount": 10},
+           {"declared": [], "executed": [], "incoming": 0, "outgoing": 0}, {})
+
+    for now in (1_000.0, 1_030.0, 1_060.0):
+        clock["now"] = now
+        assert gate.authorize(*bad)["verdict"] == "FAIL_CLOSED"
+    assert list(gate.violation_timestamps) == [1_030.0, 1_060.0]
+    assert not gate.is_hard_locked
+
+    clock["now"] = 1_061.0
+    assert gate.authorize(*bad) == {"verdict": "FAIL_CLOSED", "reason": "CIRCUIT_TRIPPED"}
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_concurrent_authorize_keeps_budget_and_breaker_consistent(mode):
+    import threading
+
+    stream = [r[:4] + (10,) for r in bench.request_stream(seed=3, count=800)]
+    gate = governor.IndustrialGovernor(daily_budget=50_000, failure_threshold=10**6, mode=mode)
+    results = []
+
+    def worker(chunk):
+        results.extend((request[0]["amount"], gate.authorize(*request)) for request in chunk)
+
+    threads = [threading.Thread(target=worker, args=(stream[i::4],)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    qualified = [amount for amount, verdict in results if verdict["verdict"] == "QUALIFIED"]
+    assert len(results) == len(stream)
+    assert gate.cumulative_spend == sum(qualified) <= 50_000
+    assert sorted(v["new_burn"] for _, v in results if "new_burn" in v)[-1] == gate.cumulative_spend
+    assert len(gate.violation_timestamps) == len(results) - len(qualified)
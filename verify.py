@@ -97,7 +97,12 @@ def run_failure_oracle() -> tuple[bool, str]:
     expected_path = REPO_ROOT / "samples" / "sample_failure_oracle_output.json"
 
     expected = json.loads(expected_path.read_text(encoding="utf-8"))
-    actual = module.run_oracle("work-samples/failure_oracle.c", seed=2026, skip_docker=True)
+    actual = module.run_oracle(
+        "work-samples/failure_oracle.c",
+        seed=2026,
+        skip_docker=True,
+        hash_cache=os.environ.get("FAILURE_ORACLE_HASH_CACHE") or None,
+    )
 
     if actual == expected:
         return True, ""
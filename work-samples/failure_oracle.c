@@ -11,16 +11,23 @@
 #include <unistd.h>
 #include <fcntl.h>
 #include <time.h>
+#include <limits.h>
+#include <sys/uio.h>
+#include <sys/stat.h>
 
 /* =========================
    CONSTANTS
    ========================= */
 
 #define ORACLE_MAGIC "FAILURE_ORACLE_01"
-#define ORACLE_VERSION 0x00010000ULL
+#define ORACLE_VERSION 0x00020000ULL   /* 2.0: StoreIndex + index_offset layout */
 #define ORACLE_PAGE_SIZE 4096
 #define ORACLE_HASH_LEN 32
 #define ORACLE_MERKLE_FANOUT 16
+#define ORACLE_MAX_LEVELS 16
+#define ORACLE_STORE_MAGIC "ORSTORE1"
+#define ORACLE_INDEX_MAGIC "ORSEGIX1"
+#define ORACLE_INDEX_INTERVAL 4096
 
 #define STATE_SEALED    0
 #define STATE_CHECKING  1
@@ -30,6 +37,15 @@
 
 #define SEGMENT_PROVISIONAL 0
 #define SEGMENT_COMMITTED   1
+#define SEGMENT_BATCH_SEAL  2
+#define SEGMENT_BLOB        3       /* envelope: payload is non-log data, skipped by scans */
+#define SEGMENT_INDEX       4       /* payload is an IndexCheckpoint */
+#define SEGMENT_BATCHED     0x100   /* flag: segment belongs to a group commit */
+#define SEGMENT_STATE_MASK  0xFF
+
+#ifndef IOV_MAX
+#define IOV_MAX 1024
+#endif
 #define ASSERTION_VERDICT   0xFFFFFFFFFFFFFFFFULL
 
 /* =========================
@@ -66,7 +82,8 @@ typedef struct {
     uint64_t file_state;
     uint64_t timestamp_unix;
 
-    uint8_t  reserved[40];
+    uint64_t index_offset;      /* latest SEGMENT_INDEX checkpoint, 0 = none */
+    uint8_t  reserved[32];
 } OracleHeader;
 
 typedef struct {
@@ -95,8 +112,49 @@ typedef struct {
     uint8_t  child_hashes[16][32];
     uint8_t  node_hash[32];
 } MerkleNode;
+
+/* Written at store_offset on every checkpoint, followed by the frontier:
+   the last node of every level, level 1 first. The header flip commits it.
+   All other nodes of level L (1..level_count) are full and never change, so
+   they live in a preallocated array: node j < level_counts[L-1] - 1 sits at
+   level_offsets[L-1] + j * sizeof(MerkleNode), the last one at
+   frontier_offset + (L-1) * sizeof(MerkleNode). The node covering leaf i at
+   level L is j = i / 16^L. The leaf table and level arrays only ever gain
+   slots past their committed counts, so a checkpoint never overwrites
+   anything the previous StoreIndex still points at. */
+typedef struct {
+    char     magic[8];
+    uint64_t leaf_count;
+    uint64_t level_count;
+    uint64_t leaf_table_offset;
+    uint64_t leaf_table_capacity;
+    uint64_t frontier_offset;
+    uint64_t level_offsets[ORACLE_MAX_LEVELS];
+    uint64_t level_counts[ORACLE_MAX_LEVELS];
+    uint64_t level_capacities[ORACLE_MAX_LEVELS];
+    uint8_t  root_hash[32];
+} StoreIndex;
+/* Payload of a SEGMENT_INDEX segment, followed by entry_count IndexEntry.
+   Covers the segments appended since prev_index_offset; resume_offset is
+   where recovery continues scanning, with last_commit_id already applied. */
+typedef struct {
+    char     magic[8];
+    uint64_t prev_index_offset;
+    uint64_t first_segment_id;
+    uint64_t last_segment_id;
+    uint64_t entry_count;
+    uint64_t last_commit_id;
+    uint64_t resume_offset;
+} IndexCheckpoint;
+
+typedef struct {
+    uint64_t segment_id;
+    uint64_t offset;
+} IndexEntry;
 #pragma pack(pop)
 
+#define ORACLE_LEAF_CAPACITY (ORACLE_PAGE_SIZE - sizeof(EvidenceLeaf))
+
 /* =========================
    HEADER UTIL
    ========================= */
@@ -105,45 +163,273 @@ static void seal_header(OracleHeader *h) {
     hash32((uint8_t*)h, 0xC0, h->hdr_hash);
 }
 
+/* Files written by another format version are rejected, not reinterpreted. */
 static int validate_header(OracleHeader *h) {
     uint8_t chk[32];
     hash32((uint8_t*)h, 0xC0, chk);
     return memcmp(chk, h->hdr_hash, 32) == 0 &&
-           memcmp(h->magic, ORACLE_MAGIC, 16) == 0;
+           memcmp(h->magic, ORACLE_MAGIC, 16) == 0 &&
+           h->version == ORACLE_VERSION;
+}
+
+/* =========================
+   SEGMENT INDEX (IN MEMORY)
+   ========================= */
+
+typedef struct {
+    IndexEntry *entries;        /* segments appended since the last checkpoint */
+    uint64_t    count;
+    uint64_t    cap;
+    uint64_t    last_commit;
+    uint64_t    prev_offset;
+} SegmentIndexer;
+
+static void index_note(SegmentIndexer *ix, uint64_t id, uint64_t offset) {
+    if (!ix) return;
+    if (ix->count == ix->cap) {
+        ix->cap = ix->cap ? ix->cap * 2 : 256;
+        ix->entries = realloc(ix->entries, ix->cap * sizeof(IndexEntry));
+    }
+    ix->entries[ix->count].segment_id = id;
+    ix->entries[ix->count].offset = offset;
+    ix->count++;
 }
 
 /* =========================
-   APPEND PROOF SEGMENT
+   GROUP COMMIT
    ========================= */
 
-static int append_segment(
+typedef struct {
+    uint64_t    assertion;
+    uint32_t    state;
+    uint32_t    len;
+    const void *payload;
+} SegmentRequest;
+
+static int write_all_iov(int fd, struct iovec *iov, int cnt) {
+    while (cnt > 0) {
+        int batch = cnt > IOV_MAX ? IOV_MAX : cnt;
+        ssize_t n = writev(fd, iov, batch);
+        if (n < 0) return -1;
+        /* advance past fully written vectors, trim a partially written one */
+        while (batch > 0 && (size_t)n >= iov->iov_len) {
+            n -= iov->iov_len;
+            iov++; cnt--; batch--;
+        }
+        if (batch > 0 && n > 0) {
+            iov->iov_base = (uint8_t *)iov->iov_base + n;
+            iov->iov_len -= n;
+        }
+    }
+    return 0;
+}
+
+/* Queue n segments and persist them with one vectored write and one fsync.
+   Every segment carries SEGMENT_BATCHED; a trailing SEGMENT_BATCH_SEAL whose
+   payload is the batch size closes the group. recover_log only honours
+   COMMITTED verdicts inside a batch once its seal has been read back intact,
+   so a torn group write never advances latest_verdict_id. */
+static int append_batch(
     int fd,
+    SegmentIndexer *ix,
     uint64_t *seg_id,
     uint8_t prev_hash[32],
-    uint64_t assertion,
-    uint32_t state,
-    const void *payload,
-    uint32_t len,
+    const SegmentRequest *reqs,
+    uint32_t n,
     uint8_t out_hash[32]
 ) {
-    ProofSegment seg;
-    seg.segment_id = ++(*seg_id);
-    seg.assertion_id = assertion;
-    seg.timestamp_unix = time(NULL);
-    seg.state = state;
-    seg.data_length = len;
-    memcpy(seg.pre_hash, prev_hash, 32);
+    if (n == 0) return 0;
 
+    ProofSegment *segs = calloc(n + 1, sizeof(ProofSegment));
+    struct iovec *iov = calloc(2 * (n + 1), sizeof(struct iovec));
+    uint64_t count = n;
+    uint8_t chain[32];
     uint8_t buf[64];
-    memcpy(buf, prev_hash, 32);
-    hash32(payload, len, buf + 32);
-    hash32(buf, 64, seg.post_hash);
+    uint64_t now = time(NULL);
+    int cnt = 0;
+
+    memcpy(chain, prev_hash, 32);
+    for (uint32_t i = 0; i <= n; i++) {
+        ProofSegment *seg = &segs[i];
+        const void *payload = i < n ? reqs[i].payload : &count;
+        uint32_t len = i < n ? reqs[i].len : sizeof(count);
+
+        seg->segment_id = i < n ? ++(*seg_id) : *seg_id;
+        seg->assertion_id = i < n ? reqs[i].assertion : ASSERTION_VERDICT;
+        seg->timestamp_unix = now;
+        seg->state = i < n ? (reqs[i].state | SEGMENT_BATCHED) : SEGMENT_BATCH_SEAL;
+        seg->data_length = len;
+        memcpy(seg->pre_hash, chain, 32);
+
+        memcpy(buf, chain, 32);
+        hash32(payload, len, buf + 32);
+        hash32(buf, 64, seg->post_hash);
+        if (i < n) memcpy(chain, seg->post_hash, 32);
+
+        iov[cnt].iov_base = seg;
+        iov[cnt++].iov_len = sizeof(*seg);
+        iov[cnt].iov_base = (void *)payload;
+        iov[cnt++].iov_len = len;
+    }
 
-    write(fd, &seg, sizeof(seg));
-    write(fd, payload, len);
-    fsync(fd);
+    off_t at = lseek(fd, 0, SEEK_END);
+    int rc = write_all_iov(fd, iov, cnt);
+    if (rc == 0) rc = fsync(fd);
+
+    if (rc == 0) {
+        memcpy(out_hash, chain, 32);
+        for (uint32_t i = 0; i < n; i++) {
+            index_note(ix, segs[i].segment_id, at);
+            if (ix && reqs[i].state == SEGMENT_COMMITTED) ix->last_commit = segs[i].segment_id;
+            at += sizeof(ProofSegment) + segs[i].data_length;
+        }
+    }
+    free(iov);
+    free(segs);
+    return rc;
+}
+
+/* =========================
+   MERKLE TREE (FANOUT 16, IN MEMORY)
+   ========================= */
+
+/* Hashes [base, count) of one level; a loaded tree keeps only the group
+   under the frontier node above, so earlier hashes are never read back. */
+typedef struct {
+    uint8_t (*hashes)[32];
+    uint64_t base;
+    uint64_t count;
+    uint64_t cap;
+} HashLevel;
+
+/* A preallocated on-disk array: slots [0, stored) are written and final.
+   After a move, moved_from is where those slots still sit until copied. */
+typedef struct {
+    uint64_t offset;
+    uint64_t capacity;
+    uint64_t stored;
+    uint64_t moved_from;
+} DiskArray;
+
+typedef struct {
+    HashLevel levels[ORACLE_MAX_LEVELS + 1];   /* levels[0] = leaf hashes */
+    uint64_t *leaf_offsets;                    /* indexed like levels[0].hashes */
+    uint64_t  depth;                           /* index of the root level */
+    DiskArray leaf_table;
+    DiskArray arrays[ORACLE_MAX_LEVELS];       /* arrays[L-1]: full nodes of level L */
+} MerkleTree;
+
+static uint8_t *level_hash(const HashLevel *lvl, uint64_t i) {
+    return lvl->hashes[i - lvl->base];
+}
+
+static void level_reserve(HashLevel *lvl, uint64_t need) {
+    need -= lvl->base;
+    if (need <= lvl->cap) return;
+    uint64_t cap = lvl->cap ? lvl->cap : 16;
+    while (cap < need) cap *= 2;
+    lvl->hashes = realloc(lvl->hashes, cap * 32);
+    lvl->cap = cap;
+}
+
+static void node_hash_of(const HashLevel *children, uint64_t parent, uint8_t out[32]) {
+    uint64_t first = parent * ORACLE_MERKLE_FANOUT;
+    uint64_t count = children->count - first;
+    if (count > ORACLE_MERKLE_FANOUT) count = ORACLE_MERKLE_FANOUT;
+    hash32(level_hash(children, first), count * 32, out);
+}
+
+/* Appending a leaf rehashes one node per level: O(log16 n). */
+static void merkle_append(MerkleTree *t, const uint8_t leaf_hash[32], uint64_t offset) {
+    HashLevel *leaves = &t->levels[0];
+    level_reserve(leaves, leaves->count + 1);
+    t->leaf_offsets = realloc(t->leaf_offsets, leaves->cap * sizeof(uint64_t));
+    memcpy(level_hash(leaves, leaves->count), leaf_hash, 32);
+    t->leaf_offsets[leaves->count - leaves->base] = offset;
+    uint64_t idx = leaves->count++;
+
+    uint64_t lvl = 0;
+    do {
+        HashLevel *parent = &t->levels[lvl + 1];
+        idx /= ORACLE_MERKLE_FANOUT;
+        if (idx == parent->count) {
+            level_reserve(parent, idx + 1);
+            parent->count++;
+        }
+        node_hash_of(&t->levels[lvl], idx, level_hash(parent, idx));
+        lvl++;
+    } while (t->levels[lvl].count > 1 && lvl < ORACLE_MAX_LEVELS);
+    if (lvl > t->depth) t->depth = lvl;
+}
+
+static void merkle_free(MerkleTree *t) {
+    for (int i = 0; i <= ORACLE_MAX_LEVELS; i++) free(t->levels[i].hashes);
+    free(t->leaf_offsets);
+    memset(t, 0, sizeof(*t));
+}
+
+static void fill_node(const MerkleTree *t, uint64_t lvl, uint64_t idx, MerkleNode *node) {
+    const HashLevel *children = &t->levels[lvl - 1];
+    uint64_t first = idx * ORACLE_MERKLE_FANOUT;
+    uint64_t count = children->count - first;
+    if (count > ORACLE_MERKLE_FANOUT) count = ORACLE_MERKLE_FANOUT;
+
+    memset(node, 0, sizeof(*node));
+    node->node_id = (lvl << 56) | idx;
+    node->fanout = ORACLE_MERKLE_FANOUT;
+    node->child_count = (uint32_t)count;
+    memcpy(node->child_hashes, level_hash(children, first), count * 32);
+    memcpy(node->node_hash, level_hash(&t->levels[lvl], idx), 32);
+}
+
+static uint64_t node_offset(const StoreIndex *idx, uint64_t lvl, uint64_t i) {
+    if (i + 1 == idx->level_counts[lvl - 1])
+        return idx->frontier_offset + (lvl - 1) * sizeof(MerkleNode);
+    return idx->level_offsets[lvl - 1] + i * sizeof(MerkleNode);
+}
 
-    memcpy(out_hash, seg.post_hash, 32);
+/* Rebuild the appendable part of the tree from the committed StoreIndex:
+   one read of the frontier, whatever the number of leaves. Each frontier
+   node holds the hashes of the open group one level below it; every node
+   and leaf before those is full and only ever read back by verify_file. */
+static int load_tree(int fd, const OracleHeader *hdr, MerkleTree *t) {
+    memset(t, 0, sizeof(*t));
+    if (hdr->store_offset == 0) return 0;
+
+    StoreIndex idx;
+    if (pread(fd, &idx, sizeof(idx), hdr->store_offset) != sizeof(idx)) return 1;
+    if (memcmp(idx.magic, ORACLE_STORE_MAGIC, 8)) return 2;
+    if (idx.level_count == 0 || idx.level_count > ORACLE_MAX_LEVELS) return 2;
+
+    MerkleNode frontier[ORACLE_MAX_LEVELS];
+    ssize_t want = idx.level_count * sizeof(MerkleNode);
+    if (pread(fd, frontier, want, idx.frontier_offset) != want) return 1;
+
+    for (uint64_t lvl = 1; lvl <= idx.level_count; lvl++) {
+        const MerkleNode *node = &frontier[lvl - 1];
+        uint64_t count = idx.level_counts[lvl - 1];
+        HashLevel *below = &t->levels[lvl - 1];
+        below->base = (count - 1) * ORACLE_MERKLE_FANOUT;
+        below->count = lvl == 1 ? idx.leaf_count : idx.level_counts[lvl - 2];
+        if (count == 0 || below->count - below->base != node->child_count ||
+            node->child_count == 0 || node->child_count > ORACLE_MERKLE_FANOUT) return 2;
+        level_reserve(below, below->count);
+        memcpy(below->hashes, node->child_hashes, node->child_count * 32);
+        t->arrays[lvl - 1] = (DiskArray){idx.level_offsets[lvl - 1], idx.level_capacities[lvl - 1], count - 1, 0};
+    }
+    HashLevel *root = &t->levels[idx.level_count];
+    if (idx.level_counts[idx.level_count - 1] != 1) return 2;
+    level_reserve(root, 1);
+    memcpy(root->hashes[0], frontier[idx.level_count - 1].node_hash, 32);
+    root->count = 1;
+
+    /* leaf offsets of the open group; earlier slots of the table are final */
+    HashLevel *leaves = &t->levels[0];
+    t->leaf_offsets = malloc(leaves->cap * sizeof(uint64_t));
+    want = (leaves->count - leaves->base) * sizeof(uint64_t);
+    if (pread(fd, t->leaf_offsets, want, idx.leaf_table_offset + leaves->base * sizeof(uint64_t)) != want) return 1;
+    t->leaf_table = (DiskArray){idx.leaf_table_offset, idx.leaf_table_capacity, idx.leaf_count, 0};
+    t->depth = idx.level_count;
     return 0;
 }
 
@@ -151,36 +437,139 @@ static int append_segment(
    CHECKPOINT → MERKLE
    ========================= */
 
+/* Make room for `need` slots of `width` bytes. An array that has outgrown its
+   region moves to a fresh, doubled one at *cursor (inside the checkpoint's
+   envelope); disk_copy then carries its committed slots over from the old
+   region, so moves cost O(1) amortised and need nothing held in memory. */
+static void disk_reserve(DiskArray *a, uint64_t need, uint64_t width, uint64_t *cursor) {
+    if (need <= a->capacity) return;
+    uint64_t cap = a->capacity ? a->capacity * 2 : 16;
+    while (cap < need) cap *= 2;
+    if (a->stored) a->moved_from = a->offset;
+    a->offset = *cursor;
+    a->capacity = cap;
+    *cursor += cap * width;
+}
+
+static void disk_copy(int fd, DiskArray *a, uint64_t width) {
+    uint8_t buf[16 * ORACLE_PAGE_SIZE];
+    uint64_t total = a->stored * width;
+    for (uint64_t done = 0; a->moved_from && done < total; ) {
+        size_t chunk = total - done < sizeof(buf) ? total - done : sizeof(buf);
+        if (pread(fd, buf, chunk, a->moved_from + done) != (ssize_t)chunk) break;
+        pwrite(fd, buf, chunk, a->offset + done);
+        done += chunk;
+    }
+    a->moved_from = 0;
+}
+
+/* Evidence is split into page-aligned leaves (one EvidenceLeaf per page).
+   Only the new leaves are hashed, and only what they dirtied is written:
+   their leaf-table slots, the level-array slots of nodes that just filled
+   up, and a fresh StoreIndex plus one frontier node per level. That is
+   O(new leaves + log16 n) per checkpoint instead of a rewrite of every
+   node. Pages, moved arrays and the StoreIndex sit inside one SEGMENT_BLOB
+   envelope so proof-log scans step over them; the header flip commits. */
 static int checkpoint_store(
     int fd,
     OracleHeader *hdr,
+    MerkleTree *tree,
     const uint8_t *data,
     uint32_t len
 ) {
-    EvidenceLeaf leaf;
-    leaf.block_id = 1;
-    leaf.data_length = len;
-    memset(leaf.reserved, 0, 4);
-    hash32(data, len, leaf.leaf_hash);
-
-    off_t pos = lseek(fd, 0, SEEK_END);
-    hdr->store_offset = pos;
-
-    write(fd, &leaf, sizeof(leaf));
-    write(fd, data, len);
-
-    MerkleNode root;
-    memset(&root, 0, sizeof(root));
-    root.node_id = 1;
-    root.fanout = 1;
-    root.child_count = 1;
-    memcpy(root.child_hashes[0], leaf.leaf_hash, 32);
-    hash32(leaf.leaf_hash, 32, root.node_hash);
-
-    write(fd, &root, sizeof(root));
-
-    memcpy(hdr->root_hash, root.node_hash, 32);
-    hdr->store_length = sizeof(leaf) + len + sizeof(root);
+    static const uint8_t zeros[ORACLE_PAGE_SIZE];
+    uint8_t page[ORACLE_PAGE_SIZE];
+    uint64_t env_at = lseek(fd, 0, SEEK_END);
+    uint64_t pad = (ORACLE_PAGE_SIZE - (env_at + sizeof(ProofSegment)) % ORACLE_PAGE_SIZE) % ORACLE_PAGE_SIZE;
+    uint64_t first_leaf = tree->levels[0].count;
+    uint64_t pos = env_at + sizeof(ProofSegment) + pad;
+    uint32_t done = 0;
+
+    /* hash the new leaves first so the envelope length is known up front */
+    do {
+        uint32_t chunk = len - done;
+        if (chunk > ORACLE_LEAF_CAPACITY) chunk = ORACLE_LEAF_CAPACITY;
+        uint8_t leaf_hash[32];
+        hash32(data + done, chunk, leaf_hash);
+        merkle_append(tree, leaf_hash, pos);
+        pos += ORACLE_PAGE_SIZE;
+        done += chunk;
+    } while (done < len);
+
+    uint64_t cursor = pos;
+    disk_reserve(&tree->leaf_table, tree->levels[0].count, sizeof(uint64_t), &cursor);
+    for (uint64_t lvl = 1; lvl <= tree->depth; lvl++)
+        disk_reserve(&tree->arrays[lvl - 1], tree->levels[lvl].count - 1, sizeof(MerkleNode), &cursor);
+
+    StoreIndex idx;
+    memset(&idx, 0, sizeof(idx));
+    memcpy(idx.magic, ORACLE_STORE_MAGIC, 8);
+    uint64_t store_at = cursor;
+    idx.leaf_count = tree->levels[0].count;
+    idx.level_count = tree->depth;
+    idx.leaf_table_offset = tree->leaf_table.offset;
+    idx.leaf_table_capacity = tree->leaf_table.capacity;
+    idx.frontier_offset = store_at + sizeof(idx);
+    for (uint64_t lvl = 1; lvl <= tree->depth; lvl++) {
+        idx.level_offsets[lvl - 1] = tree->arrays[lvl - 1].offset;
+        idx.level_counts[lvl - 1] = tree->levels[lvl].count;
+        idx.level_capacities[lvl - 1] = tree->arrays[lvl - 1].capacity;
+    }
+    memcpy(idx.root_hash, level_hash(&tree->levels[tree->depth], 0), 32);
+    cursor = idx.frontier_offset + tree->depth * sizeof(MerkleNode);
+
+    ProofSegment env;
+    memset(&env, 0, sizeof(env));
+    env.timestamp_unix = time(NULL);
+    env.state = SEGMENT_BLOB;
+    env.data_length = (uint32_t)(cursor - env_at - sizeof(env));
+    write(fd, &env, sizeof(env));
+    write(fd, zeros, pad);
+
+    done = 0;
+    for (uint64_t i = first_leaf; i < idx.leaf_count; i++) {
+        uint32_t chunk = len - done;
+        if (chunk > ORACLE_LEAF_CAPACITY) chunk = ORACLE_LEAF_CAPACITY;
+
+        EvidenceLeaf *leaf = (EvidenceLeaf *)page;
+        memset(page, 0, sizeof(page));
+        leaf->block_id = i + 1;
+        leaf->data_length = chunk;
+        memcpy(page + sizeof(*leaf), data + done, chunk);
+        memcpy(leaf->leaf_hash, level_hash(&tree->levels[0], i), 32);
+        write(fd, page, sizeof(page));
+        done += chunk;
+    }
+
+    /* StoreIndex and frontier first: they end the envelope, so any moved
+       array below it is zero-filled rather than past end of file */
+    pwrite(fd, &idx, sizeof(idx), store_at);
+    for (uint64_t lvl = 1; lvl <= tree->depth; lvl++) {
+        MerkleNode node;
+        fill_node(tree, lvl, tree->levels[lvl].count - 1, &node);
+        pwrite(fd, &node, sizeof(node), idx.frontier_offset + (lvl - 1) * sizeof(node));
+    }
+
+    DiskArray *table = &tree->leaf_table;
+    disk_copy(fd, table, sizeof(uint64_t));
+    pwrite(fd, tree->leaf_offsets + (table->stored - tree->levels[0].base),
+           (idx.leaf_count - table->stored) * sizeof(uint64_t),
+           table->offset + table->stored * sizeof(uint64_t));
+    table->stored = idx.leaf_count;
+    for (uint64_t lvl = 1; lvl <= tree->depth; lvl++) {
+        DiskArray *a = &tree->arrays[lvl - 1];
+        disk_copy(fd, a, sizeof(MerkleNode));
+        for (; a->stored + 1 < tree->levels[lvl].count; a->stored++) {
+            MerkleNode node;
+            fill_node(tree, lvl, a->stored, &node);
+            pwrite(fd, &node, sizeof(node), a->offset + a->stored * sizeof(node));
+        }
+    }
+    fsync(fd);
+
+    hdr->store_offset = store_at;
+    hdr->store_length = cursor - store_at;
+    memcpy(hdr->root_hash, idx.root_hash, 32);
     hdr->file_state = STATE_VERIFIED;
     hdr->timestamp_unix = time(NULL);
 
@@ -192,19 +581,125 @@ static int checkpoint_store(
     return 0;
 }
 
+/* =========================
+   SEGMENT INDEX CHECKPOINT
+   ========================= */
+
+/* Append the pending segment_id -> offset entries as a SEGMENT_INDEX segment
+   and seal its offset into the header. Called every ORACLE_INDEX_INTERVAL
+   segments and on clean shutdown, always between group commits. */
+static int write_index_checkpoint(int fd, OracleHeader *hdr, SegmentIndexer *ix) {
+    if (!ix || ix->count == 0) return 0;
+
+    off_t at = lseek(fd, 0, SEEK_END);
+    uint64_t payload_len = sizeof(IndexCheckpoint) + ix->count * sizeof(IndexEntry);
+
+    IndexCheckpoint ck;
+    memset(&ck, 0, sizeof(ck));
+    memcpy(ck.magic, ORACLE_INDEX_MAGIC, 8);
+    ck.prev_index_offset = ix->prev_offset;
+    ck.first_segment_id = ix->entries[0].segment_id;
+    ck.last_segment_id = ix->entries[ix->count - 1].segment_id;
+    ck.entry_count = ix->count;
+    ck.last_commit_id = ix->last_commit;
+    ck.resume_offset = at + sizeof(ProofSegment) + payload_len;
+
+    ProofSegment seg;
+    memset(&seg, 0, sizeof(seg));
+    seg.segment_id = ck.last_segment_id;
+    seg.timestamp_unix = time(NULL);
+    seg.state = SEGMENT_INDEX;
+    seg.data_length = (uint32_t)payload_len;
+
+    struct iovec iov[3] = {
+        {&seg, sizeof(seg)},
+        {&ck, sizeof(ck)},
+        {ix->entries, ix->count * sizeof(IndexEntry)},
+    };
+    if (write_all_iov(fd, iov, 3) || fsync(fd)) return -1;
+
+    hdr->index_offset = at;
+    if (ix->last_commit > hdr->latest_verdict_id) hdr->latest_verdict_id = ix->last_commit;
+    hdr->timestamp_unix = time(NULL);
+    seal_header(hdr);
+    pwrite(fd, hdr, sizeof(*hdr), 0);
+    fsync(fd);
+
+    ix->prev_offset = at;
+    ix->count = 0;
+    return 0;
+}
+
+static int maybe_index_checkpoint(int fd, OracleHeader *hdr, SegmentIndexer *ix) {
+    return ix && ix->count >= ORACLE_INDEX_INTERVAL ? write_index_checkpoint(fd, hdr, ix) : 0;
+}
+
+static int read_index_checkpoint(int fd, uint64_t at, IndexCheckpoint *ck) {
+    ProofSegment seg;
+    if (pread(fd, &seg, sizeof(seg), at) != sizeof(seg)) return -1;
+    if (seg.state != SEGMENT_INDEX || seg.data_length < sizeof(*ck)) return -1;
+    if (pread(fd, ck, sizeof(*ck), at + sizeof(seg)) != sizeof(*ck)) return -1;
+    if (memcmp(ck->magic, ORACLE_INDEX_MAGIC, 8)) return -1;
+    if (seg.data_length != sizeof(*ck) + ck->entry_count * sizeof(IndexEntry)) return -1;
+    return 0;
+}
+
 /* =========================
    RECOVERY
    ========================= */
 
-static int recover_log(int fd, OracleHeader *hdr) {
-    lseek(fd, hdr->log_offset, SEEK_SET);
+/* Resumes from the latest sealed IndexCheckpoint when there is one, so only
+   the tail written after it is scanned. A seal counting k segments covers
+   the k consecutive ids ending at its own segment_id, so an unsealed group
+   torn before it never borrows or spoils the next batch. *log_end is set
+   past the last segment that is not part of an unsealed group: everything
+   after it is a torn tail the writer truncates before appending. */
+static int recover_log(int fd, OracleHeader *hdr, uint64_t *log_end) {
     ProofSegment seg;
     uint64_t last_commit = hdr->latest_verdict_id;
+    uint64_t batch_commit = 0, batch_len = 0, batch_last = 0;
+    uint64_t start = hdr->log_offset;
+    struct stat st;
+    fstat(fd, &st);
+
+    IndexCheckpoint ck;
+    if (hdr->index_offset && read_index_checkpoint(fd, hdr->index_offset, &ck) == 0 &&
+        ck.resume_offset <= (uint64_t)st.st_size) {
+        start = ck.resume_offset;
+        if (ck.last_commit_id > last_commit) last_commit = ck.last_commit_id;
+    }
+    lseek(fd, start, SEEK_SET);
+    *log_end = start;
 
     while (read(fd, &seg, sizeof(seg)) == sizeof(seg)) {
+        off_t payload_at = lseek(fd, 0, SEEK_CUR);
+        if (payload_at + (off_t)seg.data_length > st.st_size) break;   /* torn tail */
+
+        if (seg.state == SEGMENT_BATCH_SEAL) {
+            uint64_t sealed = 0;
+            if (seg.data_length == sizeof(sealed) &&
+                read(fd, &sealed, sizeof(sealed)) != sizeof(sealed)) sealed = 0;
+            if (sealed && sealed <= batch_len && seg.segment_id == batch_last &&
+                batch_commit > batch_last - sealed)
+                last_commit = batch_commit;
+            batch_commit = batch_len = 0;
+            lseek(fd, payload_at + seg.data_length, SEEK_SET);
+            *log_end = payload_at + seg.data_length;
+            continue;
+        }
+
         lseek(fd, seg.data_length, SEEK_CUR);
-        if (seg.state == SEGMENT_COMMITTED)
-            last_commit = seg.segment_id;
+        if (seg.state & SEGMENT_BATCHED) {
+            if (batch_len && seg.segment_id != batch_last + 1)
+                batch_commit = batch_len = 0;   /* a new group after an unsealed one */
+            batch_len++;
+            batch_last = seg.segment_id;
+            if ((seg.state & SEGMENT_STATE_MASK) == SEGMENT_COMMITTED)
+                batch_commit = seg.segment_id;
+        } else {
+            if (seg.state == SEGMENT_COMMITTED) last_commit = seg.segment_id;
+            *log_end = payload_at + seg.data_length;
+        }
     }
 
     hdr->latest_verdict_id = last_commit;
@@ -223,36 +718,95 @@ static int verify_file(int fd) {
     if (read(fd, &hdr, sizeof(hdr)) != sizeof(hdr)) return 1;
     if (!validate_header(&hdr)) return 2;
 
-    lseek(fd, hdr.store_offset, SEEK_SET);
+    StoreIndex idx;
+    if (pread(fd, &idx, sizeof(idx), hdr.store_offset) != sizeof(idx)) return 3;
+    if (memcmp(idx.magic, ORACLE_STORE_MAGIC, 8)) return 3;
+    if (idx.level_count == 0 || idx.level_count > ORACLE_MAX_LEVELS) return 4;
+
+    /* Recompute every leaf from its data, then every level from its children. */
+    MerkleTree t;
+    memset(&t, 0, sizeof(t));
+    uint8_t page[ORACLE_PAGE_SIZE];
+    for (uint64_t i = 0; i < idx.leaf_count; i++) {
+        uint64_t off;
+        pread(fd, &off, sizeof(off), idx.leaf_table_offset + i * sizeof(off));
+        if (off % ORACLE_PAGE_SIZE ||
+            pread(fd, page, sizeof(page), off) != sizeof(page)) { merkle_free(&t); return 3; }
+
+        EvidenceLeaf *leaf = (EvidenceLeaf *)page;
+        uint8_t chk[32];
+        if (leaf->data_length > ORACLE_LEAF_CAPACITY) { merkle_free(&t); return 3; }
+        hash32(page + sizeof(*leaf), leaf->data_length, chk);
+        if (memcmp(chk, leaf->leaf_hash, 32)) { merkle_free(&t); return 3; }
+        merkle_append(&t, chk, off);
+    }
 
-    EvidenceLeaf leaf;
-    read(fd, &leaf, sizeof(leaf));
+    int rc = 0;
+    if (t.depth != idx.level_count) rc = 4;
+    for (uint64_t lvl = 1; rc == 0 && lvl <= t.depth; lvl++) {
+        if (t.levels[lvl].count != idx.level_counts[lvl - 1]) { rc = 4; break; }
+        for (uint64_t i = 0; i < t.levels[lvl].count; i++) {
+            MerkleNode node;
+            pread(fd, &node, sizeof(node), node_offset(&idx, lvl, i));
+            if (memcmp(node.node_hash, level_hash(&t.levels[lvl], i), 32)) { rc = 4; break; }
+        }
+    }
+    if (rc == 0 &&
+        (memcmp(level_hash(&t.levels[t.depth], 0), hdr.root_hash, 32) ||
+         memcmp(idx.root_hash, hdr.root_hash, 32))) rc = 4;
 
-    uint8_t *data = malloc(leaf.data_length);
-    read(fd, data, leaf.data_length);
+    merkle_free(&t);
+    return rc;
+}
 
-    uint8_t chk[32];
-    hash32(data, leaf.data_length, chk);
-    free(data);
+/* =========================
+   MAIN
+   ========================= */
 
-    if (memcmp(chk, leaf.leaf_hash, 32)) return 3;
+static double now_seconds(void) {
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec + ts.tv_nsec / 1e9;
+}
 
-    MerkleNode root;
-    read(fd, &root, sizeof(root));
-    if (memcmp(root.node_hash, hdr.root_hash, 32)) return 4;
+/* Segments/sec for group-commit batch sizes 1, 16 and 256. */
+static int bench_group_commit(const char *path, uint32_t total) {
+    static const uint32_t sizes[] = {1, 16, 256};
+    const char *payload = "FAIL";
+    SegmentRequest *reqs = calloc(256, sizeof(SegmentRequest));
+    for (int i = 0; i < 256; i++) {
+        reqs[i].assertion = ASSERTION_VERDICT;
+        reqs[i].state = SEGMENT_COMMITTED;
+        reqs[i].len = 4;
+        reqs[i].payload = payload;
+    }
 
+    for (size_t k = 0; k < sizeof(sizes) / sizeof(sizes[0]); k++) {
+        int fd = open(path, O_RDWR | O_CREAT | O_TRUNC, 0644);
+        uint64_t seg_id = 0;
+        uint8_t last_hash[32] = {0};
+        double start = now_seconds();
+        for (uint32_t done = 0; done < total; done += sizes[k])
+            append_batch(fd, NULL, &seg_id, last_hash, reqs, sizes[k], last_hash);
+        double elapsed = now_seconds() - start;
+        printf("batch=%-4u segments=%u seconds=%.3f segments_per_sec=%.0f\n",
+               sizes[k], total, elapsed, total / elapsed);
+        close(fd);
+    }
+    unlink(path);
+    free(reqs);
     return 0;
 }
 
-/* =========================
-   MAIN
-   ========================= */
-
 int main(int argc, char **argv) {
     if (argc < 2) {
-        printf("usage: %s oracle.bin\n", argv[0]);
+        printf("usage: %s oracle.bin | %s --bench-group-commit scratch.bin [segments]\n", argv[0], argv[0]);
         return 1;
     }
+    if (strcmp(argv[1], "--bench-group-commit") == 0) {
+        if (argc < 3) return 1;
+        return bench_group_commit(argv[2], argc > 3 ? (uint32_t)strtoul(argv[3], NULL, 10) : 4096);
+    }
 
     int fd = open(argv[1], O_RDWR | O_CREAT, 0644);
 
@@ -271,27 +825,52 @@ int main(int argc, char **argv) {
         lseek(fd, 0, SEEK_SET);
         read(fd, &hdr, sizeof(hdr));
         if (!validate_header(&hdr)) {
-            printf("INVALID HEADER\n");
+            if (memcmp(hdr.magic, ORACLE_MAGIC, 16) == 0 && hdr.version != ORACLE_VERSION)
+                printf("UNSUPPORTED VERSION 0x%08llx (expected 0x%08llx)\n",
+                       (unsigned long long)hdr.version, (unsigned long long)ORACLE_VERSION);
+            else
+                printf("INVALID HEADER\n");
+            return 2;
+        }
+        /* pick up verdicts a crash left sealed in the log but not in the header,
+           and drop a torn or unsealed tail so new segments follow intact ones */
+        uint64_t log_end;
+        recover_log(fd, &hdr, &log_end);
+        if (log_end < (uint64_t)lseek(fd, 0, SEEK_END) && ftruncate(fd, log_end)) {
+            printf("TRUNCATE FAILED\n");
             return 2;
         }
     }
 
+    MerkleTree tree;
+    if (load_tree(fd, &hdr, &tree)) {
+        printf("INVALID STORE\n");
+        return 2;
+    }
+
     uint64_t seg_id = hdr.latest_verdict_id;
     uint8_t last_hash[32] = {0};
+    SegmentIndexer ix = {0};
+    ix.prev_offset = hdr.index_offset;
+    ix.last_commit = hdr.latest_verdict_id;
 
     const char *obs = "TEST_FAILURE: invariant violated";
-    append_segment(fd, &seg_id, last_hash, 1, SEGMENT_PROVISIONAL,
-                   obs, strlen(obs), last_hash);
-
-    append_segment(fd, &seg_id, last_hash, ASSERTION_VERDICT,
-                   SEGMENT_COMMITTED, "FAIL", 4, last_hash);
+    SegmentRequest verdict[2] = {
+        {1, SEGMENT_PROVISIONAL, (uint32_t)strlen(obs), obs},
+        {ASSERTION_VERDICT, SEGMENT_COMMITTED, 4, "FAIL"},
+    };
+    append_batch(fd, &ix, &seg_id, last_hash, verdict, 2, last_hash);
+    maybe_index_checkpoint(fd, &hdr, &ix);
 
     hdr.latest_verdict_id = seg_id;
-    checkpoint_store(fd, &hdr, (uint8_t*)obs, strlen(obs));
+    checkpoint_store(fd, &hdr, &tree, (uint8_t*)obs, strlen(obs));
+    write_index_checkpoint(fd, &hdr, &ix);
 
     int v = verify_file(fd);
     printf(v == 0 ? "VERIFIED\n" : "INVALID\n");
 
+    merkle_free(&tree);
+    free(ix.entries);
     close(fd);
     return 0;
 }
@@ -6,8 +6,16 @@ import argparse
 import hashlib
 import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+HASH_CHUNK_BYTES = 1 << 20
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+HASH_CACHE_VERSION = 1
+RACY_WINDOW_NS = 2_000_000_000
+
 
 class DeterminismError(RuntimeError):
     """Raised when deterministic replay requirements are missing."""
@@ -37,15 +45,153 @@ def _docker_available() -> bool:
         return False
 
 
-def run_oracle(artifact_path: str | Path, seed: int, skip_docker: bool) -> dict:
+def hash_file(path: Path, chunk_size: int = HASH_CHUNK_BYTES) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        while chunk := handle.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class HashCache:
+    """SHA-256 digests keyed by (device, inode, size, mtime_ns).
+
+    A hit skips rehashing. Files modified within ``RACY_WINDOW_NS`` of the lookup are
+    never stored, since a same-timestamp rewrite could otherwise go unnoticed.
+    """
+
+    def __init__(self, path: str | Path, paranoid: bool = False):
+        self.path = Path(path)
+        self.paranoid = paranoid
+        self.entries: dict[str, str] = {}
+        self.dirty = False
+        if self.path.exists():
+            try:
+                payload = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                payload = {}
+            if payload.get("version") == HASH_CACHE_VERSION:
+                self.entries = payload.get("entries", {})
+
+    @staticmethod
+    def _key(stat: os.stat_result) -> str:
+        return f"{stat.st_dev}:{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def hash_file(self, path: Path) -> str:
+        before = path.stat()
+        key = self._key(before)
+        if not self.paranoid and key in self.entries:
+            return self.entries[key]
+
+        digest = hash_file(path)
+        if self._key(path.stat()) == key and before.st_mtime_ns < time.time_ns() - RACY_WINDOW_NS:
+            self.entries[key] = digest
+            self.dirty = True
+        return digest
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(
+            json.dumps({"version": HASH_CACHE_VERSION, "entries": self.entries}, sort_keys=True),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+def merkle_leaf(relative_path: str, sha256: str) -> bytes:
+    return hashlib.sha256(LEAF_PREFIX + relative_path.encode("utf-8") + b"\x00" + bytes.fromhex(sha256)).digest()
+
+
+def merkle_tree(leaves: list[bytes]) -> tuple[bytes, list[list[dict]]]:
+    """Binary Merkle root over ordered leaves plus an inclusion proof per leaf.
+
+    Interior nodes hash ``NODE_PREFIX + left + right``; an unpaired node is promoted
+    to the next level unchanged rather than duplicated.
+    """
+    proofs: list[list[dict]] = [[] for _ in leaves]
+    members = [[index] for index in range(len(leaves))]
+    level = list(leaves)
+    while len(level) > 1:
+        next_level = []
+        next_members = []
+        for i in range(0, len(level) - 1, 2):
+            left, right = level[i], level[i + 1]
+            for index in members[i]:
+                proofs[index].append({"side": "right", "hash": right.hex()})
+            for index in members[i + 1]:
+                proofs[index].append({"side": "left", "hash": left.hex()})
+            next_level.append(hashlib.sha256(NODE_PREFIX + left + right).digest())
+            next_members.append(members[i] + members[i + 1])
+        if len(level) % 2:
+            next_level.append(level[-1])
+            next_members.append(members[-1])
+        level, members = next_level, next_members
+    return level[0], proofs
+
+
+def verify_merkle_proof(leaf_hex: str, proof: list[dict], root_hex: str) -> bool:
+    node = bytes.fromhex(leaf_hex)
+    for step in proof:
+        sibling = bytes.fromhex(step["hash"])
+        if step["side"] == "left":
+            node = hashlib.sha256(NODE_PREFIX + sibling + node).digest()
+        else:
+            node = hashlib.sha256(NODE_PREFIX + node + sibling).digest()
+    return node.hex() == root_hex
+
+
+def directory_check(directory: Path, workers: int | None = None, hasher=hash_file) -> dict:
+    files = sorted(
+        (path for path in directory.rglob("*") if path.is_file()),
+        key=lambda path: path.relative_to(directory).as_posix(),
+    )
+    if not files:
+        return {"check": "artifact_merkle_root", "status": "FAIL", "reason": "directory contains no files"}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        digests = list(pool.map(hasher, files))
+
+    relative_paths = [path.relative_to(directory).as_posix() for path in files]
+    leaves = [merkle_leaf(rel, digest) for rel, digest in zip(relative_paths, digests)]
+    root, proofs = merkle_tree(leaves)
+    return {
+        "check": "artifact_merkle_root",
+        "status": "PASS",
+        "merkle_root": root.hex(),
+        "files": [
+            {"path": rel, "sha256": digest, "leaf": leaf.hex(), "proof": proof}
+            for rel, digest, leaf, proof in zip(relative_paths, digests, leaves, proofs)
+        ],
+    }
+
+
+def run_oracle(
+    artifact_path: str | Path,
+    seed: int,
+    skip_docker: bool,
+    workers: int | None = None,
+    hash_cache: str | Path | None = None,
+    paranoid: bool = False,
+) -> dict:
     artifact = Path(artifact_path)
     if not artifact.exists():
         raise FileNotFoundError(f"artifact does not exist: {artifact_path}")
 
+    cache = HashCache(hash_cache, paranoid=paranoid) if hash_cache else None
+    hasher = cache.hash_file if cache else hash_file
+
     checks = []
 
-    digest = hashlib.sha256(artifact.read_bytes()).hexdigest()
-    checks.append({"check": "artifact_hash", "status": "PASS", "sha256": digest})
+    if artifact.is_dir():
+        checks.append(directory_check(artifact, workers=workers, hasher=hasher))
+    else:
+        checks.append({"check": "artifact_hash", "status": "PASS", "sha256": hasher(artifact)})
+
+    if cache:
+        cache.save()
 
     if skip_docker:
         checks.append(
@@ -79,6 +225,13 @@ def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Run deterministic Failure Oracle checks")
     parser.add_argument("--artifact-path", required=True)
     parser.add_argument("--output-json", default="")
+    parser.add_argument("--workers", type=int, default=None, help="parallel hashing threads for directory artifacts")
+    parser.add_argument(
+        "--hash-cache",
+        default=os.environ.get("FAILURE_ORACLE_HASH_CACHE", ""),
+        help="reuse digests of files whose (device, inode, size, mtime_ns) are unchanged",
+    )
+    parser.add_argument("--paranoid", action="store_true", help="rehash every file even on a cache hit")
     return parser.parse_args()
 
 
@@ -86,7 +239,14 @@ def main() -> None:
     args = parse_args()
     seed = require_seed()
     skip_docker = os.environ.get("FAILURE_ORACLE_SKIP_DOCKER", "0") == "1"
-    verdict = run_oracle(args.artifact_path, seed=seed, skip_docker=skip_docker)
+    verdict = run_oracle(
+        args.artifact_path,
+        seed=seed,
+        skip_docker=skip_docker,
+        workers=args.workers,
+        hash_cache=args.hash_cache or None,
+        paranoid=args.paranoid,
+    )
     rendered = json.dumps(verdict, indent=2, sort_keys=True)
     if args.output_json:
         Path(args.output_json).write_text(rendered + "\n", encoding="utf-8")
@@ -0,0 +1,505 @@
+"""Read-only mmap reader and verifier for the failure_oracle.c store format."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import struct
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterator
+
+ORACLE_MAGIC = b"FAILURE_ORACLE_01"[:16]
+ORACLE_VERSION = 0x00020000
+ORACLE_STORE_MAGIC = b"ORSTORE1"
+ORACLE_INDEX_MAGIC = b"ORSEGIX1"
+ORACLE_HASH_LEN = 32
+ORACLE_PAGE_SIZE = 4096
+ORACLE_MERKLE_FANOUT = 16
+ORACLE_MAX_LEVELS = 16
+HEADER_HASHED_BYTES = 0xC0
+
+STATE_SEALED = 0
+SEGMENT_PROVISIONAL = 0
+SEGMENT_COMMITTED = 1
+SEGMENT_BATCH_SEAL = 2
+SEGMENT_BLOB = 3
+SEGMENT_INDEX = 4
+SEGMENT_BATCHED = 0x100
+SEGMENT_STATE_MASK = 0xFF
+
+# Layouts mirror the #pragma pack(1) structs in failure_oracle.c (little-endian).
+HEADER = struct.Struct("<16sQQQQQQQ32s32sQQQQ32s")
+SEGMENT = struct.Struct("<QQQII32s32s")
+LEAF = struct.Struct("<QI4s32s")
+NODE = struct.Struct("<QII512s32s")
+INDEX_CHECKPOINT = struct.Struct("<8sQQQQQQ")
+INDEX_ENTRY = struct.Struct("<QQ")
+STORE_INDEX = struct.Struct(f"<8sQQQQQ{ORACLE_MAX_LEVELS}Q{ORACLE_MAX_LEVELS}Q{ORACLE_MAX_LEVELS}Q32s")
+LEAF_CAPACITY = ORACLE_PAGE_SIZE - LEAF.size
+
+VERIFY_OK = 0
+VERIFY_SHORT_HEADER = 1
+VERIFY_BAD_HEADER = 2
+VERIFY_BAD_LEAF = 3
+VERIFY_BAD_ROOT = 4
+
+
+class OracleStoreError(RuntimeError):
+    """Raised when an oracle store cannot be opened or parsed."""
+
+
+def hash32(data: bytes | memoryview) -> bytes:
+    """Python twin of the C placeholder hash: XOR of all bytes, repeated 32 times."""
+    width = len(data)
+    if width == 0:
+        return bytes(ORACLE_HASH_LEN)
+    value = int.from_bytes(data, "little")
+    while width > 1:
+        half = (width + 1) // 2
+        value = (value & ((1 << (half * 8)) - 1)) ^ (value >> (half * 8))
+        width = half
+    return bytes([value]) * ORACLE_HASH_LEN
+
+
+@dataclass(frozen=True)
+class OracleHeader:
+    magic: bytes
+    version: int
+    page_size: int
+    endian_flag: int
+    log_offset: int
+    log_length: int
+    store_offset: int
+    store_length: int
+    root_hash: bytes
+    hdr_hash: bytes
+    latest_verdict_id: int
+    file_state: int
+    timestamp_unix: int
+    index_offset: int
+    reserved: bytes
+
+    @classmethod
+    def unpack_from(cls, buffer, offset: int = 0) -> "OracleHeader":
+        return cls(*HEADER.unpack_from(buffer, offset))
+
+
+@dataclass(frozen=True)
+class ProofSegment:
+    offset: int
+    segment_id: int
+    assertion_id: int
+    timestamp_unix: int
+    state: int
+    data_length: int
+    pre_hash: bytes
+    post_hash: bytes
+
+    @property
+    def payload_offset(self) -> int:
+        return self.offset + SEGMENT.size
+
+
+@dataclass(frozen=True)
+class IndexCheckpoint:
+    offset: int
+    magic: bytes
+    prev_index_offset: int
+    first_segment_id: int
+    last_segment_id: int
+    entry_count: int
+    last_commit_id: int
+    resume_offset: int
+
+    @property
+    def entries_offset(self) -> int:
+        return self.offset + SEGMENT.size + INDEX_CHECKPOINT.size
+
+
+@dataclass(frozen=True)
+class StoreIndex:
+    magic: bytes
+    leaf_count: int
+    level_count: int
+    leaf_table_offset: int
+    leaf_table_capacity: int
+    frontier_offset: int
+    level_offsets: tuple[int, ...]
+    level_counts: tuple[int, ...]
+    level_capacities: tuple[int, ...]
+    root_hash: bytes
+
+    @classmethod
+    def unpack_from(cls, buffer, offset: int) -> "StoreIndex":
+        fields = STORE_INDEX.unpack_from(buffer, offset)
+        levels = 6
+        return cls(
+            magic=fields[0],
+            leaf_count=fields[1],
+            level_count=fields[2],
+            leaf_table_offset=fields[3],
+            leaf_table_capacity=fields[4],
+            frontier_offset=fields[5],
+            level_offsets=fields[levels:levels + ORACLE_MAX_LEVELS],
+            level_counts=fields[levels + ORACLE_MAX_LEVELS:levels + 2 * ORACLE_MAX_LEVELS],
+            level_capacities=fields[levels + 2 * ORACLE_MAX_LEVELS:levels + 3 * ORACLE_MAX_LEVELS],
+            root_hash=fields[-1],
+        )
+
+    def node_offset(self, level: int, position: int) -> int:
+        """Full nodes live in the level array; the last node of a level lives in the frontier."""
+        if position == self.level_counts[level - 1] - 1:
+            return self.frontier_offset + (level - 1) * NODE.size
+        return self.level_offsets[level - 1] + position * NODE.size
+
+
+@dataclass(frozen=True)
+class MerkleNode:
+    offset: int
+    node_id: int
+    fanout: int
+    child_count: int
+    child_hashes: bytes
+    node_hash: bytes
+
+    def child(self, position: int) -> bytes:
+        return self.child_hashes[position * ORACLE_HASH_LEN:(position + 1) * ORACLE_HASH_LEN]
+
+
+@dataclass(frozen=True)
+class RecoveryResult:
+    latest_verdict_id: int
+    segments_scanned: int
+    file_state: int
+    log_end: int
+
+
+class OracleStore:
+    """Memory-mapped view over an oracle.bin file.
+
+    All parsing is ``struct.unpack_from`` against the mapping, so scanning the proof
+    log costs no read or seek syscalls regardless of segment count. Memoryviews
+    returned by :meth:`payload` are only valid while the store is open.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"oracle store does not exist: {path}")
+        self._file = self.path.open("rb")
+        size = self.path.stat().st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self.view = memoryview(self._map) if self._map is not None else memoryview(b"")
+
+    def __enter__(self) -> "OracleStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.view.release()
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __len__(self) -> int:
+        return len(self.view)
+
+    # -------------------------
+
+    def header(self) -> OracleHeader:
+        """The parsed header; stores written by another format version are rejected."""
+        if len(self.view) < HEADER.size:
+            raise OracleStoreError("file shorter than OracleHeader")
+        header = OracleHeader.unpack_from(self.view)
+        if header.magic == ORACLE_MAGIC and header.version != ORACLE_VERSION:
+            raise OracleStoreError(
+                f"unsupported oracle store version {header.version:#010x} (expected {ORACLE_VERSION:#010x})"
+            )
+        return header
+
+    def header_valid(self) -> bool:
+        if len(self.view) < HEADER.size:
+            return False
+        header = OracleHeader.unpack_from(self.view)
+        return (
+            hash32(self.view[:HEADER_HASHED_BYTES]) == header.hdr_hash
+            and header.magic == ORACLE_MAGIC
+            and header.version == ORACLE_VERSION
+        )
+
+    def iter_segments(self, start: int | None = None) -> Iterator[ProofSegment]:
+        """Walk ProofSegments exactly as ``recover_log`` does: read, skip payload, repeat."""
+        offset = self.header().log_offset if start is None else start
+        end = len(self.view) - SEGMENT.size
+        unpack = SEGMENT.unpack_from
+        view = self.view
+        while 0 <= offset <= end:
+            fields = unpack(view, offset)
+            yield ProofSegment(offset, *fields)
+            offset += SEGMENT.size + fields[4]
+
+    def payload(self, segment: ProofSegment) -> memoryview:
+        return self.view[segment.payload_offset:segment.payload_offset + segment.data_length]
+
+    def segment_intact(self, segment: ProofSegment) -> bool:
+        payload = self.payload(segment)
+        try:
+            if len(payload) != segment.data_length:
+                return False
+            return hash32(segment.pre_hash + hash32(payload)) == segment.post_hash
+        finally:
+            payload.release()
+
+    # -------------------------
+
+    def index_checkpoint(self, offset: int) -> IndexCheckpoint | None:
+        """Parse the SEGMENT_INDEX segment at offset, or None if it is not a sound checkpoint."""
+        if offset <= 0 or offset + SEGMENT.size + INDEX_CHECKPOINT.size > len(self.view):
+            return None
+        _, _, _, state, data_length, _, _ = SEGMENT.unpack_from(self.view, offset)
+        if state != SEGMENT_INDEX:
+            return None
+        checkpoint = IndexCheckpoint(offset, *INDEX_CHECKPOINT.unpack_from(self.view, offset + SEGMENT.size))
+        if checkpoint.magic != ORACLE_INDEX_MAGIC:
+            return None
+        if data_length != INDEX_CHECKPOINT.size + checkpoint.entry_count * INDEX_ENTRY.size:
+            return None
+        if offset + SEGMENT.size + data_length > len(self.view):
+            return None
+        return checkpoint
+
+    def recover_log(self, use_index: bool = True) -> RecoveryResult:
+        """Replay ``recover_log``: the last COMMITTED segment id wins, else the header value.
+
+        With a sealed index checkpoint only the tail after its ``resume_offset`` is
+        scanned. COMMITTED segments written by a group commit only count once a
+        SEGMENT_BATCH_SEAL covering them has been read back: a seal counting k
+        segments covers the k consecutive ids ending at its own segment id, so an
+        unsealed group torn before it is ignored. A segment whose payload runs
+        past end of file ends the scan. ``log_end`` is the offset past the last
+        segment outside an unsealed group, where the writer truncates.
+        """
+        header = self.header()
+        last_commit = header.latest_verdict_id
+        batch_commit = batch_len = batch_last = 0
+        scanned = 0
+        offset = header.log_offset
+        size = len(self.view)
+
+        checkpoint = self.index_checkpoint(header.index_offset) if use_index else None
+        if checkpoint is not None and checkpoint.resume_offset <= size:
+            offset = checkpoint.resume_offset
+            last_commit = max(last_commit, checkpoint.last_commit_id)
+        log_end = offset
+
+        end = size - SEGMENT.size
+        unpack = SEGMENT.unpack_from
+        view = self.view
+        while 0 <= offset <= end:
+            segment_id, _, _, state, data_length, _, _ = unpack(view, offset)
+            payload_at = offset + SEGMENT.size
+            if payload_at + data_length > size:
+                break
+            scanned += 1
+            offset = payload_at + data_length
+
+            if state == SEGMENT_BATCH_SEAL:
+                sealed = struct.unpack_from("<Q", view, payload_at)[0] if data_length == 8 else 0
+                if 0 < sealed <= batch_len and segment_id == batch_last and batch_commit > batch_last - sealed:
+                    last_commit = batch_commit
+                batch_commit = batch_len = 0
+                log_end = offset
+            elif state & SEGMENT_BATCHED:
+                if batch_len and segment_id != batch_last + 1:
+                    # a new group after an unsealed one
+                    batch_commit = batch_len = 0
+                batch_len += 1
+                batch_last = segment_id
+                if state & SEGMENT_STATE_MASK == SEGMENT_COMMITTED:
+                    batch_commit = segment_id
+            else:
+                if state == SEGMENT_COMMITTED:
+                    last_commit = segment_id
+                log_end = offset
+        return RecoveryResult(
+            latest_verdict_id=last_commit, segments_scanned=scanned, file_state=STATE_SEALED, log_end=log_end
+        )
+
+    def find_segment(self, segment_id: int) -> ProofSegment | None:
+        """Random access by id: binary search the covering index checkpoint, else scan the tail."""
+        header = self.header()
+        tail = header.log_offset
+        checkpoint = self.index_checkpoint(header.index_offset)
+        if checkpoint is not None:
+            tail = checkpoint.resume_offset
+        while checkpoint is not None:
+            if checkpoint.first_segment_id <= segment_id <= checkpoint.last_segment_id:
+                lo, hi = 0, checkpoint.entry_count
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    found_id, offset = INDEX_ENTRY.unpack_from(self.view, checkpoint.entries_offset + mid * INDEX_ENTRY.size)
+                    if found_id == segment_id:
+                        return ProofSegment(offset, *SEGMENT.unpack_from(self.view, offset))
+                    if found_id < segment_id:
+                        lo = mid + 1
+                    else:
+                        hi = mid
+                return None
+            checkpoint = self.index_checkpoint(checkpoint.prev_index_offset)
+
+        for segment in self.iter_segments(tail):
+            if segment.segment_id == segment_id and segment.state not in (SEGMENT_BLOB, SEGMENT_INDEX, SEGMENT_BATCH_SEAL):
+                return segment
+        return None
+
+    def store_index(self) -> StoreIndex:
+        offset = self.header().store_offset
+        if offset == 0 or offset + STORE_INDEX.size > len(self.view):
+            raise OracleStoreError("store index out of bounds")
+        index = StoreIndex.unpack_from(self.view, offset)
+        if index.magic != ORACLE_STORE_MAGIC:
+            raise OracleStoreError("bad store index magic")
+        if not 0 < index.level_count <= ORACLE_MAX_LEVELS:
+            raise OracleStoreError(f"bad store level count {index.level_count}")
+        return index
+
+    def leaf_offset(self, index: StoreIndex, leaf_index: int) -> int:
+        if not 0 <= leaf_index < index.leaf_count:
+            raise IndexError(f"leaf {leaf_index} out of range")
+        return struct.unpack_from("<Q", self.view, index.leaf_table_offset + 8 * leaf_index)[0]
+
+    def leaf_hash(self, offset: int) -> tuple[bytes, bytes]:
+        """Return (stored leaf_hash, recomputed hash of the leaf data) for the page at offset."""
+        if offset % ORACLE_PAGE_SIZE or offset + ORACLE_PAGE_SIZE > len(self.view):
+            raise OracleStoreError(f"leaf page at {offset} is misaligned or truncated")
+        _, data_length, _, stored = LEAF.unpack_from(self.view, offset)
+        if data_length > LEAF_CAPACITY:
+            raise OracleStoreError(f"leaf page at {offset} overflows its page")
+        data = self.view[offset + LEAF.size:offset + LEAF.size + data_length]
+        try:
+            return stored, hash32(data)
+        finally:
+            data.release()
+
+    def node(self, index: StoreIndex, level: int, position: int) -> MerkleNode:
+        offset = index.node_offset(level, position)
+        if offset + NODE.size > len(self.view):
+            raise OracleStoreError(f"merkle node {level}/{position} out of bounds")
+        return MerkleNode(offset, *NODE.unpack_from(self.view, offset))
+
+    def inclusion_proof(self, leaf_index: int) -> list[MerkleNode]:
+        """The nodes on the path from a leaf to the root: one node read per level."""
+        index = self.store_index()
+        self.leaf_offset(index, leaf_index)
+        return [
+            self.node(index, level, leaf_index // ORACLE_MERKLE_FANOUT ** level)
+            for level in range(1, index.level_count + 1)
+        ]
+
+    def verify_inclusion(self, leaf_index: int) -> bool:
+        """Check one leaf against the sealed root, touching only its page and path nodes."""
+        if not self.header_valid():
+            return False
+        try:
+            index = self.store_index()
+            stored, computed = self.leaf_hash(self.leaf_offset(index, leaf_index))
+            path = self.inclusion_proof(leaf_index)
+        except (OracleStoreError, IndexError):
+            return False
+        if stored != computed:
+            return False
+
+        current = computed
+        for level, node in enumerate(path, start=1):
+            position = (leaf_index // ORACLE_MERKLE_FANOUT ** (level - 1)) % ORACLE_MERKLE_FANOUT
+            if position >= node.child_count or node.child(position) != current:
+                return False
+            if hash32(node.child_hashes[:node.child_count * ORACLE_HASH_LEN]) != node.node_hash:
+                return False
+            current = node.node_hash
+        return current == self.header().root_hash
+
+    def verify_file(self) -> int:
+        """Replay ``verify_file`` and return its exit code (0 means VERIFIED).
+
+        A header from another format version fails as VERIFY_BAD_HEADER.
+        """
+        if len(self.view) < HEADER.size:
+            return VERIFY_SHORT_HEADER
+        if not self.header_valid():
+            return VERIFY_BAD_HEADER
+
+        header = self.header()
+        if header.store_offset == 0 or header.store_offset + STORE_INDEX.size > len(self.view):
+            return VERIFY_BAD_LEAF
+        index = StoreIndex.unpack_from(self.view, header.store_offset)
+        if index.magic != ORACLE_STORE_MAGIC:
+            return VERIFY_BAD_LEAF
+        if not 0 < index.level_count <= ORACLE_MAX_LEVELS:
+            return VERIFY_BAD_ROOT
+
+        level = []
+        for leaf_index in range(index.leaf_count):
+            try:
+                stored, computed = self.leaf_hash(self.leaf_offset(index, leaf_index))
+            except OracleStoreError:
+                return VERIFY_BAD_LEAF
+            if stored != computed:
+                return VERIFY_BAD_LEAF
+            level.append(computed)
+
+        for depth in range(1, index.level_count + 1):
+            level = [
+                hash32(b"".join(level[first:first + ORACLE_MERKLE_FANOUT]))
+                for first in range(0, len(level), ORACLE_MERKLE_FANOUT)
+            ]
+            if len(level) != index.level_counts[depth - 1]:
+                return VERIFY_BAD_ROOT
+            for position, expected in enumerate(level):
+                try:
+                    if self.node(index, depth, position).node_hash != expected:
+                        return VERIFY_BAD_ROOT
+                except OracleStoreError:
+                    return VERIFY_BAD_ROOT
+        if len(level) != 1 or level[0] != header.root_hash or index.root_hash != header.root_hash:
+            return VERIFY_BAD_ROOT
+        return VERIFY_OK
+
+
+def _jsonable(value: dict) -> dict:
+    return {key: item.hex() if isinstance(item, bytes) else item for key, item in value.items()}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Verify a failure_oracle.c store without modifying it")
+    parser.add_argument("store_path")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    with OracleStore(args.store_path) as store:
+        code = store.verify_file()
+        report = {"verify_code": code, "status": "VERIFIED" if code == VERIFY_OK else "INVALID"}
+        if code != VERIFY_SHORT_HEADER:
+            try:
+                header = store.header()
+            except OracleStoreError as exc:
+                report["error"] = str(exc)
+            else:
+                report["header"] = _jsonable(asdict(header))
+                report["header_valid"] = store.header_valid()
+                report["recovery"] = asdict(store.recover_log())
+        if code == VERIFY_OK:
+            index = store.store_index()
+            report["store"] = {"leaf_count": index.leaf_count, "level_count": index.level_count}
+    print(json.dumps(report, indent=2, sort_keys=True))
+    return 0 if code == VERIFY_OK else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())